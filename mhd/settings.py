@@ -112,6 +112,39 @@ REST_FRAMEWORK = {
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
 }
 
+# Counting
+# Number of seconds counts of filtered queries are cached for
+COUNT_CACHE_TIMEOUT = 60 * 60
+# Maximum number of cached counts, the least recently used ones are evicted first
+COUNT_CACHE_SIZE = 10000
+# Estimated counts (when requested) are only used for at least this many (estimated) items
+COUNT_ESTIMATE_THRESHOLD = 100000
+
+# Querying
+# Maximum number of compiled filters kept in memory (per process)
+FILTER_CACHE_SIZE = 1000
+# Number of rows fetched at once when iterating over all results of a query
+QUERY_ITERSIZE = 2000
+# Push conjunctive single-property filters down into EXISTS conditions against the codec tables
+QUERY_FILTER_PUSHDOWN = True
+
+# Caches
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # counts are invalidated using a generation stored in the database,
+    # so a per-process cache is safe, but a shared backend can be used instead
+    "counts": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "mhd-counts",
+        "TIMEOUT": COUNT_CACHE_TIMEOUT,
+        "OPTIONS": {"MAX_ENTRIES": COUNT_CACHE_SIZE},
+    },
+}
+
 # CORS
 # TODO: allow only frontend
 CORS_ORIGIN_ALLOW_ALL = True
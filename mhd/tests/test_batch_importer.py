@@ -1,5 +1,6 @@
 from django.test import TestCase
 import json
+from unittest import mock
 
 from mhd_tests.models import (
     JSONArrayFieldModel,
@@ -10,7 +11,13 @@ from mhd_tests.models import (
 )
 from mhd_tests.utils import db
 
-from ..utils.batch_importer import CopyFromImporter, BulkCreateImporter
+from ..utils.batch_importer import (
+    CopyFromImporter,
+    BinaryCopyImporter,
+    BulkCreateImporter,
+)
+from ..utils.pgsql_binary import make_pgsql_binary_encoder, encode_row
+from mhd_data.fields.ndarray import DumbNDArrayField
 
 TEXT_SAMPLES = [
     "",
@@ -104,6 +111,21 @@ class InsertionTest(TestCase):
             importer, SmartNDArrayOneModel, INTEGER_1D_ARRAY_SAMPLES
         )
 
+    @db.skipUnlessSqlite
+    def test_bulkcreate_validated_array(self):
+        """Checks that already validated values are not validated again"""
+
+        for (validated, called) in [(False, True), (True, False)]:
+            importer = BulkCreateImporter(quiet=True, validated=validated)
+            with mock.patch.object(
+                DumbNDArrayField, "_validate", return_value=True
+            ) as validate:
+                self._insert_and_compare(
+                    importer, SmartNDArrayOneModel, INTEGER_1D_ARRAY_SAMPLES
+                )
+            self.assertEqual(validate.called, called)
+            SmartNDArrayOneModel.objects.all().delete()
+
     @db.skipUnlessPostgres
     def test_copyfrom_integer_2darray(self):
         importer = CopyFromImporter(quiet=False)
@@ -127,3 +149,57 @@ class InsertionTest(TestCase):
         importer = BulkCreateImporter(quiet=False)
         self._insert_and_compare(
             importer, JSONArrayFieldModel, JSON_ARRAY_SAMPLES)
+
+    @db.skipUnlessPostgres
+    def test_copyfrom_binary_text(self):
+        importer = BinaryCopyImporter(quiet=False)
+        self._insert_and_compare(importer, TextFieldModel, TEXT_SAMPLES)
+
+    @db.skipUnlessPostgres
+    def test_copyfrom_binary_json(self):
+        importer = BinaryCopyImporter(quiet=False)
+        self._insert_and_compare(importer, SmartJSONFieldModel, JSON_SAMPLES)
+
+    @db.skipUnlessPostgres
+    def test_copyfrom_binary_integer_array(self):
+        importer = BinaryCopyImporter(quiet=False)
+        self._insert_and_compare(
+            importer, SmartNDArrayOneModel, INTEGER_1D_ARRAY_SAMPLES
+        )
+
+    @db.skipUnlessPostgres
+    def test_copyfrom_binary_integer_2darray(self):
+        importer = BinaryCopyImporter(quiet=False)
+        self._insert_and_compare(
+            importer, SmartNDArrayTwoModel, INTEGER_2D_ARRAY_SAMPLES
+        )
+
+
+class BinaryEncodingTest(TestCase):
+    def test_encode_scalars(self):
+        integer = make_pgsql_binary_encoder("integer")
+        text = make_pgsql_binary_encoder("varchar(255)")
+
+        self.assertEqual(
+            encode_row([integer, text], [1, "a"]),
+            b"\x00\x02" + b"\x00\x00\x00\x04\x00\x00\x00\x01" + b"\x00\x00\x00\x01a",
+        )
+        self.assertEqual(
+            encode_row([integer, text], [None, None]),
+            b"\x00\x02" + b"\xff\xff\xff\xff" * 2,
+        )
+        self.assertIsNone(make_pgsql_binary_encoder("jsonb"))
+
+    def test_encode_arrays(self):
+        ary = make_pgsql_binary_encoder("integer[][]")
+
+        # empty arrays have no dimensions
+        self.assertEqual(ary([]), b"\x00\x00\x00\x00" * 2 + b"\x00\x00\x00\x17")
+
+        # header, dimensions and elements
+        encoded = ary([[1], [2]])
+        self.assertEqual(encoded[:12], b"\x00\x00\x00\x02" + b"\x00" * 4 + b"\x00\x00\x00\x17")
+        self.assertEqual(len(encoded), 12 + 2 * 8 + 2 * 8)
+
+        with self.assertRaises(ValueError):
+            ary([[1], [2, 3]])
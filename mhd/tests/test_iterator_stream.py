@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from django.test import SimpleTestCase
+
+from ..utils.iterator_stream import IteratorStream
+
+
+class IteratorStreamTest(SimpleTestCase):
+    def test_read_sized(self) -> None:
+        """Checks that reading in chunks returns all data"""
+
+        consumed = []
+
+        def lines():
+            for i in range(10):
+                consumed.append(i)
+                yield "line {}\n".format(i)
+
+        stream = IteratorStream(lines())
+
+        # only as many lines as needed are consumed
+        self.assertEqual(stream.read(10), "line 0\nlin")
+        self.assertListEqual(consumed, [0, 1])
+
+        parts = []
+        while True:
+            part = stream.read(7)
+            if part == "":
+                break
+            self.assertLessEqual(len(part), 7)
+            parts.append(part)
+
+        expected = "".join("line {}\n".format(i) for i in range(10))
+        self.assertEqual("line 0\nlin" + "".join(parts), expected)
+        self.assertEqual(stream.tell(), len(expected))
+
+    def test_read_all(self) -> None:
+        """Checks that reading without a size returns everything"""
+
+        stream = IteratorStream(iter(["a", "bc", "", "d"]))
+        self.assertEqual(stream.read(1), "a")
+        self.assertEqual(stream.read(), "bcd")
+        self.assertEqual(stream.read(), "")
+
+    def test_read_binary(self) -> None:
+        """Checks that binary streams return bytes"""
+
+        stream = IteratorStream(iter([b"ab", b"c"]), binary=True)
+        self.assertEqual(stream.read(1), b"a")
+        self.assertEqual(stream.read(5), b"bc")
+        self.assertEqual(stream.read(5), b"")
+        self.assertEqual(stream.tell(), 3)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import uuid
+
+from django.test import SimpleTestCase
+
+from ..utils.pgsql_binary import (
+    PGCOPY_HEADER,
+    PGCOPY_TRAILER,
+    encode_row,
+    make_pgsql_binary_encoder,
+)
+
+
+class PGSQLBinaryTest(SimpleTestCase):
+    """Checks the binary 'COPY' encoding against hand-assembled bytes"""
+
+    def test_header_trailer(self) -> None:
+        self.assertEqual(
+            PGCOPY_HEADER,
+            b"PGCOPY\n\xff\r\n\x00" + b"\x00\x00\x00\x00" + b"\x00\x00\x00\x00",
+        )
+        self.assertEqual(PGCOPY_TRAILER, b"\xff\xff")
+
+    def test_encode_integers(self) -> None:
+        smallint = make_pgsql_binary_encoder("smallint")
+        integer = make_pgsql_binary_encoder("integer")
+        bigint = make_pgsql_binary_encoder("bigint")
+
+        self.assertEqual(smallint(-2), b"\xff\xfe")
+        self.assertEqual(integer(-1), b"\xff\xff\xff\xff")
+        self.assertEqual(integer(-757645513), b"\xd2\xd7\x3f\x37")
+        self.assertEqual(bigint(-2), b"\xff" * 7 + b"\xfe")
+        self.assertEqual(bigint(2 ** 40), b"\x00\x00\x01" + b"\x00" * 5)
+
+    def test_encode_floats_booleans(self) -> None:
+        self.assertEqual(make_pgsql_binary_encoder("boolean")(True), b"\x01")
+        self.assertEqual(make_pgsql_binary_encoder("real")(-2.0), b"\xc0\x00\x00\x00")
+        self.assertEqual(
+            make_pgsql_binary_encoder("double precision")(1.5),
+            b"\x3f\xf8" + b"\x00" * 6,
+        )
+
+    def test_encode_text(self) -> None:
+        text = make_pgsql_binary_encoder("text")
+        varchar = make_pgsql_binary_encoder("varchar(255)")
+
+        # text is sent as utf-8, and the length prefix counts bytes
+        self.assertEqual(text("ü€"), b"\xc3\xbc\xe2\x82\xac")
+        self.assertEqual(
+            encode_row([varchar], ["ü€"]),
+            b"\x00\x01" + b"\x00\x00\x00\x05" + b"\xc3\xbc\xe2\x82\xac",
+        )
+        self.assertEqual(
+            encode_row([varchar], [""]), b"\x00\x01" + b"\x00\x00\x00\x00"
+        )
+
+    def test_encode_uuid(self) -> None:
+        encode = make_pgsql_binary_encoder("uuid")
+        value = "12345678-9abc-def0-1234-56789abcdef0"
+        expected = b"\x12\x34\x56\x78\x9a\xbc\xde\xf0\x12\x34\x56\x78\x9a\xbc\xde\xf0"
+
+        self.assertEqual(encode(value), expected)
+        self.assertEqual(encode(uuid.UUID(value)), expected)
+        self.assertEqual(
+            encode_row([encode], [value]), b"\x00\x01" + b"\x00\x00\x00\x10" + expected
+        )
+
+    def test_encode_nulls(self) -> None:
+        integer = make_pgsql_binary_encoder("integer")
+        text = make_pgsql_binary_encoder("text")
+
+        # NULL is a length of -1 without any data
+        self.assertEqual(
+            encode_row([integer, text, integer], [None, "a", None]),
+            b"".join(
+                [
+                    b"\x00\x03",
+                    b"\xff\xff\xff\xff",
+                    b"\x00\x00\x00\x01a",
+                    b"\xff\xff\xff\xff",
+                ]
+            ),
+        )
+
+    def test_encode_1d_array(self) -> None:
+        ary = make_pgsql_binary_encoder("integer[]")
+
+        # ndim, has-null flag, element oid, (size, lower bound), elements
+        self.assertEqual(
+            ary([1, None, -1]),
+            b"".join(
+                [
+                    b"\x00\x00\x00\x01",
+                    b"\x00\x00\x00\x01",
+                    b"\x00\x00\x00\x17",
+                    b"\x00\x00\x00\x03",
+                    b"\x00\x00\x00\x01",
+                    b"\x00\x00\x00\x04\x00\x00\x00\x01",
+                    b"\xff\xff\xff\xff",
+                    b"\x00\x00\x00\x04\xff\xff\xff\xff",
+                ]
+            ),
+        )
+
+    def test_encode_text_array(self) -> None:
+        ary = make_pgsql_binary_encoder("character varying(10)[]")
+
+        self.assertEqual(
+            ary(["ä", ""]),
+            b"".join(
+                [
+                    b"\x00\x00\x00\x01",
+                    b"\x00\x00\x00\x00",
+                    b"\x00\x00\x04\x13",
+                    b"\x00\x00\x00\x02",
+                    b"\x00\x00\x00\x01",
+                    b"\x00\x00\x00\x02\xc3\xa4",
+                    b"\x00\x00\x00\x00",
+                ]
+            ),
+        )
+
+    def test_encode_2d_array(self) -> None:
+        ary = make_pgsql_binary_encoder("bigint[][]")
+
+        self.assertEqual(
+            ary([[-1], [2]]),
+            b"".join(
+                [
+                    b"\x00\x00\x00\x02",
+                    b"\x00\x00\x00\x00",
+                    b"\x00\x00\x00\x14",
+                    b"\x00\x00\x00\x02\x00\x00\x00\x01",
+                    b"\x00\x00\x00\x01\x00\x00\x00\x01",
+                    b"\x00\x00\x00\x08",
+                    b"\xff" * 8,
+                    b"\x00\x00\x00\x08",
+                    b"\x00" * 7,
+                    b"\x02",
+                ]
+            ),
+        )
+
+        # empty arrays have no dimensions
+        self.assertEqual(ary([]), b"\x00\x00\x00\x00" * 2 + b"\x00\x00\x00\x14")
+
+    def test_unsupported(self) -> None:
+        self.assertIsNone(make_pgsql_binary_encoder("jsonb"))
+        self.assertIsNone(make_pgsql_binary_encoder("jsonb[]"))
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import uuid
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ..utils.uuid import uuid4_bulk, uuid7_bulk, uuid4_mock, uuid4_mock_reset
+
+
+class UUIDTest(SimpleTestCase):
+    def test_uuid4_bulk(self) -> None:
+        """Checks that bulk uuids are random version 4 uuids"""
+
+        ids = uuid4_bulk(100)
+        self.assertEqual(len(set(ids)), 100)
+        for u in ids:
+            self.assertEqual(u.version, 4)
+            self.assertEqual(u.variant, uuid.RFC_4122)
+
+        self.assertListEqual(uuid4_bulk(0), [])
+
+    def test_uuid7_bulk(self) -> None:
+        """Checks that bulk uuids are strictly increasing version 7 uuids"""
+
+        ids = uuid7_bulk(100) + uuid7_bulk(1) + uuid7_bulk(50)
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertListEqual(ids, sorted(ids))
+        for u in ids:
+            self.assertEqual(u.version, 7)
+            self.assertEqual(u.variant, uuid.RFC_4122)
+
+    def test_bulk_mocked(self) -> None:
+        """Checks that bulk uuids use uuid4_mock during tests"""
+
+        uuid4_mock_reset()
+        with mock.patch.object(uuid, "uuid4", uuid4_mock):
+            ids = uuid4_bulk(2) + uuid7_bulk(1)
+
+        self.assertListEqual(
+            [str(u) for u in ids],
+            [
+                "00000000-0000-4fff-afff-ffffffffffff",
+                "00000000-0000-4000-a000-000000000000",
+                "00000000-0000-4000-a000-000000000001",
+            ],
+        )
@@ -5,11 +5,12 @@ from django.contrib import admin
 from django.urls import include, path
 
 from mhd_schema.router import router as schema_router
-from mhd_data.views import QueryView, CountQueryView, ItemView
+from mhd_data.views import QueryView, CountQueryView, ExportView, ItemView
 
 urlpatterns = [
     path("api/query/<slug:cid>/", QueryView.as_view()),
     path("api/query/<slug:cid>/count/", CountQueryView.as_view()),
+    path("api/export/<slug:cid>/<slug:fmt>/", ExportView.as_view()),
     path("api/item/<slug:cid>/<slug:uuid>/", ItemView.as_view()),
     path("api/schema/", include(schema_router.urls)),
     path("api/admin/", admin.site.urls),
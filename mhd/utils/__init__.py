@@ -1,8 +1,9 @@
 from .model_with_metadata import ModelWithMetadata
 from .admin_links import AdminLink
-from .uuid import uuid4
-from .paginator import DefaultPaginator, DefaultRawPaginator
+from .uuid import uuid4, uuid4_bulk, uuid7_bulk
+from .paginator import DefaultPaginator, DefaultRawPaginator, SeekRawPaginator
 from .memoized_method import memoized_method
+from .lru_cache import LRUCache
 from .transaction import with_simulate_arg
 from .fields import get_standard_serializer_field, check_field_value
 from .querysetlike import QuerySetLike
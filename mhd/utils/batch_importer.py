@@ -1,10 +1,22 @@
 from __future__ import annotations
 import os
-from io import StringIO
+import time
 from tqdm import tqdm
 import logging
 
-from .pgsql_serializer import make_pgsql_serializer, CSV_NULL, CSV_NULL_ESCAPED
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None
+
+from .pgsql_serializer import make_pgsql_serializer, CSV_NULL_ESCAPED
+from .pgsql_binary import (
+    make_pgsql_binary_encoder,
+    encode_row,
+    PGCOPY_HEADER,
+    PGCOPY_TRAILER,
+)
+from .iterator_stream import IteratorStream
 
 from django.db import connection
 from django.db.models import JSONField
@@ -17,15 +29,36 @@ if TYPE_CHECKING:
 
 
 class BatchImporter(object):
-    """A BatchImporter can import multiple values into the database at once"""
+    """
+    A BatchImporter can import multiple values into the database at once.
+
+    When validated is set, values have already been validated (or are trusted), and fields
+    providing a get_raw_prep_value() method (such as DumbJSONField) use it to skip validating them again.
+    """
 
     logger: logging.Logger
     batch_size: Optional[int]
+    validated: bool
 
-    def __init__(self, quiet: bool = False, batch_size: Optional[int] = None) -> None:
+    def __init__(
+        self,
+        quiet: bool = False,
+        batch_size: Optional[int] = None,
+        validated: bool = False,
+    ) -> None:
         self.logger = logging.getLogger("mhd.batchimporter")
         self.logger.setLevel(logging.WARN if quiet else logging.DEBUG)
         self.batch_size = batch_size
+        self.validated = validated
+
+    def _get_raw_prepper(
+        self, model: Type[Model], field_name: str
+    ) -> Optional[Callable]:
+        """Returns a function preparing already validated values of a field, if any"""
+
+        if not self.validated:
+            return None
+        return getattr(model._meta.get_field(field_name), "get_raw_prep_value", None)
 
     def __call__(
         self,
@@ -54,7 +87,7 @@ class BatchImporter(object):
 
         # else, have a postgresl importer
         if connection.vendor == "postgresql":
-            return CopyFromImporter(**kwargs)
+            return BinaryCopyImporter(**kwargs)
 
         return BulkCreateImporter(**kwargs)
 
@@ -77,17 +110,26 @@ class BulkCreateImporter(BatchImporter):
         does not expose it's length, it can be given explicitly.
         """
 
+        # values of some fields can be prepared without validating them again
+        preppers = [
+            (i, name, self._get_raw_prepper(model, name))
+            for (i, name) in enumerate(fields)
+        ]
+
         # create the instance from the field names and values
         instances = [
-            model(**{name: value[i] for (i, name) in enumerate(fields)})
+            model(
+                **{
+                    name: value[i] if p is None else p(value[i])
+                    for (i, name, p) in preppers
+                }
+            )
             for value in tqdm(values, leave=False, total=count_values)
         ]
 
         # send some logger into
         self.logger.info(
-            "Created {} instance(s), sending to database ...".format(
-                count_values or len(values)
-            )
+            "Created {} instance(s), sending to database ...".format(len(instances))
         )
 
         # and run bulk_create
@@ -107,6 +149,10 @@ class SerializingImporter(BatchImporter):
                 "SerializingImporter requires 'postgresql' database")
 
     def _get_prepper(self, model: Type[Model], field_name: str) -> Callable:
+        raw = self._get_raw_prepper(model, field_name)
+        if raw is not None:
+            return raw
+
         field = model._meta.get_field(field_name)
         for clz, o in self.PREPPER_OVERRIDES.items():
             if isinstance(field, clz):
@@ -118,15 +164,14 @@ class SerializingImporter(BatchImporter):
             model._meta.get_field(field_name).db_type(connection=connection)
         )
 
-    def _serialize(
+    def _serialize_lines(
         self,
-        stream: IO[str],
         model: Type[Model],
         fields: list[str],
         values: Iterator[Any],
         count_values: Optional[int] = None,
-    ):
-        """Serialializes values into stream as csv and returns the size of stream in bytes"""
+    ) -> Iterator[str]:
+        """Serializes values into lines of csv"""
 
         # find serializers and prep values for the database
         preppers = [self._get_prepper(model, f) for f in fields]
@@ -134,15 +179,35 @@ class SerializingImporter(BatchImporter):
 
         # prepare values for the database
         for value in tqdm(values, leave=False, total=count_values):
-            stream.write(
-                "\t".join(s(p(v))
-                          for (s, p, v) in zip(serializers, preppers, value)) + "\n"
-            )
+            yield "\t".join(
+                s(p(v)) for (s, p, v) in zip(serializers, preppers, value)
+            ) + "\n"
+
+    def _serialize(
+        self,
+        stream: IO[str],
+        model: Type[Model],
+        fields: list[str],
+        values: Iterator[Any],
+        count_values: Optional[int] = None,
+    ):
+        """Serialializes values into stream as csv and returns the size of stream in bytes"""
+
+        for line in self._serialize_lines(model, fields, values, count_values):
+            stream.write(line)
 
         return stream.tell()
 
 
 class CopyFromImporter(SerializingImporter):
+    """
+    Imports values using 'COPY FROM'.
+    Values are serialized while postgres reads them, so that only a buffer of
+    buffer_size characters is kept in memory.
+    """
+
+    buffer_size: int = 64 * 1024
+
     def __call__(
         self,
         model: Type[Model],
@@ -158,28 +223,108 @@ class CopyFromImporter(SerializingImporter):
         does not expose it's length, it can be given explicitly.
         """
 
-        stream = StringIO()
-        size = self._serialize(stream, model, fields,
-                               values, count_values=count_values)
-        stream.seek(0)
-
-        self.logger.info(
-            "Data serialized, sending {} Byte(s) to postgres ...".format(size)
+        stream = IteratorStream(
+            self._serialize_lines(model, fields, values, count_values=count_values)
         )
+        self._copy(model, fields, stream)
+
+    def _copy(
+        self, model: Type[Model], fields: list[str], stream: IO, options: str = ""
+    ) -> None:
+        """Runs 'COPY FROM' reading from stream and logs throughput"""
+
+        start = time.time()
+
+        sql = "COPY {} ({}) FROM STDIN {}".format(
+            connection.ops.quote_name(model._meta.db_table),
+            ", ".join(connection.ops.quote_name(f) for f in fields),
+            options,
+        ).strip()
 
         # and import into the database
         with connection.cursor() as cursor:
-            cursor.copy_from(
-                file=stream,
-                table=model._meta.db_table,
-                sep="\t",
-                null=CSV_NULL,
-                columns=fields,
-            )
+            cursor.copy_expert(sql, stream, size=self.buffer_size)
+            rows = cursor.rowcount
 
-        # close the stream just to be sure it's no longer used
+        took = time.time() - start
+        size = stream.tell()
         stream.close()
 
+        self.logger.info(
+            "Sent {} row(s) ({} character(s) or byte(s)) to postgres in {:.2f} second(s): {:.0f} row(s)/second, {:.2f} MB/second, peak RSS {}".format(
+                rows,
+                size,
+                took,
+                rows / took if took > 0 else 0,
+                size / took / 1024 / 1024 if took > 0 else 0,
+                format_peak_rss(),
+            )
+        )
+
+
+class BinaryCopyImporter(CopyFromImporter):
+    """
+    Imports values using 'COPY FROM' in the binary format.
+    This avoids converting values to text and parsing them again on the server.
+    When a field has a type that can not be encoded in binary, falls back to the text format.
+    """
+
+    def _get_encoder(
+        self, model: Type[Model], field_name: str
+    ) -> Optional[Callable[[Any], bytes]]:
+        return make_pgsql_binary_encoder(
+            model._meta.get_field(field_name).db_type(connection=connection)
+        )
+
+    def __call__(
+        self,
+        model: Type[Model],
+        fields: list[str],
+        values: Iterator[Any],
+        count_values: Optional[int] = None,
+    ) -> None:
+        """Imports multiple values at once
+        :param model: Model instance to import values from
+        :param fields: List of fields to import values for
+        :param values: Iterator over values
+        :param count_values: When values is an iterator that
+        does not expose it's length, it can be given explicitly.
+        """
+
+        encoders = [self._get_encoder(model, f) for f in fields]
+        if any(e is None for e in encoders):
+            self.logger.info(
+                "Table {} has fields without binary encoding, using text format".format(
+                    model._meta.db_table
+                )
+            )
+            return super().__call__(model, fields, values, count_values=count_values)
+
+        preppers = [self._get_prepper(model, f) for f in fields]
+
+        def encode() -> Iterator[bytes]:
+            yield PGCOPY_HEADER
+            for value in tqdm(values, leave=False, total=count_values):
+                yield encode_row(
+                    encoders, [p(v) for (p, v) in zip(preppers, value)]
+                )
+            yield PGCOPY_TRAILER
+
+        stream = IteratorStream(encode(), binary=True)
+        self._copy(model, fields, stream, "WITH (FORMAT binary)")
+
+
+def format_peak_rss() -> str:
+    """Returns a human-readable peak resident set size of this process"""
+
+    if resource is None:
+        return "unknown"
+
+    # ru_maxrss is in kilobytes (on linux)
+    return "{:.1f} MB".format(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    )
+
 
 class CopyFromFile(SerializingImporter):
     path: str
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import io
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Iterator, Optional, Union
+
+    Chunk = Union[str, bytes]
+
+
+class IteratorStream(io.IOBase):
+    """
+    A read-only stream that reads from an iterator of strings (or bytes, when binary is True).
+    Strings are only taken from the iterator when they are read, meaning only
+    a small buffer is kept in memory at any time.
+    """
+
+    _iterator: Iterator[Chunk]
+    _buffer: Chunk
+    _position: int
+
+    def __init__(self, iterator: Iterator[Chunk], binary: bool = False) -> None:
+        super().__init__()
+        self._iterator = iterator
+        self._buffer = b"" if binary else ""
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> Chunk:
+        """Reads at most size characters (or everything when size is negative)"""
+
+        empty = self._buffer[:0]
+        if size is None or size < 0:
+            data = self._buffer + empty.join(self._iterator)
+            self._buffer = empty
+            self._position += len(data)
+            return data
+
+        # take strings from the iterator until we have enough
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while length < size:
+            part = next(self._iterator, None)
+            if part is None:
+                break
+            parts.append(part)
+            length += len(part)
+
+        data = empty.join(parts)
+        self._buffer = data[size:]
+        data = data[:size]
+
+        self._position += len(data)
+        return data
+
+    def tell(self) -> int:
+        """Returns the number of characters (or bytes) read so far"""
+        return self._position
+
+
+__all__ = ["IteratorStream"]
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import base64
+import json
+
 from rest_framework import pagination
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 from collections import OrderedDict
 
@@ -10,7 +15,9 @@ from .raw_paginator import RawQuerySetPaginator
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
-    pass
+    from typing import Optional
+    from rest_framework.request import Request
+    from rest_framework.views import APIView
 
 
 def after(s: str, needle: str):
@@ -21,22 +28,27 @@ def after(s: str, needle: str):
         return s, False
 
 
+def clean_pagination_link(link):
+    """Removes scheme and host from a pagination link"""
+    if not isinstance(link, str):
+        return link
+
+    link, ok = after(link, "://")
+    if not ok:
+        return link
+
+    link, ok = after(link, "/")
+    if not ok:
+        return link
+    return "/" + link
+
+
 class DefaultPaginator(pagination.PageNumberPagination):
     page_size_query_param: str = "per_page"
     max_page_size: int = 1000
 
     def clean_pagination_link(self, link):
-        if not isinstance(link, str):
-            return link
-
-        link, ok = after(link, "://")
-        if not ok:
-            return link
-
-        link, ok = after(link, "/")
-        if not ok:
-            return link
-        return "/" + link
+        return clean_pagination_link(link)
 
     def get_next_link(self):
         return self.clean_pagination_link(super().get_next_link())
@@ -59,4 +71,122 @@ class DefaultPaginator(pagination.PageNumberPagination):
 
 
 class DefaultRawPaginator(DefaultPaginator):
-    django_paginator_class = RawQuerySetPaginator
+    """
+    A paginator for RawQuerySets.
+    When the view has a get_count() method, it is used instead of a COUNT(*) query,
+    see RawQuerySetPaginator.
+    """
+
+    def paginate_queryset(
+        self, queryset: Any, request: Request, view: Optional[APIView] = None
+    ) -> Optional[list[Any]]:
+        self.count_func = getattr(view, "get_count", None)
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def django_paginator_class(
+        self, object_list: Any, per_page: int
+    ) -> RawQuerySetPaginator:
+        return RawQuerySetPaginator(object_list, per_page, count_func=self.count_func)
+
+    def get_paginated_response(self, data: list[Any]) -> Response:
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.page.paginator.count),
+                    ("count_exact", self.page.paginator.count_exact),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("num_pages", self.page.paginator.num_pages),
+                    ("results", data),
+                ]
+            )
+        )
+
+
+class SeekRawPaginator(pagination.BasePagination):
+    """
+    A keyset (seek) paginator for RawQuerySets.
+
+    Instead of a page number, each page is identified by an opaque cursor
+    encoding the values of the last row of the previous page.
+    This means that every page costs the same, regardless of how deep it is.
+
+    The view being paginated must implement:
+    - get_seek_queryset(seek, limit) returning an iterable of (at most limit) rows after seek
+    - get_seek_key(row) returning the (json-serializable) seek values of a row
+    """
+
+    cursor_query_param: str = "cursor"
+    page_size_query_param: str = DefaultPaginator.page_size_query_param
+    max_page_size: int = DefaultPaginator.max_page_size
+    page_size: int = DefaultPaginator.page_size
+
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(
+        self, queryset: Any, request: Request, view: Optional[APIView] = None
+    ) -> list[Any]:
+        self.request = request
+        self.limit = self.get_page_size(request)
+        seek = self.decode_cursor(request)
+
+        # fetch one more row than needed to know if there is a next page
+        rows = list(view.get_seek_queryset(seek, self.limit + 1))
+        self.has_next = len(rows) > self.limit
+        rows = rows[: self.limit]
+
+        self.next_seek = view.get_seek_key(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+
+        return self.page_size
+
+    def decode_cursor(self, request: Request) -> Optional[list[Any]]:
+        """Decodes the cursor of the current request into seek values"""
+
+        encoded = request.query_params.get(self.cursor_query_param, "")
+        if encoded == "":
+            return None
+
+        try:
+            seek = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+        except (TypeError, ValueError):
+            raise ParseError(self.invalid_cursor_message)
+
+        if not isinstance(seek, list):
+            raise ParseError(self.invalid_cursor_message)
+        return seek
+
+    def encode_cursor(self, seek: list[Any]) -> str:
+        """Encodes seek values into an opaque cursor"""
+
+        encoded = json.dumps(seek, default=str, separators=(",", ":"))
+        return base64.urlsafe_b64encode(encoded.encode("utf-8")).decode("ascii")
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+
+        url = self.request.build_absolute_uri()
+        return clean_pagination_link(
+            replace_query_param(
+                url, self.cursor_query_param, self.encode_cursor(self.next_seek)
+            )
+        )
+
+    def get_paginated_response(self, data: list[Any]) -> Response:
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("results", data),
+                ]
+            )
+        )
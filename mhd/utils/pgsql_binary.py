@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import struct
+from uuid import UUID
+
+from .pgsql_serializer import ARY_TYP_REGEX
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterable, Optional, Union
+
+# The binary 'COPY' format is described at https://www.postgresql.org/docs/current/sql-copy.html
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+PGCOPY_TRAILER = struct.pack(">h", -1)
+
+# encodes a NULL field
+PGCOPY_NULL = struct.pack(">i", -1)
+
+
+def make_pgsql_binary_encoder(typ: str) -> Optional[Callable[[Any], bytes]]:
+    """Creates a binary encoder for the given postgres type.
+    That is, it returns a function taking a (non-None) python value
+    representing the type and returning the bytes of the field in
+    binary 'COPY' format (without the length prefix).
+    Returns None if the type is not supported."""
+
+    ary = ARY_TYP_REGEX.match(typ)
+    if ary:
+        return _make_ary_encoder(typ)
+
+    scalar = SCALAR_TYPES.get(typ.split("(")[0], None)
+    if scalar is None:
+        return None
+
+    return scalar[0]
+
+
+def encode_row(encoders: Iterable[Callable[[Any], bytes]], row: Iterable[Any]) -> bytes:
+    """Encodes a row of values into a tuple in binary 'COPY' format"""
+
+    count = 0
+    fields = []
+    for encode, value in zip(encoders, row):
+        count += 1
+        if value is None:
+            fields.append(PGCOPY_NULL)
+            continue
+
+        data = encode(value)
+        fields.append(struct.pack(">i", len(data)))
+        fields.append(data)
+
+    return struct.pack(">h", count) + b"".join(fields)
+
+
+#########################
+# Scalar Types
+#########################
+
+
+def _make_struct_encoder(fmt: str) -> Callable[[Any], bytes]:
+    return struct.Struct(fmt).pack
+
+
+def _encode_uuid(u: Union[UUID, str]) -> bytes:
+    if isinstance(u, UUID):
+        return u.bytes
+    return UUID(u).bytes
+
+
+def _encode_chars(s: str) -> bytes:
+    return s.encode("utf-8")
+
+
+# maps postgres types to an encoder and oid
+SCALAR_TYPES: dict[str, tuple[Callable[[Any], bytes], int]] = {
+    "boolean": (_make_struct_encoder(">?"), 16),
+    "smallint": (_make_struct_encoder(">h"), 21),
+    "integer": (_make_struct_encoder(">i"), 23),
+    "bigint": (_make_struct_encoder(">q"), 20),
+    "real": (_make_struct_encoder(">f"), 700),
+    "double precision": (_make_struct_encoder(">d"), 701),
+    "uuid": (_encode_uuid, 2950),
+    "text": (_encode_chars, 25),
+    "varchar": (_encode_chars, 1043),
+    "character varying": (_encode_chars, 1043),
+}
+
+
+#########################
+# Array Types
+#########################
+
+
+def _make_ary_encoder(typ: str) -> Optional[Callable[[Any], bytes]]:
+    """Makes an encoder for (possibly multi-dimensional) arrays of scalars"""
+
+    # find the element type and dimension
+    dim = 0
+    while True:
+        ary = ARY_TYP_REGEX.match(typ)
+        if not ary:
+            break
+        typ = ary.group(1)
+        dim += 1
+
+    scalar = SCALAR_TYPES.get(typ.split("(")[0], None)
+    if scalar is None:
+        return None
+    encode, oid = scalar
+
+    def encode_ary(value: list[Any]) -> bytes:
+        # find the size of each dimension
+        sizes = []
+        level = value
+        for _ in range(dim):
+            if not isinstance(level, list):
+                raise ValueError("Expected a {}-dimensional array".format(dim))
+            sizes.append(len(level))
+            if len(level) == 0:
+                break
+            level = level[0]
+
+        # empty arrays have no dimensions
+        if 0 in sizes:
+            return struct.pack(">iii", 0, 0, oid)
+
+        elements = []
+        has_null = False
+
+        def flatten(v: Any, d: int) -> None:
+            nonlocal has_null
+            if d == len(sizes):
+                if v is None:
+                    has_null = True
+                    elements.append(PGCOPY_NULL)
+                else:
+                    data = encode(v)
+                    elements.append(struct.pack(">i", len(data)))
+                    elements.append(data)
+                return
+
+            if not isinstance(v, list) or len(v) != sizes[d]:
+                raise ValueError("Multi-dimensional arrays must have matching sizes")
+            for vv in v:
+                flatten(vv, d + 1)
+
+        flatten(value, 0)
+
+        header = struct.pack(">iii", len(sizes), 1 if has_null else 0, oid)
+        dims = b"".join(struct.pack(">ii", size, 1) for size in sizes)
+        return header + dims + b"".join(elements)
+
+    return encode_ary
+
+
+__all__ = [
+    "make_pgsql_binary_encoder",
+    "encode_row",
+    "PGCOPY_HEADER",
+    "PGCOPY_TRAILER",
+]
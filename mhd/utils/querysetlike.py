@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-from django.db import connection as default_connection
+import json
+import sys
+from contextlib import contextmanager
+
+from django.db import connection as default_connection, transaction
 
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import List, Any, Optional
+    from typing import List, Any, Optional, Iterator
+    from django.db.backends.utils import CursorWrapper as Cursor
     from django.db.backends.base.base import BaseDatabaseWrapper as Connection
 
 
@@ -21,6 +26,25 @@ class QuerySetLike(object):
         self._connection = connection if connection is not None else default_connection
         self.query = QuerySetLikeQuery(sql, params)
 
+    @property
+    def raw_query(self) -> str:
+        """The sql of this query, as in a RawQuerySet"""
+        return self.query.sql
+
+    @property
+    def params(self) -> List[Any]:
+        """The parameters of this query, as in a RawQuerySet"""
+        return self.query.params
+
+    @property
+    def db(self) -> str:
+        """The alias of the database connection, as in a RawQuerySet"""
+        return self._connection.alias
+
+    def __iter__(self) -> Iterator[tuple[Any, ...]]:
+        """Iterates over all results as tuples"""
+        return iter(self.fetchall())
+
     def fetchone(self):
         """Fetches a single result from the server"""
         with self._connection.cursor() as c:
@@ -33,6 +57,73 @@ class QuerySetLike(object):
             c.execute(self.query.sql, self.query.params)
             return c.fetchall()
 
+    @contextmanager
+    def chunked_cursor(self) -> Iterator[Cursor]:
+        """
+        Executes this query on a cursor that does not fetch all results at once.
+        On PostgreSQL this is a named (server-side) cursor.
+        """
+
+        with self._connection.chunked_cursor() as c:
+            c.execute(self.query.sql, self.query.params)
+            yield c
+
+    def iterate(self, chunk_size: int) -> Iterator[tuple[Any, ...]]:
+        """
+        Iterates over all results, fetching chunk_size results at a time.
+
+        On PostgreSQL the results are read from a named (server-side) cursor, which only
+        exists inside a transaction. When not already inside one, a transaction is opened
+        on the first result and held until the iterator is exhausted or closed.
+        Callers should therefore consume or close the iterator promptly; any queries made
+        while iterating run inside this transaction.
+        """
+
+        # outside of a transaction, PostgreSQL uses a WITH HOLD cursor that
+        # computes all results before returning the first one.
+        named = self._connection.vendor == "postgresql"
+        atomic = None
+        if named and not self._connection.in_atomic_block:
+            atomic = transaction.atomic(using=self.db)
+            atomic.__enter__()
+
+        exc_info: tuple[Any, Any, Any] = (None, None, None)
+        try:
+            cursor = self._connection.chunked_cursor()
+            try:
+                cursor.execute(self.query.sql, self.query.params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        return
+                    yield from rows
+            finally:
+                cursor.close()
+        except BaseException:
+            # includes GeneratorExit when the iterator is closed early
+            exc_info = sys.exc_info()
+            raise
+        finally:
+            if atomic is not None:
+                atomic.__exit__(*exc_info)
+
+    def estimate(self) -> Optional[int]:
+        """
+        Returns the number of rows the query planner estimates this query to return.
+        Returns None when the database does not support estimates.
+        """
+
+        if self._connection.vendor != "postgresql":
+            return None
+
+        with self._connection.cursor() as c:
+            c.execute("EXPLAIN (FORMAT JSON) " + self.query.sql, self.query.params)
+            plan = c.fetchone()[0]
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
 
 class QuerySetLikeQuery(object):
     def __init__(self, sql: str, params: List[Any]):
@@ -14,15 +14,17 @@ from __future__ import annotations
 #
 # THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #
-from django.core.paginator import Page
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
 from django.core.paginator import Paginator as DefaultPaginator
 from django.db import connections
 from django.db.models.query import RawQuerySet
 
+from .querysetlike import QuerySetLike
+
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Optional, Any
+    from typing import Optional, Any, Callable, Iterable
 
 
 class DatabaseNotSupportedException(Exception):
@@ -30,16 +32,31 @@ class DatabaseNotSupportedException(Exception):
 
 
 class RawQuerySetPaginator(DefaultPaginator):
-    """An efficient paginator for RawQuerySets."""
+    """
+    An efficient paginator for RawQuerySets.
 
-    _count: Optional[int] = None
+    When count_func is given, it is called to determine the count instead of a
+    COUNT(*) query. It should return a pair (count, exact).
+    """
 
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+    _count: Optional[int] = None
+    count_exact: bool = True
+
+    def __init__(
+        self,
+        *args: Any,
+        count_func: Optional[Callable[[], tuple[int, bool]]] = None,
+        **kwargs: Any,
+    ) -> None:
         super().__init__(*args, **kwargs)
         self.raw_query_set = self.object_list
         self.connection = connections[self.raw_query_set.db]
+        self.count_func = count_func
 
     def _get_count(self) -> int:
+        if self._count is None and self.count_func is not None:
+            self._count, self.count_exact = self.count_func()
+
         if self._count is None:
             cursor = self.connection.cursor()
             count_query = (
@@ -92,11 +109,25 @@ class RawQuerySetPaginator(DefaultPaginator):
             self.raw_query_set.raw_query,
         )
 
+    def validate_number(self, number: Any) -> int:
+        # an estimated count might be too small, so only check the lower bound
+        self._get_count()
+        if self.count_exact:
+            return super().validate_number(number)
+
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
     def page(self, number: int) -> Page:
         number = self.validate_number(number)
         offset = (number - 1) * self.per_page
         limit = self.per_page
-        if offset + limit + self.orphans >= self.count:
+        if self.count_exact and offset + limit + self.orphans >= self.count:
             limit = self.count - offset
 
         database_vendor = self.connection.vendor
@@ -109,12 +140,16 @@ class RawQuerySetPaginator(DefaultPaginator):
                 "%s is not supported by RawQuerySetPaginator" % database_vendor
             )
 
-        data = list(
-            self.raw_query_set.model.objects.raw(
-                query_with_limit, self.raw_query_set.params
-            )
-        )
-        return Page(data, number, self)
+        return Page(list(self._raw(query_with_limit)), number, self)
+
+    def _raw(self, sql: str) -> Iterable[Any]:
+        """Makes a new query of the same kind as the paginated query"""
+
+        # plain queries return tuples, instead of model instances
+        if isinstance(self.raw_query_set, QuerySetLike):
+            return QuerySetLike(sql, self.raw_query_set.params, self.connection)
+
+        return self.raw_query_set.model.objects.raw(sql, self.raw_query_set.params)
 
 
 class Paginator(object):
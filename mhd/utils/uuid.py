@@ -3,13 +3,18 @@ from __future__ import annotations
 """
     This file contains a no-op wrapper around UUIDs.
     It exists to allow hooking into UUID generation during tests and should not be changed.
+
+    It also contains generators for many UUIDs at once, which respect the hook.
 """
 
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Any
+    from typing import Any, Iterator, Optional
 
+import os
+import threading
+import time
 import uuid
 
 
@@ -18,6 +23,75 @@ def uuid4(*args: Any, **kwargs: Any) -> uuid.UUID:
     return uuid.uuid4(*args, **kwargs)
 
 
+# the real uuid4 function, used to detect when tests mock it
+_uuid4_original = uuid.uuid4
+
+# masks to set the version and variant bits of a random 128-bit integer
+_VARIANT_MASK = ~(0xC000 << 48)
+_VARIANT_BITS = 0x8000 << 48
+_VERSION_MASK = ~(0xF000 << 64)
+_UUID4_BITS = (4 << 76) | _VARIANT_BITS
+_UUID7_BITS = (7 << 76) | _VARIANT_BITS
+
+
+def _mocked(n: int) -> Optional[list[uuid.UUID]]:
+    """When uuid4 is mocked (during tests), returns n uuids from the mock"""
+
+    if uuid.uuid4 is _uuid4_original:
+        return None
+    return [uuid.uuid4() for _ in range(n)]
+
+
+def _random_ints(n: int, nbytes: int) -> Iterator[int]:
+    """Generates n random integers of nbytes bytes, using a single call to os.urandom"""
+
+    data = os.urandom(n * nbytes)
+    return (
+        int.from_bytes(data[i : i + nbytes], "big")
+        for i in range(0, n * nbytes, nbytes)
+    )
+
+
+def uuid4_bulk(n: int) -> list[uuid.UUID]:
+    """Generates n random UUIDs (version 4) at once"""
+
+    mocked = _mocked(n)
+    if mocked is not None:
+        return mocked
+
+    UUID = uuid.UUID
+    mask = _VERSION_MASK & _VARIANT_MASK
+    return [UUID(int=(r & mask) | _UUID4_BITS) for r in _random_ints(n, 16)]
+
+
+_uuid7_lock = threading.Lock()
+_uuid7_state = {"last": 0}
+
+
+def uuid7_bulk(n: int) -> list[uuid.UUID]:
+    """
+    Generates n time-ordered UUIDs (version 7) at once.
+    The UUIDs are strictly increasing, both within one call and across calls.
+    """
+
+    mocked = _mocked(n)
+    if mocked is not None:
+        return mocked
+
+    # use a new millisecond for every batch, so that batches do not overlap
+    with _uuid7_lock:
+        ms = max(time.time_ns() // 1000000, _uuid7_state["last"] + 1)
+        _uuid7_state["last"] = ms
+
+    # the 74 random bits of each uuid are sorted, so that uuids are increasing
+    UUID = uuid.UUID
+    prefix = (ms & 0xFFFFFFFFFFFF) << 80 | _UUID7_BITS
+    rands = sorted(r >> 6 for r in _random_ints(n, 10))
+    return [
+        UUID(int=prefix | ((r >> 62) << 64) | (r & 0x3FFFFFFFFFFFFFFF)) for r in rands
+    ]
+
+
 uuid4_mock_state = {"counter": -1}
 
 
@@ -41,4 +115,4 @@ def uuid4_mock(*args: Any, **kwargs: Any) -> Any:
     return uuid.UUID(hex=h[0:12] + "4" + h[12:15] + "a" + h[15:30])
 
 
-__all__ = ["uuid4"]
+__all__ = ["uuid4", "uuid4_bulk", "uuid7_bulk"]
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+""" This file contains streaming exporters for the results of collection queries """
+import csv
+import io
+import json
+import struct
+from uuid import UUID
+
+from .models import SemanticItemSerializer
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Iterable, Iterator, Optional, Type
+    from collections import OrderedDict
+    from mhd_schema.models import Collection, Property
+    from .models import Item
+
+
+class StreamExporterError(Exception):
+    """Raised when an exporter does not support a property"""
+
+    pass
+
+
+class StreamExporter(object):
+    """
+    Turns an iterator over query results into an iterator of bytes.
+    Subclasses implement encode(), which encodes a chunk of serialized results.
+    """
+
+    # name of the format, used in the url
+    name: str
+    content_type: str
+    extension: str
+
+    collection: Collection
+    properties: list[Property]
+    columns: list[str]
+
+    def __init__(self, collection: Collection, properties: Iterable[Property]):
+        self.collection = collection
+        self.properties = list(properties)
+        self.serializer = SemanticItemSerializer(
+            collection=collection, properties=self.properties
+        )
+
+        # the serializer orders properties by slug
+        self.columns = ["_id"] + [p.slug for p in self.serializer.properties]
+
+        for p in self.properties:
+            if not self.supports(p):
+                raise StreamExporterError(
+                    "Property {0!r} can not be exported as {1!r}".format(
+                        p.slug, self.name
+                    )
+                )
+
+    @classmethod
+    def supports(cls, prop: Property) -> bool:
+        """Checks if this exporter can export the given property"""
+        return True
+
+    @classmethod
+    def default_properties(cls, collection: Collection) -> list[Property]:
+        """Returns the properties exported when the user did not pick any"""
+        return [p for p in collection.properties() if cls.supports(p)]
+
+    def __call__(self, items: Iterable[Item], chunk_size: int) -> Iterator[bytes]:
+        """Serializes items and encodes them chunk_size rows at a time"""
+
+        yield self.header()
+
+        chunk: list[OrderedDict] = []
+        for item in items:
+            chunk.append(self.serializer.to_representation(item))
+            if len(chunk) >= chunk_size:
+                yield self.encode(chunk)
+                chunk = []
+
+        if len(chunk) > 0:
+            yield self.encode(chunk)
+
+        yield self.footer()
+
+    def header(self) -> bytes:
+        """Returns bytes to write before any rows"""
+        return b""
+
+    def encode(self, rows: list[OrderedDict]) -> bytes:
+        """Encodes a chunk of serialized rows"""
+        raise NotImplementedError
+
+    def footer(self) -> bytes:
+        """Returns bytes to write after all rows"""
+        return b""
+
+
+class CSVExporter(StreamExporter):
+    """
+    Exports results as CSV with a header row.
+    Strings are written as is, all other values are written as json.
+    """
+
+    name = "csv"
+    content_type = "text/csv; charset=utf-8"
+    extension = "csv"
+
+    def _write(self, rows: Iterable[list[Any]]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+    def header(self) -> bytes:
+        return self._write([self.columns])
+
+    def encode(self, rows: list[OrderedDict]) -> bytes:
+        return self._write(
+            [[self._cell(row[column]) for column in self.columns] for row in rows]
+        )
+
+    @staticmethod
+    def _cell(value: Any) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, str):
+            return value
+        return json.dumps(value)
+
+
+class JSONLinesExporter(StreamExporter):
+    """Exports results as JSON Lines, one json object per item"""
+
+    name = "jsonl"
+    content_type = "application/jsonl; charset=utf-8"
+    extension = "jsonl"
+
+    def encode(self, rows: list[OrderedDict]) -> bytes:
+        return "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+
+
+class ColumnarExporter(StreamExporter):
+    """
+    Exports numeric properties in a compact columnar binary format.
+
+    The stream starts with the magic bytes b"MHDCOL1\\n", followed by a little-endian
+    uint32 length and a utf-8 json header {"columns": [{"name": ..., "type": ...}]}.
+    Types are "uuid" (16 bytes), "int64", "float64" and "bool" (1 byte).
+
+    This is followed by blocks, each starting with a uint32 number of rows n.
+    A block contains, for every column, a bitmap of ceil(n/8) bytes (with the lowest
+    bit first) marking non-null values, followed by n values; null values are zero.
+    A block with n = 0 ends the stream.
+    """
+
+    name = "columnar"
+    content_type = "application/octet-stream"
+    extension = "mhdcol"
+
+    MAGIC = b"MHDCOL1\n"
+
+    # maps internal field types to column types and struct formats
+    FIELD_TYPES = {
+        "BooleanField": ("bool", "?"),
+        "SmallIntegerField": ("int64", "q"),
+        "IntegerField": ("int64", "q"),
+        "BigIntegerField": ("int64", "q"),
+        "PositiveSmallIntegerField": ("int64", "q"),
+        "PositiveIntegerField": ("int64", "q"),
+        "PositiveBigIntegerField": ("int64", "q"),
+        "FloatField": ("float64", "d"),
+    }
+
+    @classmethod
+    def _field_type(cls, prop: Property) -> Optional[tuple[str, str]]:
+        fields = prop.codec_model.get_value_fields()
+        if len(fields) != 1:
+            return None
+        return cls.FIELD_TYPES.get(fields[0].get_internal_type())
+
+    @classmethod
+    def supports(cls, prop: Property) -> bool:
+        return cls._field_type(prop) is not None
+
+    def header(self) -> bytes:
+        types = ["uuid"] + [self._field_type(p)[0] for p in self.serializer.properties]
+        header = json.dumps(
+            {
+                "columns": [
+                    {"name": name, "type": tp}
+                    for (name, tp) in zip(self.columns, types)
+                ]
+            }
+        ).encode("utf-8")
+        return self.MAGIC + struct.pack("<I", len(header)) + header
+
+    def encode(self, rows: list[OrderedDict]) -> bytes:
+        n = len(rows)
+        parts = [struct.pack("<I", n)]
+
+        ids = [row["_id"] for row in rows]
+        parts.append(self._bitmap([True] * n))
+        parts.extend(UUID(i).bytes for i in ids)
+
+        for p in self.serializer.properties:
+            _, fmt = self._field_type(p)
+            values = [row[p.slug] for row in rows]
+
+            parts.append(self._bitmap([v is not None for v in values]))
+            parts.append(
+                struct.pack(
+                    "<{}{}".format(n, fmt),
+                    *[v if v is not None else 0 for v in values],
+                )
+            )
+
+        return b"".join(parts)
+
+    def footer(self) -> bytes:
+        return struct.pack("<I", 0)
+
+    @staticmethod
+    def _bitmap(flags: list[bool]) -> bytes:
+        bitmap = bytearray((len(flags) + 7) // 8)
+        for i, flag in enumerate(flags):
+            if flag:
+                bitmap[i // 8] |= 1 << (i % 8)
+        return bytes(bitmap)
+
+
+STREAM_EXPORTERS: dict[str, Type[StreamExporter]] = {
+    e.name: e for e in [CSVExporter, JSONLinesExporter, ColumnarExporter]
+}
+
+__all__ = [
+    "StreamExporter",
+    "StreamExporterError",
+    "CSVExporter",
+    "JSONLinesExporter",
+    "ColumnarExporter",
+    "STREAM_EXPORTERS",
+]
@@ -16,6 +16,10 @@ if TYPE_CHECKING:
     from django.db.backends.base.base import BaseDatabaseWrapper
 
 
+class EncodedJSON(str):
+    """A value of a DumbJSONField that has already been encoded, see DumbJSONField.get_raw_prep_value"""
+
+
 class DumbJSONField(models.TextField):
     """
     A dumb JSONField that stores it's value as encoded text
@@ -60,8 +64,9 @@ class DumbJSONField(models.TextField):
         except Exception as e:
             raise ValidationError(str(e))
 
-    def _dump_json(self, value: Any) -> str:
-        self._validate(value)
+    def _dump_json(self, value: Any, validate: bool = True) -> str:
+        if validate:
+            self._validate(value)
         try:
             return json.dumps(value)
         except Exception as e:
@@ -83,7 +88,22 @@ class DumbJSONField(models.TextField):
 
         return self._dump_json(value)
 
+    def get_raw_prep_value(self, value: Optional[Any]) -> Optional[EncodedJSON]:
+        """
+        Like get_prep_value, but does not validate the value.
+        Used by batch importers for values that were validated (or are trusted) beforehand.
+        """
+
+        if value is None:
+            return None
+
+        return EncodedJSON(self._dump_json(value, validate=False))
+
     def get_db_prep_value(self, value, connection, prepared=False):
+        # values encoded by get_raw_prep_value are passed on as is
+        if isinstance(value, EncodedJSON):
+            return super().get_db_prep_value(str(value), connection, prepared=True)
+
         if value is not None:
             value = self._dump_json(value)
 
@@ -166,4 +186,4 @@ else:
         using_postgres = False
 
 
-__all__ = ["DumbJSONField", "SmartJSONField"]
+__all__ = ["EncodedJSON", "DumbJSONField", "SmartJSONField"]
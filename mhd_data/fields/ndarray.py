@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from itertools import chain
+
 from .json import DumbJSONField
 from django.core.exceptions import ValidationError
 
@@ -7,13 +9,94 @@ from django.db import connection
 
 from django.contrib.postgres.fields import ArrayField
 
-from mhd.utils import check_field_value, get_standard_serializer_field
+from mhd.utils import get_standard_serializer_field
 
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Optional, Any, List, Dict
+    from typing import Optional, Any, List, Dict, Callable
     from django.db.models import Field
+    from rest_framework.fields import Field as SerializerField
+
+
+# serializer fields whose values can be checked by their exact type
+FAST_ELEMENT_TYPES = {
+    "IntegerField": int,
+    "FloatField": float,
+    "BooleanField": bool,
+}
+
+
+class NDArrayValidator(object):
+    """
+    Validates (and converts) entire n-dimensional array values at once.
+
+    The array is flattened one dimension at a time. When all elements already have the
+    right type (e.g. int for integer fields), it is returned as is.
+    Otherwise each element is converted using the serializer field of typ, and errors
+    point to the index of the offending element.
+    """
+
+    dim: int
+    field: SerializerField
+
+    def __init__(self, typ: Field, dim: int):
+        self.dim = dim
+        self.field = get_standard_serializer_field(typ)
+        self._check = self._compile_check(self.field)
+
+    @staticmethod
+    def _compile_check(field: SerializerField) -> Optional[Callable[[list], bool]]:
+        """Compiles a function checking that a flat list needs no conversion"""
+
+        typ = FAST_ELEMENT_TYPES.get(type(field).__name__)
+        if typ is None:
+            return None
+
+        return lambda flat: all(type(v) is typ for v in flat)
+
+    def _flatten(self, value: Any) -> Optional[list]:
+        """Flattens an n-dimensional array, or returns None if it is not one"""
+
+        level = [value]
+        for _ in range(self.dim):
+            if not all(isinstance(v, list) for v in level):
+                return None
+            level = list(chain.from_iterable(level))
+        return level
+
+    def __call__(self, value: Any) -> Any:
+        """Validates a (non-None) value and returns it's converted value"""
+
+        if self._check is not None:
+            flat = self._flatten(value)
+            if flat is not None and self._check(flat):
+                return value
+
+        return self._convert(value, self.dim, "")
+
+    def _convert(self, v: Any, dim: int, index: str) -> Any:
+        """Converts each element of v, reporting the index of invalid elements"""
+
+        if dim == 0:
+            try:
+                return self.field.to_internal_value(v)
+            except Exception as e:
+                raise ValidationError(
+                    "Invalid value at index {}: {}: {}".format(index or "[]", v, e)
+                )
+
+        if not isinstance(v, list):
+            raise ValidationError(
+                "expected to find an {}-dimensional array, but found an {}-dimensional array at index {}".format(
+                    self.dim, self.dim - dim, index or "[]"
+                )
+            )
+
+        return [
+            self._convert(vv, dim - 1, "{}[{}]".format(index, i))
+            for (i, vv) in enumerate(v)
+        ]
 
 
 class DumbNDArrayField(DumbJSONField):
@@ -35,7 +118,7 @@ class DumbNDArrayField(DumbJSONField):
             raise ValueError("dimension must be a positive integer")
 
         self.typ = typ
-        self._field = get_standard_serializer_field(typ)
+        self.validator = NDArrayValidator(typ, self.dim)
 
     def _validate(self, value: Any) -> bool:
         """Checks that the value passed is indeed an n-dimensional array"""
@@ -43,27 +126,7 @@ class DumbNDArrayField(DumbJSONField):
         if value is None:
             return True
 
-        def validate_ndarray(v, dim):
-            """Checks that v is an n-dimentional array value"""
-
-            if dim == 0:
-                try:
-                    check_field_value(self.typ, self._field, v)
-                except Exception as e:
-                    raise ValidationError("Invalid value: {}: {}".format(v, e))
-                return
-
-            if not isinstance(v, list):
-                raise ValidationError(
-                    "expected to find an {}-dimensional array, but found an {}-dimensional array".format(
-                        self.dim, self.dim - dim
-                    )
-                )
-
-            for vv in v:
-                validate_ndarray(vv, dim - 1)
-
-        validate_ndarray(value, self.dim)
+        self.validator(value)
         return True
 
     def deconstruct(self) -> tuple[str, str, List[Any], Dict[str, Any]]:
@@ -81,6 +144,7 @@ class PostgresNDArrayField(ArrayField):
             raise ValueError("dimension must be a positive integer")
 
         self.typ = typ
+        self.validator = NDArrayValidator(typ, self.dim)
 
         base_field = typ
         for _ in range(dim - 1):
@@ -111,4 +175,9 @@ else:
         using_postgres = False
 
 
-__all__ = ["DumbNDArrayField", "PostgresNDArrayField", "SmartNDArrayField"]
+__all__ = [
+    "NDArrayValidator",
+    "DumbNDArrayField",
+    "PostgresNDArrayField",
+    "SmartNDArrayField",
+]
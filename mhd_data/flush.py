@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+""" This file contains the set-based removal of all items from a collection """
+import logging
+import time
+
+from django.db import connection, transaction
+
+from mhd_data.models import CodecManager, Item
+from mhd_data.models.item import ItemCollectionAssociation
+from mhd_data.partitions import CodecPartitions
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Optional, Type
+    from mhd_data.models import Codec
+    from mhd_schema.models import Collection, Property
+
+
+class CollectionFlusher(object):
+    """
+    Removes all items from a collection using set-based SQL, instead of collecting
+    (and cascading) the deleted objects in python.
+
+    Items are processed in batches (of the associations of the collection, in order of their id).
+    For each batch:
+    - all values of properties of the collection are deleted from every codec table,
+      as well as all values of items that are not in any other collection.
+    - items that are not in any other collection are deleted.
+    - the items are disassociated from the collection.
+
+    When batch_size is None, everything is processed in a single batch.
+    Otherwise each batch runs in it's own transaction, limiting the time locks are held.
+
+    Properties only in this collection that have their own partition (see CodecPartitions)
+    are truncated up front instead.
+
+    Values are always deleted per (item, property), so that values superseeding each other
+    are deleted together. This matters for partitioned tables, which have no foreign key
+    on superseeded_by.
+    """
+
+    logger: logging.Logger
+    collection: Collection
+    batch_size: Optional[int]
+
+    # maps table names to the number of deleted rows
+    deleted: dict[str, int]
+
+    def __init__(
+        self,
+        collection: Collection,
+        batch_size: Optional[int] = None,
+        quiet: bool = False,
+    ):
+        self.logger = logging.getLogger("mhd.flush")
+        self.logger.setLevel(logging.WARN if quiet else logging.DEBUG)
+
+        self.collection = collection
+        self.batch_size = batch_size
+        self.deleted = {}
+
+    def __call__(self) -> dict[str, int]:
+        """Flushes the collection and returns the number of deleted rows for each table"""
+
+        start = time.time()
+        self.deleted = {}
+
+        properties = list(self.collection.property_set.all())
+        self._truncate_partitions(properties)
+
+        # group the property ids by codec table
+        prop_ids: dict[Type[Codec], list[str]] = {
+            codec: [] for codec in CodecManager.find_all_codecs()
+        }
+        for p in properties:
+            prop_ids[p.codec_model].append(str(p.pk))
+
+        batches = 0
+        while True:
+            if self.batch_size is None:
+                done = self._flush_batch(prop_ids)
+            else:
+                with transaction.atomic():
+                    done = self._flush_batch(prop_ids)
+            batches += 1
+
+            if done:
+                break
+
+        self.logger.info(
+            "Flushed collection {!r} in {} batch(es) in {:.2f} second(s)".format(
+                self.collection.slug, batches, time.time() - start
+            )
+        )
+        for (table, rows) in self.deleted.items():
+            self.logger.info("Table {!r}: Deleted {} row(s)".format(table, rows))
+
+        return self.deleted
+
+    def _truncate_partitions(self, properties: list[Property]) -> None:
+        """Truncates the partitions of properties that are only in this collection"""
+
+        partitions = CodecPartitions(quiet=True)
+        for p in properties:
+            codec = p.codec_model
+            if not partitions.has_partition(p) or p.collections.count() != 1:
+                continue
+
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT COUNT(*) FROM {}".format(
+                        connection.ops.quote_name(partitions.partition_name(codec, p))
+                    )
+                )
+                rows = cursor.fetchone()[0]
+
+            partitions.truncate(p)
+            self._count(codec._meta.db_table, rows)
+
+    def _flush_batch(self, prop_ids: dict[Type[Codec], list[str]]) -> bool:
+        """Flushes a single batch, and returns True if it was the last one"""
+
+        qn = connection.ops.quote_name
+        association_table = qn(ItemCollectionAssociation._meta.db_table)
+        collection_id = str(self.collection.pk)
+
+        # the items in the batch
+        if self.batch_size is None:
+            batch_sql = "SELECT item_id FROM {} WHERE collection_id = %s".format(
+                association_table
+            )
+            batch_params: list[Any] = [collection_id]
+        else:
+            batch_sql = "SELECT item_id FROM {} WHERE collection_id = %s ORDER BY id LIMIT %s".format(
+                association_table
+            )
+            batch_params = [collection_id, self.batch_size]
+
+        # items that are in some other collection
+        shared_sql = "EXISTS (SELECT 1 FROM {} O WHERE O.item_id = {{}} AND O.collection_id <> %s)".format(
+            association_table
+        )
+
+        postgres = connection.vendor == "postgresql"
+
+        with connection.cursor() as cursor:
+            # values superseeding each other belong to the same item and property, and are deleted together
+            for (codec, ids) in prop_ids.items():
+                table = codec._meta.db_table
+
+                condition = "NOT {}".format(shared_sql.format("V.item_id"))
+                condition_params: list[Any] = [collection_id]
+                if len(ids) > 0:
+                    condition = "(V.prop_id IN ({}) OR {})".format(
+                        ", ".join(["%s"] * len(ids)), condition
+                    )
+                    condition_params = ids + condition_params
+
+                if postgres:
+                    sql = "DELETE FROM {} AS V USING ({}) AS B WHERE V.item_id = B.item_id AND {}".format(
+                        qn(table), batch_sql, condition
+                    )
+                else:
+                    sql = "DELETE FROM {} AS V WHERE V.item_id IN ({}) AND {}".format(
+                        qn(table), batch_sql, condition
+                    )
+                cursor.execute(sql, batch_params + condition_params)
+                self._count(table, cursor.rowcount)
+
+            # remove the items that are not in any other collection (anti-join)
+            item_table = Item._meta.db_table
+            cursor.execute(
+                "DELETE FROM {} AS V WHERE V.id IN ({}) AND NOT {}".format(
+                    qn(item_table), batch_sql, shared_sql.format("V.id")
+                ),
+                batch_params + [collection_id],
+            )
+            self._count(item_table, cursor.rowcount)
+
+            # and disassociate the remaining ones
+            if self.batch_size is None:
+                cursor.execute(
+                    "DELETE FROM {} WHERE collection_id = %s".format(association_table),
+                    [collection_id],
+                )
+            else:
+                cursor.execute(
+                    "DELETE FROM {0} WHERE id IN (SELECT id FROM {0} WHERE collection_id = %s ORDER BY id LIMIT %s)".format(
+                        association_table
+                    ),
+                    [collection_id, self.batch_size],
+                )
+            rows = cursor.rowcount
+            self._count(ItemCollectionAssociation._meta.db_table, rows)
+
+        return self.batch_size is None or rows < self.batch_size
+
+    def _count(self, table: str, rows: int) -> None:
+        self.deleted[table] = self.deleted.get(table, 0) + rows
+
+
+__all__ = ["CollectionFlusher"]
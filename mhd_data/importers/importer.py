@@ -2,21 +2,43 @@ from __future__ import annotations
 
 import gc
 import logging
+from itertools import compress, repeat
+import multiprocessing
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from collections import deque
+from contextlib import contextmanager, nullcontext
 
+import django
+from django.db import connection, transaction
 from django.utils import timezone
 
 from tqdm import tqdm
 
-from mhd.utils import BatchImporter, uuid4
-from mhd_data.models import Item
+from mhd.utils import BatchImporter, uuid4, uuid4_bulk, uuid7_bulk
+from mhd.utils.batch_importer import CopyFromImporter
+from mhd_data.models import Item, CodecManager, ImportCheckpoint
 from mhd_provenance.models import Provenance
 from mhd_schema.models import Collection, Property
+from mhd_schema.count_cache import count_cache
+
+from .indexes import DeferredIndexes
+from .pipeline import PipelineStats, read_ahead
 
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Iterable, Any, List, Optional
+    from typing import (
+        Iterable,
+        Iterator,
+        Any,
+        List,
+        Optional,
+        Sequence,
+        ContextManager,
+    )
+    from concurrent.futures import Future
+    from uuid import UUID
     from logging import Logger
 
     ChunkType = Any
@@ -28,12 +50,49 @@ class DataImporter(object):
     A Data Importer is an abstraction for importing data into MathDataHub.
 
     Does not yet support the update property
+
+    When parallelism is larger than 1, the values of different properties are
+    populated in a pool of worker processes. When values are sent to postgres using
+    'COPY FROM' outside of a transaction, they are also sent using a pool of threads,
+    each with their own database connection.
+
+    Ids of items and values are generated in bulk.
+    When time_ordered_ids is set, they are time-ordered (version 7) UUIDs, so that
+    inserts append to the end of indexes on them.
+
+    When defer_indexes is set, plain indexes on the affected tables are dropped
+    before importing, and rebuilt afterwards. This locks the tables until the
+    surrounding transaction (if any) commits, so should only be used for
+    non-atomic imports.
+
+    When checkpoint is set, each chunk is committed in its own transaction, together
+    with the position in the input after the chunk. An import with the same checkpoint
+    name resumes after the last committed chunk.
+
+    When pipeline is larger than 0, chunks are read in a background thread, which stays
+    up to pipeline chunks ahead. Together with parallelism, values of up to pipeline
+    chunks are sent to the database, while the next chunk is being populated.
+    The throughput of each stage (read, populate, save) is reported at the end.
+
+    When validate is False, input is trusted and array values are not validated.
     """
 
     logger: Logger
     batch: BatchImporter
     collection: Collection
     properties: Iterable[Property]
+    parallelism: int
+    time_ordered_ids: bool
+    defer_indexes: bool
+    checkpoint: Optional[str]
+    pipeline: int
+    validate: bool
+    quiet: bool
+    stats: PipelineStats
+
+    _processes: Optional[ProcessPoolExecutor] = None
+    _threads: Optional[ThreadPoolExecutor] = None
+    _pending: deque
 
     def __init__(
         self,
@@ -42,19 +101,39 @@ class DataImporter(object):
         quiet: bool = False,
         batch_size: Optional[int] = None,
         write_sql=None,
+        parallelism: int = 1,
+        time_ordered_ids: bool = False,
+        defer_indexes: bool = False,
+        checkpoint: Optional[str] = None,
+        pipeline: int = 0,
+        validate: bool = True,
     ):
         """Creates a new data importer for the given collection and properties"""
         self.logger = logging.getLogger("mhd.dataimporter")
         self.logger.setLevel(logging.WARN if quiet else logging.DEBUG)
 
+        # values are validated when populating them (unless the input is trusted)
         self.batch = BatchImporter.get_default_importer(
-            write_sql, quiet=quiet, batch_size=batch_size
+            write_sql, quiet=quiet, batch_size=batch_size, validated=True
         )
 
         self.collection = collection
         self.properties = properties
+        self.parallelism = max(1, parallelism or 1)
+        self.time_ordered_ids = time_ordered_ids
+        self.defer_indexes = defer_indexes
+        self.checkpoint = checkpoint
+        self.pipeline = max(0, pipeline or 0)
+        self.validate = validate
+        self.quiet = quiet
+        self.stats = PipelineStats()
+        self._pending = deque()
 
         self._validate_params()
+        if self.checkpoint is not None and write_sql is not None:
+            raise ImportValidationError(
+                "Checkpoints can not be used when writing sql. "
+            )
 
     def _validate_params(self) -> None:
         if not isinstance(self.collection, Collection):
@@ -76,6 +155,101 @@ class DataImporter(object):
         Returns a list of all items by UUIDS
         """
 
+        checkpoint = self._resume_checkpoint()
+        if checkpoint is not None and checkpoint.finished:
+            self.logger.warning(
+                "Import {!r} has already finished, nothing to do".format(checkpoint.name)
+            )
+            return []
+
+        if checkpoint is None:
+            with self._checkpoint_transaction():
+                self._create_provenance()
+                checkpoint = self._create_checkpoint()
+
+        uuid_list = []
+
+        # outside of a transaction (e.g. with parallel workers), committed chunks stay on failure
+        unprotected = checkpoint is None and not connection.in_atomic_block
+        if unprotected:
+            self.logger.warning(
+                "Importing outside of a transaction: if the import fails, already imported items stay in the database. Use a checkpoint to be able to resume it. "
+            )
+
+        try:
+            with self._worker_pools(), self._deferred_indexes():
+                chunks = self._chunks()
+                try:
+                    while True:
+                        # import the next chunk (if any)
+                        with self._checkpoint_transaction():
+                            chunk = next(chunks, None)
+                            uuids = self._import_chunk(chunk, update=update)
+                            if uuids is None:
+                                break
+
+                            if checkpoint is not None:
+                                self._save_checkpoint(checkpoint, chunk, len(uuids))
+
+                        uuid_list.append(uuids)
+                        self.logger.info(
+                            "Finished import of {} item(s)".format(len(uuids))
+                        )
+
+                        # cached counts no longer match the collection
+                        count_cache.invalidate(self.collection)
+
+                    # wait for the values of the remaining chunks
+                    self._wait_pending(0)
+                finally:
+                    chunks.close()
+        except Exception:
+            if unprotected:
+                self.logger.error(
+                    "Import failed after at least {} item(s) were committed. Re-run it using a checkpoint (--checkpoint) to resume imports after failures. ".format(
+                        sum(len(uuids) for uuids in uuid_list)
+                    )
+                )
+            raise
+
+        self.stats.report(self.logger)
+
+        if checkpoint is not None:
+            checkpoint.finished = True
+            checkpoint.save(update_fields=["finished", "updated"])
+
+        self.collection.invalidate_count()
+        self.logger.info(
+            'Invalidated collection count, run "python manage.py update_count" to update it. '
+        )
+
+        return uuid_list
+
+    def _chunks(self) -> Iterator[ChunkType]:
+        """Iterates over the chunks of the import source, reading ahead when pipelining"""
+
+        if self.pipeline > 0:
+            yield from read_ahead(self._read_chunk, self.pipeline)
+            return
+
+        while True:
+            chunk = self._read_chunk()
+            if chunk is None:
+                return
+            yield chunk
+
+    def _read_chunk(self) -> Optional[ChunkType]:
+        """Reads the next chunk and records how long it took"""
+
+        start = time.time()
+        chunk = self.get_next_chunk()
+        if chunk is not None:
+            self.stats.add("read", self.get_chunk_length(chunk), time.time() - start)
+        return chunk
+
+    def _create_provenance(self) -> None:
+        """Creates the provenance of the imported data"""
+
         provenance_data = self.create_provenance()
         self.provenance = uuid4()
 
@@ -85,23 +259,133 @@ class DataImporter(object):
             [[self.provenance, provenance_data, timezone.now()]],
         )
 
-        uuid_list = []
+    def _checkpoint_transaction(self) -> ContextManager:
+        """Returns a transaction to commit a chunk in (when using checkpoints)"""
 
-        while True:
-            # import the next chunk (if any)
-            uuids = self._import_chunk(self.get_next_chunk(), update=update)
-            if uuids is None:
-                break
+        if self.checkpoint is None:
+            return nullcontext()
+        return transaction.atomic()
 
-            uuid_list.append(uuids)
-            self.logger.info("Finished import of {} item(s)".format(len(uuids)))
+    def _create_checkpoint(self) -> Optional[ImportCheckpoint]:
+        """Creates a new checkpoint (if requested)"""
+
+        if self.checkpoint is None:
+            return None
+
+        return ImportCheckpoint.objects.create(
+            name=self.checkpoint,
+            collection=self.collection,
+            provenance_id=self.provenance,
+            properties=[p.slug for p in self.properties],
+        )
+
+    def _resume_checkpoint(self) -> Optional[ImportCheckpoint]:
+        """Finds an existing checkpoint (if any), and moves the input to its position"""
+
+        if self.checkpoint is None:
+            return None
+
+        checkpoint = ImportCheckpoint.objects.filter(name=self.checkpoint).first()
+        if checkpoint is None:
+            return None
+
+        if checkpoint.collection_id != self.collection.id:
+            raise ImportValidationError(
+                "Checkpoint {!r} belongs to a different collection".format(
+                    checkpoint.name
+                )
+            )
+        if checkpoint.finished:
+            return checkpoint
+
+        # the position in the input only makes sense for the same columns
+        slugs = [p.slug for p in self.properties]
+        if checkpoint.properties != slugs:
+            raise ImportValidationError(
+                "Checkpoint {!r} was created for properties {}, but importing {}".format(
+                    checkpoint.name,
+                    ",".join(checkpoint.properties),
+                    ",".join(slugs),
+                )
+            )
+
+        self.provenance = checkpoint.provenance_id
+        if checkpoint.position is not None:
+            self.seek(checkpoint.position)
 
-        self.collection.invalidate_count()
         self.logger.info(
-            'Invalidated collection count, run "python manage.py update_count" to update it. '
+            "Resuming import {!r} after {} chunk(s) with {} item(s)".format(
+                checkpoint.name, checkpoint.chunks, checkpoint.items
+            )
         )
+        return checkpoint
 
-        return uuid_list
+    def _save_checkpoint(
+        self, checkpoint: ImportCheckpoint, chunk: ChunkType, count: int
+    ) -> None:
+        """Records that the given chunk has been imported"""
+
+        checkpoint.position = self.get_chunk_position(chunk)
+        checkpoint.chunks += 1
+        checkpoint.items += count
+        checkpoint.save()
+
+    @contextmanager
+    def _worker_pools(self) -> Iterator[None]:
+        """Starts (and afterwards stops) the worker pools used by this importer"""
+
+        if self.parallelism <= 1:
+            yield
+            return
+
+        # spawn fresh processes, so that they do not share the database connection
+        self._processes = ProcessPoolExecutor(
+            max_workers=self.parallelism,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        )
+
+        # other connections can not see (or commit) rows inside our transaction
+        transactional = connection.in_atomic_block or self.checkpoint is not None
+        if isinstance(self.batch, CopyFromImporter) and not transactional:
+            self._threads = ThreadPoolExecutor(max_workers=self.parallelism)
+        else:
+            self.logger.warning(
+                "Sending values to the database using a single connection"
+            )
+
+        try:
+            yield
+        finally:
+            self._processes.shutdown()
+            self._processes = None
+
+            if self._threads is not None:
+                self._threads.shutdown()
+                self._threads = None
+
+    def _deferred_indexes(self) -> ContextManager:
+        """Returns a context manager that defers indexes (if requested)"""
+
+        if not self.defer_indexes:
+            return nullcontext()
+
+        if not isinstance(self.batch, CopyFromImporter):
+            self.logger.warning("Not sending data to the database, keeping indexes")
+            return nullcontext()
+
+        return DeferredIndexes(
+            [p.codec_model for p in self.properties] + [Item.collections.through],
+            workers=self.parallelism if self.parallelism > 1 else None,
+            quiet=self.quiet,
+        )
+
+    def generate_ids(self, n: int) -> List[UUID]:
+        """Generates n fresh ids for items or values"""
+
+        if self.time_ordered_ids:
+            return uuid7_bulk(n)
+        return uuid4_bulk(n)
 
     def _import_chunk(self, chunk: ChunkType, update: bool) -> List[str]:
         """
@@ -117,9 +401,11 @@ class DataImporter(object):
         start = time.time()
 
         # Generate UUIDs
+        chunk_uuids = list(self.get_chunk_uuids(chunk))
+        fresh = iter(self.generate_ids(sum(1 for uuid in chunk_uuids if uuid is None)))
         uuids = [
-            uuid4() if uuid is None else uuid
-            for uuid in tqdm(self.get_chunk_uuids(chunk), leave=False)
+            next(fresh) if uuid is None else uuid
+            for uuid in tqdm(chunk_uuids, leave=False)
         ]
         self.logger.info(
             "Collection {1!r}: {0!s} fresh UUID(s) generated".format(
@@ -151,20 +437,23 @@ class DataImporter(object):
         # run the garbage collector to get rid of all the items we already stored
         gc.collect()
 
-        # iterate and create each propesrty
-        for idx, p in enumerate(self.properties):
-            propstart = time.time()
-            try:
-                self._import_chunk_property(chunk, uuids, p, idx, update=update)
-            except Exception as e:
-                raise ImporterError(
-                    "Unable to import property {}: {}".format(p.slug, str(e))
-                )
-            self.logger.info(
-                "Collection {2!r}: Property {1!r}: Took {0} second(s)".format(
-                    time.time() - propstart, p.slug, self.collection.slug
+        # iterate and create each property
+        if self._processes is not None:
+            self._import_chunk_properties_parallel(chunk, uuids, update=update)
+        else:
+            for idx, p in enumerate(self.properties):
+                propstart = time.time()
+                try:
+                    self._import_chunk_property(chunk, uuids, p, idx, update=update)
+                except Exception as e:
+                    raise ImporterError(
+                        "Unable to import property {}: {}".format(p.slug, str(e))
+                    )
+                self.logger.info(
+                    "Collection {2!r}: Property {1!r}: Took {0} second(s)".format(
+                        time.time() - propstart, p.slug, self.collection.slug
+                    )
                 )
-            )
 
         self.logger.info(
             "Collection {1!r}: Took {0} second(s)".format(
@@ -176,6 +465,68 @@ class DataImporter(object):
         gc.collect()
         return uuids
 
+    def _import_chunk_properties_parallel(
+        self, chunk: ChunkType, uuids: List[str], update: bool
+    ) -> None:
+        """
+        Creates all properties for the given chunk and the provided items in parallel.
+        Each column is populated in a worker process, and saved as soon as it is done.
+        """
+
+        conversions: dict[Future, Property] = {
+            self._processes.submit(
+                _populate_column,
+                p.codec_model.get_codec_name(),
+                list(self.get_chunk_column(chunk, p, idx)),
+                self.validate,
+            ): p
+            for (idx, p) in enumerate(self.properties)
+        }
+
+        saves: dict[Future, Property] = {}
+        for future in as_completed(conversions):
+            p = conversions[future]
+            (populated, took) = self._property_result(future, p)
+            self.stats.add("populate", len(uuids), took)
+            self._log_populated(uuids, p)
+
+            if self._threads is None:
+                try:
+                    self._save_chunk_property(uuids, p, populated, update)
+                except Exception as e:
+                    raise ImporterError(
+                        "Unable to import property {}: {}".format(p.slug, str(e))
+                    )
+                continue
+
+            saves[
+                self._threads.submit(
+                    self._save_chunk_property_thread, uuids, p, populated, update
+                )
+            ] = p
+
+        # keep at most self.pipeline chunks in flight
+        self._pending.append(saves)
+        self._wait_pending(self.pipeline)
+
+    def _wait_pending(self, keep: int) -> None:
+        """Waits for pending saves, until at most keep chunks are pending"""
+
+        while len(self._pending) > keep:
+            saves = self._pending.popleft()
+            for future in as_completed(saves):
+                self._property_result(future, saves[future])
+
+    def _property_result(self, future: Future, prop: Property) -> Any:
+        """Returns the result of a future, wrapping all errors in an ImporterError"""
+
+        try:
+            return future.result()
+        except Exception as e:
+            raise ImporterError(
+                "Unable to import property {}: {}".format(prop.slug, str(e))
+            )
+
     def _import_chunk_property(
         self, chunk: ChunkType, uuids: List[str], prop: Property, idx: int, update: bool
     ) -> None:
@@ -183,6 +534,48 @@ class DataImporter(object):
         Creates the given property for the given chunk and the provided items
         """
 
+        # populate the values of the entire column at once
+        start = time.time()
+        column = self.get_chunk_column(chunk, prop, idx)
+        populated = prop.codec_model.populate_column(column, self.validate)
+        self.stats.add("populate", len(uuids), time.time() - start)
+        self._log_populated(uuids, prop)
+
+        self._save_chunk_property(uuids, prop, populated, update)
+
+    def _log_populated(self, uuids: List[str], prop: Property) -> None:
+        self.logger.info(
+            "Collection {2!r}: Property {1!r}: {0!r} Value(s) populated".format(
+                len(uuids), prop.slug, self.collection.slug
+            )
+        )
+
+    def _save_chunk_property_thread(
+        self,
+        uuids: List[str],
+        prop: Property,
+        populated: List[List[Any]],
+        update: bool,
+    ) -> None:
+        """Like _save_chunk_property, but run in a thread of the pool"""
+
+        try:
+            self._save_chunk_property(uuids, prop, populated, update)
+        finally:
+            # each thread uses (and opens) it's own connection
+            connection.close()
+
+    def _save_chunk_property(
+        self,
+        uuids: List[str],
+        prop: Property,
+        populated: List[List[Any]],
+        update: bool,
+    ) -> None:
+        """
+        Saves the populated values of the given property for the provided items
+        """
+
         # TODO: If update is set, set all the existing property values
         # to disabled. If update is not set, check that no value already exists and else
         # 'raise'
@@ -190,57 +583,41 @@ class DataImporter(object):
         # cache some values that will be used in multiple iterations below
         # this means we don't need to constantly look them up again, leading
         # to a significant speedup
-        column = self.get_chunk_column(chunk, prop, idx)
         prop_id = prop.id
         model = prop.codec_model
-        populate_values = model.populate_values
         value_columns = prop.codec_model.value_fields
         provenance_id = self.provenance
 
-        lift = (
-            (lambda v: [v])
-            if len(value_columns) == 1
-            else (lambda v: v if (v is not None) else [None] * len(value_columns))
-        )
-
-        # Create each of the property values and populate them from the literal ones
-        # in the column
-        values = [
-            [
-                uuid4(),
-                uuid,
-                prop_id,
-                provenance_id,
-                True,
-                *populate_values(*lift(value)),
-            ]
-            for (uuid, value) in zip(tqdm(uuids, leave=False), column)
-        ]
-        self.logger.info(
-            "Collection {2!r}: Property {1!r}: {0!r} Value(s) instantiated".format(
-                len(values), prop.slug, self.collection.slug
-            )
+        # Do not insert values that are only None
+        item_ids, columns = _drop_empty(uuids, populated)
+
+        # Create each of the property values, only as they are consumed by the importer
+        values = zip(
+            self.generate_ids(len(item_ids)),
+            tqdm(item_ids, leave=False),
+            repeat(prop_id),
+            repeat(provenance_id),
+            repeat(True),
+            *columns,
         )
 
         # insert them into the db
+        start = time.time()
         self.batch(
             model,
             ["id", "item_id", "prop_id", "provenance_id", "active", *value_columns],
-            filter(
-                # Do not insert values that are only none
-                lambda v: not all(x is None for x in v[5:]),
-                values,
-            ),
-            len(values),
+            values,
+            len(item_ids),
         )
+        self.stats.add("save", len(item_ids), time.time() - start)
         self.logger.info(
             "Collection {2!r}: Property {1!r}: {0!r} Value(s) saved in database".format(
-                len(values), prop.slug, self.collection.slug
+                len(uuids), prop.slug, self.collection.slug
             )
         )
 
         # run the garbage collector to get rid of things we no longer need
-        values = None
+        values = populated = item_ids = columns = None
         gc.collect()
 
     #
@@ -264,6 +641,25 @@ class DataImporter(object):
 
         raise NotImplementedError
 
+    def get_chunk_position(self, chunk: ChunkType) -> Any:
+        """
+        Returns the position in the import source directly after the given chunk,
+        as a json-serializable value.
+        Used to resume imports using checkpoints.
+        To be implemented by subclass (when supporting checkpoints).
+        """
+
+        raise NotImplementedError
+
+    def seek(self, position: Any) -> None:
+        """
+        Moves the import source to a position returned by get_chunk_position,
+        so that get_next_chunk() returns the chunk following it.
+        To be implemented by subclass (when supporting checkpoints).
+        """
+
+        raise NotImplementedError
+
     def get_chunk_length(self, chunk: ChunkType) -> int:
         """
         Gets the length of the given chunk.
@@ -296,6 +692,44 @@ class DataImporter(object):
         raise NotImplementedError
 
 
+def _drop_empty(
+    uuids: Sequence[Any], populated: List[List[Any]]
+) -> tuple[Sequence[Any], List[Sequence[Any]]]:
+    """
+    Drops the rows of the given value columns that are entirely None.
+    Returns the remaining uuids and columns.
+    """
+
+    if len(populated) == 1:
+        mask = [v is not None for v in populated[0]]
+    else:
+        mask = [any(v is not None for v in row) for row in zip(*populated)]
+
+    # nothing to drop, so don't copy
+    if all(mask):
+        return uuids, populated
+
+    return (
+        list(compress(uuids, mask)),
+        [list(compress(column, mask)) for column in populated],
+    )
+
+
+def _populate_column(
+    codec_name: str, column: List[Any], validate: bool
+) -> tuple[List[List[Any]], float]:
+    """Populates a column in a worker process, and returns it with the time it took"""
+
+    try:
+        start = time.time()
+        codec = CodecManager.find_codec(codec_name)
+        populated = codec.populate_column(column, validate)
+        return (populated, time.time() - start)
+    except Exception as e:
+        # not all exceptions can be sent back to the parent process
+        raise ValueError(str(e))
+
+
 class ImporterError(Exception):
     def __init__(self, message: str) -> None:
         super().__init__("Unable to create collection: {}".format(message))
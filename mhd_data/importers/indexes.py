@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Iterable, Optional, Type
+    from types import TracebackType
+    from django.db.models import Model
+
+# finds the plain (non-unique, non-constraint) indexes of a table
+INDEXES_SQL = """
+SELECT index.relname, pg_get_indexdef(index.oid)
+FROM pg_index
+JOIN pg_class index ON index.oid = pg_index.indexrelid
+JOIN pg_class tbl ON tbl.oid = pg_index.indrelid
+WHERE tbl.relname = %s
+AND tbl.relnamespace = to_regnamespace(current_schema())
+AND NOT pg_index.indisprimary
+AND NOT pg_index.indisunique
+AND NOT EXISTS (
+    SELECT 1 FROM pg_constraint WHERE pg_constraint.conindid = index.oid
+)
+ORDER BY index.relname
+"""
+
+# checks if a table is partitioned
+PARTITIONED_SQL = """
+SELECT 1 FROM pg_class
+WHERE relname = %s
+AND relnamespace = to_regnamespace(current_schema())
+AND relkind = 'p'
+"""
+
+
+class DeferredIndexes(object):
+    """
+    A context manager that drops the plain indexes of the tables of the given models,
+    and rebuilds them (followed by ANALYZE) when it exits.
+    Primary keys and unique constraints are kept.
+
+    Outside of a transaction indexes are rebuilt concurrently, using a pool of workers,
+    each with their own database connection.
+    Inside a transaction, the tables stay locked (ACCESS EXCLUSIVE) from dropping the indexes
+    until the transaction commits, so this should only be used for non-atomic imports.
+    Only supported on postgres; does nothing on other databases.
+    """
+
+    logger: logging.Logger
+    models: list[Type[Model]]
+    workers: int
+
+    # maps tables to the definitions of their dropped indexes
+    dropped: dict[str, list[tuple[str, str]]]
+
+    # tables that are partitioned (and can not be indexed concurrently)
+    partitioned: set[str]
+
+    def __init__(
+        self,
+        models: Iterable[Type[Model]],
+        workers: Optional[int] = None,
+        quiet: bool = False,
+    ):
+        self.logger = logging.getLogger("mhd.deferredindexes")
+        self.logger.setLevel(logging.WARN if quiet else logging.DEBUG)
+
+        # de-duplicate models, but keep their order
+        self.models = list(dict.fromkeys(models))
+        self.workers = workers or os.cpu_count() or 1
+        self.dropped = {}
+        self.partitioned = set()
+
+    def __enter__(self) -> DeferredIndexes:
+        if connection.vendor != "postgresql":
+            self.logger.warning("Deferring indexes requires postgres, skipping")
+            return self
+
+        if connection.in_atomic_block:
+            self.logger.warning(
+                "Deferring indexes inside a transaction: reads and writes of the affected tables are blocked until it commits"
+            )
+
+        start = time.time()
+        with connection.cursor() as cursor:
+            for model in self.models:
+                table = model._meta.db_table
+
+                cursor.execute(INDEXES_SQL, [table])
+                indexes = cursor.fetchall()
+                for (name, _) in indexes:
+                    cursor.execute(
+                        "DROP INDEX {}".format(connection.ops.quote_name(name))
+                    )
+
+                self.dropped[table] = indexes
+
+                cursor.execute(PARTITIONED_SQL, [table])
+                if cursor.fetchone() is not None:
+                    self.partitioned.add(table)
+                self.logger.info(
+                    "Table {!r}: Dropped {} index(es)".format(table, len(indexes))
+                )
+
+        self.logger.info(
+            "Dropped indexes on {} table(s) in {:.2f} second(s)".format(
+                len(self.dropped), time.time() - start
+            )
+        )
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        # a failed transaction is rolled back, which restores the indexes
+        if exc_type is not None and connection.in_atomic_block:
+            return
+
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Rebuilds all dropped indexes, and analyzes the affected tables"""
+
+        if len(self.dropped) == 0:
+            return
+
+        start = time.time()
+
+        # concurrent index builds can not be run (and other connections can not see our data) inside a transaction
+        concurrent = not connection.in_atomic_block
+        # (and are not supported on partitioned tables)
+        statements = [
+            (
+                table,
+                name,
+                self._concurrently(sql)
+                if concurrent and table not in self.partitioned
+                else sql,
+            )
+            for (table, indexes) in self.dropped.items()
+            for (name, sql) in indexes
+        ]
+
+        if concurrent and self.workers > 1 and len(statements) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(lambda s: self._execute_in_thread(*s), statements))
+        else:
+            for s in statements:
+                self._execute(*s)
+
+        self.logger.info(
+            "Rebuilt {} index(es) in {:.2f} second(s)".format(
+                len(statements), time.time() - start
+            )
+        )
+
+        start = time.time()
+        with connection.cursor() as cursor:
+            for table in self.dropped.keys():
+                cursor.execute("ANALYZE {}".format(connection.ops.quote_name(table)))
+        self.logger.info(
+            "Analyzed {} table(s) in {:.2f} second(s)".format(
+                len(self.dropped), time.time() - start
+            )
+        )
+
+        self.dropped = {}
+        self.partitioned = set()
+
+    @staticmethod
+    def _concurrently(sql: str) -> str:
+        return sql.replace("CREATE INDEX ", "CREATE INDEX CONCURRENTLY ", 1)
+
+    def _execute(self, table: str, name: str, sql: str) -> None:
+        start = time.time()
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+        self.logger.info(
+            "Table {!r}: Rebuilt index {!r} in {:.2f} second(s)".format(
+                table, name, time.time() - start
+            )
+        )
+
+    def _execute_in_thread(self, table: str, name: str, sql: str) -> None:
+        try:
+            self._execute(table, name, sql)
+        finally:
+            # each thread uses (and opens) it's own connection
+            connection.close()
+
+
+__all__ = ["DeferredIndexes"]
@@ -2,23 +2,31 @@ from __future__ import annotations
 
 import ujson as json
 from collections import deque
+from itertools import islice
 
 from .importer import DataImporter, ImporterError
+from .jsonstream import iter_json_rows
 
 from mhd_schema.models import Collection
 
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import List, Optional, Any
+    from typing import List, Optional, Any, Iterator, Sequence
     from .importer import ChunkType, ProvenanceType
 
 
 class JSONFileImporter(DataImporter):
-    """An importer that loads data from a set of json files"""
-
-    _chunk_size: int
+    """
+    An importer that loads data from a set of json files.
+    Each file contains a top-level array of rows, or JSON Lines (when using a .jsonl or .ndjson extension),
+    and may be compressed using gzip or zstd.
+    Files are read incrementally, so that only the current chunk is held in memory.
+    """
+
+    _chunk_size: Optional[int]
     _files: deque
+    _rows: Optional[Iterator[Any]]
     provenance_path: str
 
     def __init__(
@@ -31,6 +39,12 @@ class JSONFileImporter(DataImporter):
         batch_size: Optional[int],
         chunk_size: int,
         write_sql: Optional[str],
+        parallelism: int = 1,
+        time_ordered_ids: bool = False,
+        defer_indexes: bool = False,
+        checkpoint: Optional[str] = None,
+        pipeline: int = 0,
+        validate: bool = True,
     ):
         # inner chunk size
         self._chunk_size = chunk_size
@@ -46,15 +60,28 @@ class JSONFileImporter(DataImporter):
         # path to provenance
         self.provenance_path = provenance_path
 
-        # buffer for current file chunk
-        self._chunk = None
+        # rows of the current file
+        self._rows = None
+        self._file_index = -1
         self._chunk_fn = None
         self._chunk_offset = None
 
         # call super()
         collection = Collection.objects.get(slug=collection_slug)
         properties = [collection.get_property(pn) for pn in property_names]
-        super().__init__(collection, properties, quiet, batch_size, write_sql)
+        super().__init__(
+            collection,
+            properties,
+            quiet,
+            batch_size,
+            write_sql,
+            parallelism,
+            time_ordered_ids,
+            defer_indexes,
+            checkpoint,
+            pipeline,
+            validate,
+        )
 
     def create_provenance(self) -> ProvenanceType:
         """
@@ -72,68 +99,118 @@ class JSONFileImporter(DataImporter):
         Should return None if no more chunks are left.
         """
 
-        # grab the next chunk (if we have nothing left)
-        if self._chunk is None or len(self._chunk) == 0:
-            self._chunk = self._get_next_chunk()
-
-        # if there are no chunks left, return
-        if self._chunk is None:
-            return None
+        while True:
+            # open the next file (if we have nothing left)
+            if self._rows is None and not self._open_next_file():
+                return None
 
-        # get meta data for the current chunk
-        meta = {"filename": self._chunk_fn, "offset": self._chunk_offset}
-
-        # cut the chunk to at most inner_chunk_size
-        if self._chunk_size is not None and len(self._chunk) > self._chunk_size:
-            c = self._chunk[: self._chunk_size]
-            self._chunk_offset += self._chunk_size
-            self._chunk = self._chunk[self._chunk_size :]
-        else:
-            c = self._chunk
-            self._chunk = None
-
-        return {"data": c, "meta": meta}
+            # read at most chunk_size rows
+            try:
+                c = list(islice(self._rows, self._chunk_size))
+            except Exception as e:
+                raise ImporterError(
+                    "Unable to read file {}: {}".format(self._chunk_fn, str(e))
+                )
 
-    def _get_next_chunk(self) -> Optional[ChunkType]:
+            # the file is done, move on to the next one
+            if len(c) == 0:
+                self._rows = None
+                continue
+
+            meta = {
+                "file": self._file_index,
+                "filename": self._chunk_fn,
+                "offset": self._chunk_offset,
+            }
+            self._chunk_offset += len(c)
+
+            # zip() silently truncates ragged rows, so check their lengths first
+            width = len(self.properties)
+            for (index, row) in enumerate(c):
+                if not isinstance(row, (list, tuple)) or len(row) != width:
+                    raise ImporterError(
+                        "Unable to read file {}: Row {} should have exactly {} value(s), but got {!r}".format(
+                            self._chunk_fn, meta["offset"] + index, width, row
+                        )
+                    )
+
+            # transpose the rows into columns once, instead of once for every property
+            columns = list(zip(*c))
+
+            return {"columns": columns, "length": len(c), "meta": meta}
+
+    def _open_next_file(self) -> bool:
         """
-        Loads the next file representing a chunk from disk.
+        Starts reading the next file from disk.
+        Returns False if there are no files left.
         """
 
         # if we have no files left, bail
         if len(self._files) == 0:
-            return None
+            return False
 
         # get the next file path (and store the file path)
         data_path = self._files.popleft()
+        self._file_index += 1
         self._chunk_fn = data_path
         self._chunk_offset = 0
 
-        # read all of the data file
-        with open(data_path) as f:
-            try:
-                data = json.load(f)
-            except Exception as e:
-                raise ImporterError(
-                    "Unable to read file {}: {}".format(data_path, str(e))
-                )
+        self._rows = iter_json_rows(data_path)
+        return True
 
-        # if it is not a list, inform the user
-        if not isinstance(data, list):
+    def get_chunk_position(self, chunk: ChunkType) -> Any:
+        """
+        Returns the position in the import source directly after the given chunk.
+        """
+
+        meta = chunk["meta"]
+        return {
+            "file": meta["file"],
+            "filename": meta["filename"],
+            "offset": meta["offset"] + chunk["length"],
+        }
+
+    def seek(self, position: Any) -> None:
+        """
+        Moves the import source to a position returned by get_chunk_position.
+        """
+
+        # skip all the files before
+        if position["file"] >= len(self._files):
             raise ImporterError(
-                "Unable to import data from {}: Not a list. ".format(data_path)
+                "Unable to resume from file {}: Not given".format(position["filename"])
             )
+        for _ in range(position["file"]):
+            self._files.popleft()
+        self._file_index = position["file"] - 1
 
-        # return the data
-        return data
+        self._open_next_file()
+        if self._chunk_fn != position["filename"]:
+            raise ImporterError(
+                "Unable to resume from file {}: Got {} instead".format(
+                    position["filename"], self._chunk_fn
+                )
+            )
+
+        # skip the rows that were already imported
+        offset = position["offset"]
+        try:
+            next(islice(self._rows, offset, offset), None)
+        except Exception as e:
+            raise ImporterError(
+                "Unable to read file {}: {}".format(self._chunk_fn, str(e))
+            )
+        self._chunk_offset = offset
 
-    def get_chunk_column(self, chunk: ChunkType, property: str, idx: int) -> List[Any]:
+    def get_chunk_column(
+        self, chunk: ChunkType, property: str, idx: int
+    ) -> Sequence[Any]:
         """
         Returns an iterator for the given property of the given chunk of data.
         Should contain get_chunk_length(chunk) elements.
-        To be implemented by the subclass.
         """
 
-        return [r[idx] for r in chunk["data"]]
+        return chunk["columns"][idx]
 
     def get_chunk_length(self, chunk: ChunkType) -> int:
         """
@@ -142,4 +219,4 @@ class JSONFileImporter(DataImporter):
         but this may be overwritten by the subclass.
         """
 
-        return len(chunk["data"])
+        return chunk["length"]
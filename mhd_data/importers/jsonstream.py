@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+""" This file contains incremental readers for (possibly compressed) json data files """
+import gzip
+import io
+import json
+import re
+
+import ujson
+
+try:
+    import zstandard
+except ImportError:  # zstd support is optional
+    zstandard = None
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Iterator, Optional, TextIO
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# extensions of compressed files, and of files containing JSON Lines
+COMPRESSED_EXTENSIONS = (".gz", ".zst", ".zstd")
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# characters that may end an element of an array, and strings (which may contain them)
+_STRUCTURE = re.compile(r'[\[\]{},"]')
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+
+
+class JSONStreamError(ValueError):
+    """Raised when a data file is not valid json"""
+
+    pass
+
+
+def open_json_file(path: str) -> TextIO:
+    """Opens a (possibly gzip or zstd compressed) file for reading text"""
+
+    with open(path, "rb") as f:
+        magic = f.read(4)
+
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.open(path, "rt", encoding="utf-8")
+
+    if magic == ZSTD_MAGIC:
+        if zstandard is None:
+            raise JSONStreamError(
+                "Reading zstd compressed files requires the 'zstandard' package"
+            )
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"), closefd=True
+        )
+        return io.TextIOWrapper(reader, encoding="utf-8")
+
+    return open(path, "r", encoding="utf-8")
+
+
+def is_json_lines(path: str) -> bool:
+    """Checks if a path refers to a JSON Lines file, by looking at the extension"""
+
+    name = path.lower()
+    for ext in COMPRESSED_EXTENSIONS:
+        if name.endswith(ext):
+            name = name[: -len(ext)]
+            break
+
+    return name.endswith(JSON_LINES_EXTENSIONS)
+
+
+def iter_json_rows(path: str, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[Any]:
+    """
+    Iterates over the rows of a data file without loading it entirely.
+    The file either contains a top-level json array, or (when it has a .jsonl or .ndjson extension) one json value per line.
+    """
+
+    with open_json_file(path) as f:
+        if is_json_lines(path):
+            yield from iter_json_lines(f)
+        else:
+            yield from JSONArrayReader(f, block_size=block_size)
+
+
+def iter_json_lines(stream: TextIO) -> Iterator[Any]:
+    """Iterates over the values in a stream of JSON Lines, skipping empty lines"""
+
+    for (no, line) in enumerate(stream, start=1):
+        line = line.strip()
+        if line == "":
+            continue
+
+        try:
+            yield _loads(line)
+        except ValueError as e:
+            raise JSONStreamError("Line {}: {}".format(no, str(e)))
+
+
+def _loads(text: str) -> Any:
+    """Decodes a json value using ujson, falling back to json for values ujson does not support"""
+
+    try:
+        return ujson.loads(text)
+    except ValueError as e:
+        error = e
+
+    # ujson does not support everything (e.g. integers larger than 64 bits)
+    try:
+        return json.loads(text)
+    except ValueError:
+        raise error
+
+
+class JSONArrayReader(object):
+    """
+    Incrementally reads the elements of a top-level json array from a text stream.
+    Only holds (at least) block_size characters and the element being read in memory.
+
+    The end of each element is found by scanning for brackets and commas outside of strings,
+    after which the element is decoded using ujson (falling back to json for values ujson does
+    not support, such as very large integers). Invalid elements raise as soon as they are read.
+    """
+
+    stream: TextIO
+    block_size: int
+
+    def __init__(self, stream: TextIO, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.stream = stream
+        self.block_size = block_size
+
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._index = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+        else:
+            while True:
+                yield self._value()
+                self._index += 1
+                if self._expect(",]") == "]":
+                    break
+
+        if self._peek() != "":
+            raise JSONStreamError("Unexpected data after the top-level array")
+
+    def _fill(self) -> bool:
+        """Reads more data into the buffer, returns False at the end of the stream"""
+
+        if self._eof:
+            return False
+
+        # read at least as much as is left, so that large values are not scanned too often
+        data = self.stream.read(max(self.block_size, len(self._buffer) - self._pos))
+        if not data:
+            self._eof = True
+            return False
+
+        self._buffer = self._buffer[self._pos :] + data
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skips whitespace and returns the next character, or "" at the end of the stream"""
+
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        """Reads one of chars (after skipping whitespace) and returns it"""
+
+        c = self._peek()
+        if c == "" or c not in chars:
+            raise JSONStreamError(
+                "Element {}: Expected one of {!r}, but got {!r}".format(
+                    self._index, list(chars), c or "EOF"
+                )
+            )
+
+        self._pos += 1
+        return c
+
+    def _end(self) -> Optional[int]:
+        """Finds the end of the element starting at the current position, or None if it is not in the buffer"""
+
+        buffer = self._buffer
+        depth = 0
+        pos = self._pos
+        while True:
+            match = _STRUCTURE.search(buffer, pos)
+            if match is None:
+                return None
+            pos = match.start()
+
+            c = buffer[pos]
+            if c == '"':
+                string = _STRING.match(buffer, pos)
+                if string is None:
+                    return None
+                pos = string.end()
+                continue
+
+            if c in "[{":
+                depth += 1
+            elif depth == 0:
+                return pos
+            elif c in "]}":
+                depth -= 1
+            pos += 1
+
+    def _value(self) -> Any:
+        """Reads the next json value"""
+
+        self._peek()
+        while True:
+            end = self._end()
+            if end is not None:
+                break
+            if not self._fill():
+                raise JSONStreamError(
+                    "Element {}: Unexpected end of file".format(self._index)
+                )
+
+        text = self._buffer[self._pos : end].rstrip(" \t\n\r")
+        self._pos = end
+
+        try:
+            return _loads(text)
+        except ValueError as e:
+            raise JSONStreamError("Element {}: {}".format(self._index, str(e)))
+
+
+__all__ = [
+    "JSONStreamError",
+    "JSONArrayReader",
+    "open_json_file",
+    "is_json_lines",
+    "iter_json_rows",
+    "iter_json_lines",
+]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import queue
+import threading
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterator, Optional
+    from logging import Logger
+
+
+class PipelineStats(object):
+    """
+    Collects the number of rows handled by, and the time spent in, each stage of an import.
+    Stages may be running concurrently, so the stage with the lowest throughput is the bottleneck.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.stages: dict[str, list[float]] = {}
+
+    def add(self, stage: str, rows: int, seconds: float) -> None:
+        """Records that the given stage handled rows in seconds"""
+
+        with self._lock:
+            totals = self.stages.setdefault(stage, [0, 0.0])
+            totals[0] += rows
+            totals[1] += seconds
+
+    def report(self, logger: Logger) -> None:
+        """Logs the throughput of each stage"""
+
+        for (stage, (rows, seconds)) in self.stages.items():
+            logger.info(
+                "Stage {!r}: {} row(s) in {:.2f} second(s): {:.0f} row(s)/second".format(
+                    stage, int(rows), seconds, rows / seconds if seconds > 0 else 0
+                )
+            )
+
+
+def read_ahead(produce: Callable[[], Optional[Any]], depth: int) -> Iterator[Any]:
+    """
+    Iterates over the results of produce() until it returns None.
+    produce() is called in a background thread, which stays at most depth results ahead.
+    """
+
+    results: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(result: Any) -> bool:
+        # give up when the consumer is gone
+        while not stop.is_set():
+            try:
+                results.put(result, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def run() -> None:
+        try:
+            while True:
+                result = produce()
+                if not put((result, None)) or result is None:
+                    return
+        except BaseException as e:
+            put((None, e))
+
+    thread = threading.Thread(target=run, daemon=True, name="mhd-read-ahead")
+    thread.start()
+
+    try:
+        while True:
+            (result, error) = results.get()
+            if error is not None:
+                raise error
+            if result is None:
+                return
+            yield result
+    finally:
+        stop.set()
+        thread.join()
+
+
+__all__ = ["PipelineStats", "read_ahead"]
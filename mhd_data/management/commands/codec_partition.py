@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from mhd.utils import with_simulate_arg
+
+from django.core.management.base import BaseCommand, CommandError
+
+import logging
+
+from ...partitions import CodecPartitions, PartitioningError
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any
+    from argparse import ArgumentParser
+
+
+class Command(BaseCommand):
+    help = "Manages partitioning of codec tables by property (postgres only). "
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument(
+            "codecs",
+            nargs="*",
+            help="Names of codecs to manage. Defaults to all codecs. ",
+        )
+        parser.add_argument(
+            "--quiet",
+            "-q",
+            action="store_true",
+            help="Do not produce any output in case of success",
+        )
+        parser.add_argument(
+            "--simulate",
+            "-s",
+            action="store_true",
+            help="Simulate all database operations by wrapping them in a transaction and rolling it back at the end of the command. ",
+        )
+
+        modes = parser.add_mutually_exclusive_group(required=True)
+        modes.add_argument(
+            "--enable",
+            "-e",
+            action="store_true",
+            help="Partitions the codec tables by property, keeping all values. Locks the tables while running. ",
+        )
+        modes.add_argument(
+            "--inspect",
+            "-i",
+            action="store_true",
+            help="Shows which codec tables are partitioned",
+        )
+
+    @with_simulate_arg
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        logger = logging.getLogger("mhd.codecpartitions")
+        logger.setLevel(logging.WARN if kwargs["quiet"] else logging.DEBUG)
+
+        partitions = CodecPartitions(quiet=kwargs["quiet"])
+        try:
+            codecs = partitions.codecs(kwargs["codecs"] or None)
+        except PartitioningError as e:
+            raise CommandError(str(e))
+
+        if kwargs["inspect"]:
+            for codec in codecs:
+                logger.info(
+                    "Codec {}: Table {!r} is {}".format(
+                        codec.get_codec_name(),
+                        codec._meta.db_table,
+                        "partitioned"
+                        if partitions.is_partitioned(codec)
+                        else "not partitioned",
+                    )
+                )
+            return
+
+        if not partitions.supported():
+            raise CommandError("Partitioning codec tables requires postgres 11+")
+
+        for codec in codecs:
+            if not partitions.partition_table(codec):
+                logger.info(
+                    "Codec {}: Table {!r} is already partitioned".format(
+                        codec.get_codec_name(), codec._meta.db_table
+                    )
+                )
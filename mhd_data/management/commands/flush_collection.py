@@ -17,6 +17,19 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser: ArgumentParser) -> None:
         parser.add_argument("slug", help="Slug of collection to flush")
+        parser.add_argument(
+            "--batch-size",
+            "-b",
+            type=int,
+            default=None,
+            help="Remove items in batches of the given size, each in it's own transaction. By default, everything is removed in a single transaction. ",
+        )
+        parser.add_argument(
+            "--quiet",
+            "-q",
+            action="store_true",
+            help="Do not produce any output in case of success",
+        )
         parser.add_argument(
             "--simulate",
             "-s",
@@ -24,7 +37,13 @@ class Command(BaseCommand):
             help="Simulate all database operations by wrapping them in a transaction and rolling it back at the end of the command. ",
         )
 
-    @with_simulate_arg
     def handle(self, *args: Any, **kwargs: Any) -> None:
+        # batches are committed one at a time
+        if kwargs["batch_size"] is None or kwargs["simulate"]:
+            with_simulate_arg(self._handle)(*args, **kwargs)
+        else:
+            self._handle(*args, **kwargs)
+
+    def _handle(self, *args: Any, **kwargs: Any) -> None:
         collection = Collection.objects.get(slug=kwargs["slug"])
-        collection.flush()
+        collection.flush(batch_size=kwargs["batch_size"], quiet=kwargs["quiet"])
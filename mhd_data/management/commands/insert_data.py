@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 from mhd.utils import with_simulate_arg
 from mhd_data.importers import JSONFileImporter
@@ -67,13 +67,63 @@ class Command(BaseCommand):
             default=None,
             help="When set, instead of batch inserting data write output to the given path. ",
         )
+        parser.add_argument(
+            "--parallel",
+            "-j",
+            type=int,
+            default=1,
+            help="Number of properties to import in parallel. When larger than 1 (and not simulating), data is not inserted in a single transaction, so a failed import is not rolled back. ",
+        )
+        parser.add_argument(
+            "--time-ordered-ids",
+            action="store_true",
+            help="Use time-ordered (version 7) UUIDs for new items and values. ",
+        )
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            help="Drop indexes on the affected tables before inserting data, and rebuild them afterwards (postgres only). Requires a non-atomic import (using --parallel or --checkpoint), because dropping indexes locks the tables until the transaction commits. ",
+        )
+        parser.add_argument(
+            "--pipeline",
+            type=int,
+            default=0,
+            help="Number of chunks to read ahead (and, with --parallel, to send to the database) while importing. ",
+        )
+        parser.add_argument(
+            "--trust-input",
+            action="store_true",
+            help="Do not validate the elements of array values, because the input is trusted. ",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            type=str,
+            default=None,
+            help="Commit after each chunk, recording progress under the given name. When an import with this name was interrupted, resume it. ",
+        )
 
         parser.add_argument(
-            "data", nargs="+", help=".json file containing 2-dimensional value array"
+            "data", nargs="+", help=".json file containing 2-dimensional value array, or .jsonl file containing one row per line (optionally gzip or zstd compressed)"
         )
 
-    @with_simulate_arg
     def handle(self, *args: Any, **kwargs: Any) -> None:
+        # parallel imports use multiple connections, which can not share a transaction
+        # and checkpointed imports commit every chunk
+        atomic = kwargs["parallel"] <= 1 and kwargs["checkpoint"] is None
+
+        # dropped indexes would stay locked (ACCESS EXCLUSIVE) until the transaction commits
+        if kwargs["defer_indexes"] and (atomic or kwargs["simulate"]):
+            raise CommandError(
+                "--defer-indexes requires a non-atomic import, use --parallel or --checkpoint"
+            )
+
+        if not atomic and not kwargs["simulate"]:
+            kwargs.pop("simulate")
+            return self._handle(*args, **kwargs)
+
+        return with_simulate_arg(self._handle)(*args, **kwargs)
+
+    def _handle(self, *args: Any, **kwargs: Any) -> None:
         importer = JSONFileImporter(
             kwargs["collection"],
             kwargs["fields"].strip().split(","),
@@ -83,5 +133,11 @@ class Command(BaseCommand):
             kwargs["batch_size"],
             kwargs["chunk_size"],
             kwargs["write_sql"],
+            kwargs["parallel"],
+            kwargs["time_ordered_ids"],
+            kwargs["defer_indexes"],
+            kwargs["checkpoint"],
+            kwargs["pipeline"],
+            not kwargs["trust_input"],
         )
         importer(update=False)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.core.management import call_command
 
 from mhd.utils import with_simulate_arg
@@ -20,7 +20,7 @@ class Command(BaseCommand):
     def add_arguments(self, parser: ArgumentParser) -> None:
         parser.add_argument("schema", help=".json file containing collection schema")
         parser.add_argument(
-            "data", nargs="+", help=".json file containing 2-dimensional value array"
+            "data", nargs="+", help=".json file containing 2-dimensional value array, or .jsonl file containing one row per line (optionally gzip or zstd compressed)"
         )
         parser.add_argument(
             "provenance", help=".json file containing provenance to insert"
@@ -59,9 +59,50 @@ class Command(BaseCommand):
             default=None,
             help="When set, instead of batch inserting data write output to the given path. ",
         )
+        parser.add_argument(
+            "--parallel",
+            "-j",
+            type=int,
+            default=1,
+            help="Number of properties to import in parallel. When larger than 1 (and not simulating), data is not inserted in a single transaction, so a failed import is not rolled back. ",
+        )
+        parser.add_argument(
+            "--time-ordered-ids",
+            action="store_true",
+            help="Use time-ordered (version 7) UUIDs for new items and values. ",
+        )
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            help="Drop indexes on the affected tables before inserting data, and rebuild them afterwards (postgres only). Requires a non-atomic import (using --parallel), because dropping indexes locks the tables until the transaction commits. ",
+        )
+        parser.add_argument(
+            "--pipeline",
+            type=int,
+            default=0,
+            help="Number of chunks to read ahead (and, with --parallel, to send to the database) while importing. ",
+        )
+        parser.add_argument(
+            "--trust-input",
+            action="store_true",
+            help="Do not validate the elements of array values, because the input is trusted. ",
+        )
 
-    @with_simulate_arg
     def handle(self, *args: Any, **kwargs: Any) -> None:
+        # parallel imports use multiple connections, which can not share a transaction
+        atomic = kwargs["parallel"] <= 1
+
+        # dropped indexes would stay locked (ACCESS EXCLUSIVE) until the transaction commits
+        if kwargs["defer_indexes"] and (atomic or kwargs["simulate"]):
+            raise CommandError("--defer-indexes requires a non-atomic import, use --parallel")
+
+        if not atomic and not kwargs["simulate"]:
+            kwargs.pop("simulate")
+            return self._handle(*args, **kwargs)
+
+        return with_simulate_arg(self._handle)(*args, **kwargs)
+
+    def _handle(self, *args: Any, **kwargs: Any) -> None:
         call_command(
             "upsert_collection", kwargs["schema"], update=False, quiet=kwargs["quiet"]
         )
@@ -83,4 +124,9 @@ class Command(BaseCommand):
             batch_size=kwargs["batch_size"],
             chunk_size=kwargs["chunk_size"],
             write_sql=kwargs["write_sql"],
+            parallel=kwargs["parallel"],
+            time_ordered_ids=kwargs["time_ordered_ids"],
+            defer_indexes=kwargs["defer_indexes"],
+            pipeline=kwargs["pipeline"],
+            trust_input=kwargs["trust_input"],
         )
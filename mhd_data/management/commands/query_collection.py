@@ -5,12 +5,14 @@ import json
 from django.core.management.base import BaseCommand
 import argparse
 from mhd_schema.models import Collection
+from mhd_data.models import SemanticItemSerializer
 
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Any
+    from typing import Any, Optional
     from argparse import ArgumentParser
+    from mhd_schema.models import Property
 
 
 def nonnegative(value: Any) -> int:
@@ -63,6 +65,13 @@ class Command(BaseCommand):
             default=10,
             help="Maximum number of results to return",
         )
+        parser.add_argument(
+            "--itersize",
+            "-i",
+            type=nonnegative,
+            default=None,
+            help="Fetch results using a server-side cursor, this many at a time. Use --limit 0 to return all results. ",
+        )
 
     def handle(self, *args: Any, **kwargs: Any) -> None:
         # find collection
@@ -75,12 +84,17 @@ class Command(BaseCommand):
         # get all the properties
         properties = None
         if kwargs["properties"]:
-            properties = map(
-                lambda p: collection.get_property("p"), kwargs["properties"].split(",")
-            )
+            properties = [
+                collection.get_property(p) for p in kwargs["properties"].split(",")
+            ]
+
+        if kwargs["itersize"] and not kwargs["count"] and not kwargs["sql"]:
+            self.handle_iterate(collection, properties, kwargs)
+            return
 
         if not kwargs["count"]:
             qset, props = collection.query(
+                properties=properties,
                 offset=kwargs["offset"],
                 limit=kwargs["limit"],
                 filter=kwargs["filter"],
@@ -94,7 +108,30 @@ class Command(BaseCommand):
             return
 
         if not kwargs["count"]:
-            results = [result.semantic_result(collection, props) for result in qset]
+            serializer = SemanticItemSerializer(collection=collection, properties=props)
+            results = [serializer.to_representation(result) for result in qset]
         else:
             results = qset.fetchone()[0]
         print(json.dumps(results, indent=4))
+
+    def handle_iterate(
+        self,
+        collection: Collection,
+        properties: Optional[list[Property]],
+        kwargs: dict[str, Any],
+    ) -> None:
+        """Prints results as they are fetched from a server-side cursor"""
+
+        results = collection.semantic(
+            properties=properties,
+            offset=kwargs["offset"] or None,
+            limit=kwargs["limit"] or None,
+            filter=kwargs["filter"],
+            order=kwargs["order"],
+            itersize=kwargs["itersize"],
+        )
+
+        self.stdout.write("[")
+        for i, result in enumerate(results):
+            self.stdout.write(("," if i > 0 else "") + json.dumps(result, indent=4))
+        self.stdout.write("]")
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.20 on 2026-10-18 00:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mhd_provenance', '0002_alter_provenance_metadata'),
+        ('mhd_schema', '0016_collection_schema_version'),
+        ('mhd_data', '0006_auto_20221011_0857'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.SlugField(help_text='Name of the import this checkpoint belongs to', unique=True)),
+                ('position', models.JSONField(blank=True, help_text='Position in the input after the last committed chunk', null=True)),
+                ('chunks', models.PositiveIntegerField(default=0, help_text='Number of committed chunks')),
+                ('items', models.PositiveBigIntegerField(default=0, help_text='Number of committed items')),
+                ('finished', models.BooleanField(default=False, help_text='Has the import finished?')),
+                ('updated', models.DateTimeField(auto_now=True, help_text='Time of the last committed chunk')),
+                ('collection', models.ForeignKey(help_text='Collection data is imported into', on_delete=django.db.models.deletion.CASCADE, to='mhd_schema.collection')),
+                ('provenance', models.ForeignKey(help_text='Provenance of the imported data', on_delete=django.db.models.deletion.CASCADE, to='mhd_provenance.provenance')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.20 on 2026-10-18 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mhd_data', '0007_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importcheckpoint',
+            name='properties',
+            field=models.JSONField(default=list, help_text='Slugs of the imported properties, in the order of the input columns'),
+        ),
+    ]
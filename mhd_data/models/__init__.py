@@ -1,6 +1,9 @@
 # Items are defined here
 from .item import Item, SemanticItemSerializer
 
+# Progress of checkpointed imports
+from .checkpoint import ImportCheckpoint
+
 # Codec and all the codecs
 from .codec import Codec, CodecManager
 
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from django.db import models
+
+from mhd_provenance.models import Provenance
+from mhd_schema.models import Collection
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any
+    from datetime import datetime
+
+
+class ImportCheckpoint(models.Model):
+    """Records the progress of a checkpointed data import, so that it can be resumed"""
+
+    name: str = models.SlugField(
+        unique=True, help_text="Name of the import this checkpoint belongs to"
+    )
+
+    collection: Collection = models.ForeignKey(
+        Collection,
+        on_delete=models.CASCADE,
+        help_text="Collection data is imported into",
+    )
+    provenance: Provenance = models.ForeignKey(
+        Provenance,
+        on_delete=models.CASCADE,
+        help_text="Provenance of the imported data",
+    )
+
+    properties: list[str] = models.JSONField(
+        default=list,
+        help_text="Slugs of the imported properties, in the order of the input columns",
+    )
+
+    position: Any = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Position in the input after the last committed chunk",
+    )
+    chunks: int = models.PositiveIntegerField(
+        default=0, help_text="Number of committed chunks"
+    )
+    items: int = models.PositiveBigIntegerField(
+        default=0, help_text="Number of committed items"
+    )
+    finished: bool = models.BooleanField(
+        default=False, help_text="Has the import finished?"
+    )
+
+    updated: datetime = models.DateTimeField(
+        auto_now=True, help_text="Time of the last committed chunk"
+    )
+
+    def __str__(self) -> str:
+        return "ImportCheckpoint {0!r} ({1} chunk(s))".format(self.name, self.chunks)
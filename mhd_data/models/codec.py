@@ -9,6 +9,7 @@ from mhd_schema.models import Property
 from mhd.utils import uuid4, memoized_method
 
 from .item import Item
+from ..fields.ndarray import NDArrayValidator
 
 from functools import lru_cache
 
@@ -24,6 +25,7 @@ from typing import (
     List,
     Union,
     Tuple,
+    Callable,
 )
 
 if TYPE_CHECKING:
@@ -37,6 +39,28 @@ if TYPE_CHECKING:
     SQLWithParams: TypeAlias = tuple[SQL, list[int | str]]
 
 
+def identity_fast_path(typ: type, convert: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """
+    Returns a converter that returns values of exactly type typ unchanged,
+    and calls convert on all other values.
+    """
+
+    return lambda value: value if type(value) is typ else convert(value)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _populate_row(populate: Callable[..., Any], row: int, *values: Any) -> Any:
+    """Calls populate on values, and adds the row to any errors"""
+
+    try:
+        return populate(*values)
+    except Exception as e:
+        raise ValueError("Invalid value in row {}: {}".format(row, e)) from e
+
+
 class CodecManager(models.Manager):
     @staticmethod
     @lru_cache(maxsize=None)
@@ -128,12 +152,7 @@ class Codec(models.Model):
         into a python object to be assigned to a property.
         """
 
-        sfields = cls.get_serializer_fields()
-
-        return [
-            None if (value is None) else sfield.to_internal_value(value)
-            for (value, sfield) in zip(values, sfields)
-        ]
+        return cls.get_value_populator()(*values)
 
     @classmethod
     def serialize_values(
@@ -144,29 +163,208 @@ class Codec(models.Model):
         value of this codec into a json-serialized value of this codec.
         """
 
-        vfields = cls.get_value_fields()
-        sfields = cls.get_serializer_fields()
-        results = [None] * len(vfields)
+        return cls.get_value_serializer(database)(*values)
+
+    # Converting values happens for every single cell during import and export.
+    # To make this fast, converters for each value field are compiled only once.
+    # Subclasses may override compile_populate and compile_serialize with
+    # specialized converters, see e.g. StandardInt.
+
+    @classmethod
+    def compile_populate(
+        cls: Type[Codec], vfield: Field, sfield: SerializerField
+    ) -> Callable[[Any], Any]:
+        """Returns a function populating a single (non-None) value of vfield"""
+
+        # n-dimensional arrays are validated as a whole
+        validator = getattr(vfield, "validator", None)
+        if isinstance(validator, NDArrayValidator):
+            return validator
+
+        return sfield.to_internal_value
+
+    @classmethod
+    def compile_populate_trusted(
+        cls: Type[Codec], vfield: Field, sfield: SerializerField
+    ) -> Callable[[Any], Any]:
+        """
+        Returns a function populating a single (non-None) value of vfield from trusted input.
+        By default, this skips validating n-dimensional arrays.
+        """
+
+        if isinstance(getattr(vfield, "validator", None), NDArrayValidator):
+            return _identity
 
-        defined = False
-        for i, (vfield, sfield, value) in enumerate(zip(vfields, sfields, values)):
-            if value is None:
-                continue
-            defined = True
+        return cls.compile_populate(vfield, sfield)
 
-            # if the value field has a 'from_db_value' we should call it first
-            # because our value was not yet parsed
-            if database and hasattr(vfield, "from_db_value"):
-                value = vfield.from_db_value(value, None, connection=connection)
+    @classmethod
+    def compile_serialize(
+        cls: Type[Codec], vfield: Field, sfield: SerializerField, database: bool
+    ) -> Callable[[Any], Any]:
+        """Returns a function serializing a single (non-None) value of vfield"""
+
+        # if the value field has a 'from_db_value' we should call it first
+        # because our value was not yet parsed
+        if database and hasattr(vfield, "from_db_value"):
+            from_db_value = vfield.from_db_value
+            to_representation = sfield.to_representation
+            return lambda value: to_representation(
+                from_db_value(value, None, connection=connection)
+            )
 
-            # call the default serializer field with .to_representation
-            results[i] = sfield.to_representation(value)
+        # call the default serializer field with .to_representation
+        return sfield.to_representation
 
-        # if all values are None, return None!
-        if not defined:
-            return None
+    @classmethod
+    @memoized_method(maxsize=None)
+    def get_populate_converters(
+        cls: Type[Codec], validate: bool = True
+    ) -> List[Callable[[Any], Any]]:
+        """
+        Returns the compiled populate converters for each value field.
+        When validate is False, input is trusted (see compile_populate_trusted).
+        """
+
+        compile = cls.compile_populate if validate else cls.compile_populate_trusted
+        return [
+            compile(vfield, sfield)
+            for (vfield, sfield) in zip(
+                cls.get_value_fields(), cls.get_serializer_fields()
+            )
+        ]
+
+    @classmethod
+    @memoized_method(maxsize=None)
+    def get_serialize_converters(
+        cls: Type[Codec], database: bool = True
+    ) -> List[Callable[[Any], Any]]:
+        """Returns the compiled serialize converters for each value field"""
 
-        return results
+        return [
+            cls.compile_serialize(vfield, sfield, database)
+            for (vfield, sfield) in zip(
+                cls.get_value_fields(), cls.get_serializer_fields()
+            )
+        ]
+
+    @classmethod
+    def _overrides(cls: Type[Codec], name: str) -> bool:
+        """Checks if this codec overrides the given classmethod of Codec"""
+
+        return getattr(cls, name).__func__ is not getattr(Codec, name).__func__
+
+    @classmethod
+    @memoized_method(maxsize=None)
+    def get_value_populator(
+        cls: Type[Codec], validate: bool = True
+    ) -> Callable[..., List[Any]]:
+        """Returns a function equivalent to calling populate_values"""
+
+        # a subclass might have overwritten populate_values
+        if cls._overrides("populate_values"):
+            return lambda *values: cls.populate_values(*values)
+
+        converters = cls.get_populate_converters(validate)
+        if len(converters) == 1:
+            convert = converters[0]
+            return lambda value: [None if value is None else convert(value)]
+
+        return lambda *values: [
+            None if value is None else convert(value)
+            for (convert, value) in zip(converters, values)
+        ]
+
+    @classmethod
+    @memoized_method(maxsize=None)
+    def get_value_serializer(
+        cls: Type[Codec], database: bool = True
+    ) -> Callable[..., Optional[List[Any]]]:
+        """
+        Returns a function equivalent to calling serialize_values with the given
+        database parameter.
+        """
+
+        # a subclass might have overwritten serialize_values
+        if cls._overrides("serialize_values"):
+            return lambda *values: cls.serialize_values(*values, database=database)
+
+        converters = cls.get_serialize_converters(database)
+        if len(converters) == 1:
+            convert = converters[0]
+            return lambda value: None if value is None else [convert(value)]
+
+        def serialize(*values: Any) -> Optional[List[Any]]:
+            # if all values are None, return None!
+            if all(value is None for value in values):
+                return None
+
+            return [
+                None if value is None else convert(value)
+                for (convert, value) in zip(converters, values)
+            ]
+
+        return serialize
+
+    @classmethod
+    def populate_column(
+        cls: Type[Codec], column: Iterable[Any], validate: bool = True
+    ) -> List[List[Any]]:
+        """
+        Populates an entire column of serialized values at once.
+        For codecs with a single value field, each cell is a single value.
+        Otherwise each cell is a list of values, or None.
+        Returns a list containing a list of populated values for each value field.
+        When validate is False, input is trusted (see compile_populate_trusted).
+        Errors point to the row of the column they occured in.
+        """
+
+        if len(cls.value_fields) == 1 and not cls._overrides("populate_values"):
+            column = column if isinstance(column, (list, tuple)) else list(column)
+            convert = cls.get_populate_converters(validate)[0]
+            try:
+                return [
+                    [None if value is None else convert(value) for value in column]
+                ]
+            except Exception:
+                # find the row that failed (and raise an appropriate error)
+                for (row, value) in enumerate(column):
+                    if value is not None:
+                        _populate_row(convert, row, value)
+                raise
+
+        populate = cls.get_value_populator(validate)
+        empty = [None] * len(cls.value_fields)
+        lift = (
+            (lambda v: [v])
+            if len(cls.value_fields) == 1
+            else (lambda v: v if (v is not None) else empty)
+        )
+
+        columns: List[List[Any]] = [[] for _ in cls.value_fields]
+        for (row, value) in enumerate(column):
+            values = _populate_row(populate, row, *lift(value))
+            for (c, v) in zip(columns, values):
+                c.append(v)
+        return columns
+
+    @classmethod
+    def serialize_column(
+        cls: Type[Codec], *columns: List[Any], database: bool = True
+    ) -> List[Optional[Any]]:
+        """
+        Serializes entire columns of values at once, one column per value field.
+        Returns a list of serialized cells, as in the semantic representation of items.
+        """
+
+        if len(columns) == 1 and not cls._overrides("serialize_values"):
+            convert = cls.get_serialize_converters(database)[0]
+            return [None if value is None else convert(value) for value in columns[0]]
+
+        serialize = cls.get_value_serializer(database)
+        return [
+            values[0] if values is not None and len(values) == 1 else values
+            for values in (serialize(*cell) for cell in zip(*columns))
+        ]
 
     @classmethod
     def serialize_value(
@@ -2,7 +2,14 @@ from __future__ import annotations
 
 from django.db import models
 
-from ..codec import Codec
+from ..codec import Codec, identity_fast_path
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable
+    from django.db.models import Field
+    from rest_framework.serializers import Field as SerializerField
 
 
 class StandardBool(Codec):
@@ -12,3 +19,17 @@ class StandardBool(Codec):
 
     operators = ("=", "!=")
     operator_type = bool
+
+    @classmethod
+    def compile_populate(
+        cls, vfield: Field, sfield: SerializerField
+    ) -> Callable[[Any], Any]:
+        return identity_fast_path(bool, super().compile_populate(vfield, sfield))
+
+    @classmethod
+    def compile_serialize(
+        cls, vfield: Field, sfield: SerializerField, database: bool
+    ) -> Callable[[Any], Any]:
+        return identity_fast_path(
+            bool, super().compile_serialize(vfield, sfield, database)
+        )
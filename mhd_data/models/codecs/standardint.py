@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from django.db import models
 
-from ..codec import Codec
+from ..codec import Codec, identity_fast_path
 
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
@@ -10,7 +10,9 @@ from rest_framework.exceptions import ValidationError
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Any
+    from typing import Any, Callable
+    from django.db.models import Field
+    from rest_framework.serializers import Field as SerializerField
 
 
 class StandardInt(Codec):
@@ -30,3 +32,17 @@ class StandardInt(Codec):
             return False
 
         return isinstance(literal, int) and not isinstance(literal, bool)
+
+    @classmethod
+    def compile_populate(
+        cls, vfield: Field, sfield: SerializerField
+    ) -> Callable[[Any], Any]:
+        return identity_fast_path(int, super().compile_populate(vfield, sfield))
+
+    @classmethod
+    def compile_serialize(
+        cls, vfield: Field, sfield: SerializerField, database: bool
+    ) -> Callable[[Any], Any]:
+        return identity_fast_path(
+            int, super().compile_serialize(vfield, sfield, database)
+        )
@@ -2,7 +2,14 @@ from __future__ import annotations
 
 from django.db import models
 
-from ..codec import Codec
+from ..codec import Codec, identity_fast_path
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable
+    from django.db.models import Field
+    from rest_framework.serializers import Field as SerializerField
 
 
 class StandardString(Codec):
@@ -12,3 +19,19 @@ class StandardString(Codec):
 
     operators = ("=", "!=")
     operator_type = (str,)
+
+    @classmethod
+    def compile_populate(
+        cls, vfield: Field, sfield: SerializerField
+    ) -> Callable[[Any], Any]:
+        # strings only need to be stripped, like the serializer field does
+        convert = super().compile_populate(vfield, sfield)
+        return lambda value: value.strip() if type(value) is str else convert(value)
+
+    @classmethod
+    def compile_serialize(
+        cls, vfield: Field, sfield: SerializerField, database: bool
+    ) -> Callable[[Any], Any]:
+        return identity_fast_path(
+            str, super().compile_serialize(vfield, sfield, database)
+        )
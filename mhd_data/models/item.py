@@ -12,7 +12,7 @@ from typing import TYPE_CHECKING
 
 
 if TYPE_CHECKING:
-    from typing import Optional, List, Any, Iterable
+    from typing import Optional, List, Any, Iterable, Callable
     from uuid import UUID
     from mhd_schema.models import Property
 
@@ -59,7 +59,7 @@ class Item(models.Model):
         and returns an appropriate annotation.
         """
 
-        properties = list(collection.property_set.order_by("id"))
+        properties = collection.properties()
         for p in properties:
             self._annotate_property(p)
 
@@ -82,6 +82,10 @@ class Item(models.Model):
         ).to_representation(self)
 
 
+# converts a database id value into a uuid
+_item_id = Item._meta.pk.to_python
+
+
 class ItemCollectionAssociation(models.Model):
     """Explicit association between items and collections"""
 
@@ -97,31 +101,75 @@ class ItemCollectionAssociation(models.Model):
 
 
 class SemanticItemSerializer(serializers.Serializer):
+    """
+    Serializes query results of a collection.
+    Results may either be Item instances (with annotated property values) or plain
+    tuples as returned by Collection.query(rows=True).
+    In the latter case, properties must be given in the order they were queried in.
+    """
+
     collection: Collection
     database: bool
     properties: Iterable[Property]
 
+    # precomputed (slug, serialize, value attribute names, row slice) for each property
+    _columns: List[tuple[str, Callable[..., Any], List[str], slice]]
+
     def __init__(self, *args: Any, database: bool = True, **kwargs: Any) -> None:
+        from mhd_schema.query import QueryBuilder  # lazy to avoid cyclic import
+
         self.collection = kwargs.pop("collection")
         self.database = database
-        self.properties = sorted(kwargs.pop("properties"), key=lambda p: p.slug)
+        properties = list(kwargs.pop("properties"))
+
+        # find the row columns of each property: (id, values..., cid, values..., cid, ...)
+        slices = {}
+        index = 1
+        for p in properties:
+            count = len(p.codec_model.value_fields)
+            slices[p.pk] = slice(index, index + count)
+            index += count + 1
+
+        self.properties = sorted(properties, key=lambda p: p.slug)
+
+        self._columns = []
+        for p in self.properties:
+            codec_model = p.codec_model
+            self._columns.append(
+                (
+                    p.slug,
+                    codec_model.get_value_serializer(database),
+                    [
+                        QueryBuilder._prop_value(p, i, sql=False)
+                        for i in range(len(codec_model.value_fields))
+                    ],
+                    slices[p.pk],
+                )
+            )
 
         super().__init__(*args, **kwargs)
 
-    def to_representation(self, item: Item) -> OrderedDict:
-        from mhd_schema.query import QueryBuilder  # lazy to avoid cyclic import
+    def to_representation(self, item: Item | tuple[Any, ...]) -> OrderedDict:
+        if isinstance(item, tuple):
+            return self.decode_row(item)
 
         semantic = OrderedDict()
         semantic["_id"] = str(item.pk)
-        for p in self.properties:
-            values = p.codec_model.serialize_values(
-                *[
-                    getattr(item, QueryBuilder._prop_value(p, i, sql=False))
-                    for i in range(len(p.codec_model.get_value_fields()))
-                ],
-                database=self.database,
+        for slug, serialize, attrs, _ in self._columns:
+            values = serialize(*[getattr(item, attr) for attr in attrs])
+            semantic[slug] = (
+                values[0] if values is not None and len(values) == 1 else values
             )
-            semantic[p.slug] = (
+        return semantic
+
+    def decode_row(self, row: tuple[Any, ...]) -> OrderedDict:
+        """Serializes a plain row as returned by Collection.query(rows=True)"""
+
+        semantic = OrderedDict()
+        semantic["_id"] = str(_item_id(row[0]))
+        for slug, serialize, _, columns in self._columns:
+            values = serialize(*row[columns])
+            semantic[slug] = (
                 values[0] if values is not None and len(values) == 1 else values
             )
         return semantic
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+""" This file contains the (optional) partitioning of codec tables by property """
+import logging
+
+from django.db import connection
+
+from mhd_data.models import CodecManager, Item
+from mhd_schema.models import Property
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Iterable, Optional, Type
+    from mhd_data.models import Codec
+
+# checks if a table is partitioned
+PARTITIONED_SQL = """
+SELECT 1 FROM pg_partitioned_table
+JOIN pg_class tbl ON tbl.oid = pg_partitioned_table.partrelid
+WHERE tbl.relname = %s
+AND tbl.relnamespace = to_regnamespace(current_schema())
+"""
+
+# finds the plain (non-unique, non-constraint) indexes of a table
+INDEXES_SQL = """
+SELECT pg_get_indexdef(index.oid)
+FROM pg_index
+JOIN pg_class index ON index.oid = pg_index.indexrelid
+JOIN pg_class tbl ON tbl.oid = pg_index.indrelid
+WHERE tbl.relname = %s
+AND tbl.relnamespace = to_regnamespace(current_schema())
+AND NOT pg_index.indisprimary
+AND NOT pg_index.indisunique
+AND NOT EXISTS (
+    SELECT 1 FROM pg_constraint WHERE pg_constraint.conindid = index.oid
+)
+ORDER BY index.relname
+"""
+
+# finds the unique constraints of a table
+UNIQUE_SQL = """
+SELECT conname, pg_get_constraintdef(pg_constraint.oid)
+FROM pg_constraint
+JOIN pg_class tbl ON tbl.oid = pg_constraint.conrelid
+WHERE tbl.relname = %s
+AND tbl.relnamespace = to_regnamespace(current_schema())
+AND pg_constraint.contype = 'u'
+ORDER BY conname
+"""
+
+
+class CodecPartitions(object):
+    """
+    Manages list partitioning of codec tables by prop_id on postgres.
+
+    Partitioning is opt-in per codec table, see partition_table().
+    A partitioned codec table has one partition per property (named {table}_p{property id}),
+    and a default partition for values of properties without a partition.
+    As a result, queries on a single property only scan (and use the indexes of) its partition,
+    and all values of a property can be removed using TRUNCATE.
+
+    On other databases, no tables are partitioned and all methods do nothing.
+    """
+
+    logger: logging.Logger
+
+    # maps table names to whether they are partitioned
+    _partitioned: dict[str, bool]
+
+    def __init__(self, quiet: bool = False):
+        self.logger = logging.getLogger("mhd.codecpartitions")
+        self.logger.setLevel(logging.WARN if quiet else logging.DEBUG)
+        self._partitioned = {}
+
+    @staticmethod
+    def supported() -> bool:
+        """Checks if the database supports partitioning"""
+
+        return connection.vendor == "postgresql" and connection.pg_version >= 110000
+
+    @staticmethod
+    def partition_name(codec: Type[Codec], prop: Property) -> str:
+        return "{}_p{:d}".format(codec._meta.db_table, prop.pk)
+
+    @staticmethod
+    def default_partition_name(codec: Type[Codec]) -> str:
+        return "{}_default".format(codec._meta.db_table)
+
+    def is_partitioned(self, codec: Type[Codec]) -> bool:
+        """Checks if the table of the given codec is partitioned"""
+
+        if not self.supported():
+            return False
+
+        table = codec._meta.db_table
+        partitioned = self._partitioned.get(table)
+        if partitioned is None:
+            with connection.cursor() as cursor:
+                cursor.execute(PARTITIONED_SQL, [table])
+                partitioned = cursor.fetchone() is not None
+            self._partitioned[table] = partitioned
+        return partitioned
+
+    def has_partition(self, prop: Property) -> bool:
+        """Checks if the given property has a partition"""
+
+        codec = prop.codec_model
+        if not self.is_partitioned(codec):
+            return False
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT to_regclass(%s) IS NOT NULL",
+                [self.partition_name(codec, prop)],
+            )
+            return cursor.fetchone()[0]
+
+    def partition_table(self, codec: Type[Codec]) -> bool:
+        """
+        Converts the table of the given codec into a table partitioned by prop_id, keeping all values.
+        Creates a partition for every property of the codec.
+        Returns False if the table was already partitioned.
+        Should be run inside a transaction, and locks the table while running.
+
+        The primary key becomes (id, prop_id), and the foreign keys on item_id and prop_id as well
+        as the unique constraint on (item_id, prop_id, superseeded_by_id) are re-created.
+        The foreign key of superseeded_by_id is not: a foreign key can only reference a partitioned
+        table by a unique key including the partition key, which would require superseeded_by to
+        also store the prop_id. Nothing enforces these references on partitioned tables.
+        Values superseeding each other always belong to the same item and property, and
+        CollectionFlusher deletes them together, so flushing leaves no dangling references.
+        Code deleting values individually with raw SQL must take care of them itself.
+        """
+
+        if not self.supported():
+            raise PartitioningError("Partitioning codec tables requires postgres 11+")
+        if self.is_partitioned(codec):
+            return False
+
+        qn = connection.ops.quote_name
+        table = codec._meta.db_table
+        old_table = "{}_unpartitioned".format(table)
+
+        with connection.cursor() as cursor:
+            cursor.execute(INDEXES_SQL, [table])
+            indexes = [sql for (sql,) in cursor.fetchall()]
+            cursor.execute(UNIQUE_SQL, [table])
+            uniques = cursor.fetchall()
+
+            # create a new (partitioned) table in place of the old one.
+            # the primary key of a partitioned table has to include the partition key.
+            cursor.execute("ALTER TABLE {} RENAME TO {}".format(qn(table), qn(old_table)))
+            cursor.execute(
+                "CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS INCLUDING STORAGE) PARTITION BY LIST (prop_id)".format(
+                    qn(table), qn(old_table)
+                )
+            )
+            cursor.execute(
+                "ALTER TABLE {} ADD PRIMARY KEY (id, prop_id)".format(qn(table))
+            )
+            for (column, model) in [("item_id", Item), ("prop_id", Property)]:
+                cursor.execute(
+                    "ALTER TABLE {} ADD FOREIGN KEY ({}) REFERENCES {} (id) DEFERRABLE INITIALLY DEFERRED".format(
+                        qn(table), qn(column), qn(model._meta.db_table)
+                    )
+                )
+            cursor.execute(
+                "CREATE TABLE {} PARTITION OF {} DEFAULT".format(
+                    qn(self.default_partition_name(codec)), qn(table)
+                )
+            )
+            self._partitioned[table] = True
+
+            # create the partitions, and move the values over
+            for prop in Property.objects.filter(codec=codec.get_codec_name()):
+                self._create(codec, prop)
+            cursor.execute(
+                "INSERT INTO {} SELECT * FROM {}".format(qn(table), qn(old_table))
+            )
+
+            # drop the old table (and its constraints and indexes), and re-create them on the partitioned table.
+            # unique constraints of codecs contain prop_id, so are allowed on the partitioned table.
+            cursor.execute("DROP TABLE {}".format(qn(old_table)))
+            for (name, definition) in uniques:
+                cursor.execute(
+                    "ALTER TABLE {} ADD CONSTRAINT {} {}".format(
+                        qn(table), qn(name), definition
+                    )
+                )
+            for sql in indexes:
+                cursor.execute(sql)
+
+        self.logger.info(
+            "Table {!r}: Partitioned by property, re-created {} unique constraint(s) and {} index(es)".format(
+                table, len(uniques), len(indexes)
+            )
+        )
+        return True
+
+    def create(self, prop: Property) -> bool:
+        """
+        Creates a partition for the given property, if its codec table is partitioned.
+        Returns True if a partition was created.
+        """
+
+        codec = prop.codec_model
+        if not self.is_partitioned(codec) or self.has_partition(prop):
+            return False
+
+        self._create(codec, prop)
+        return True
+
+    def _create(self, codec: Type[Codec], prop: Property) -> None:
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TABLE {} PARTITION OF {} FOR VALUES IN ({:d})".format(
+                    qn(self.partition_name(codec, prop)),
+                    qn(codec._meta.db_table),
+                    prop.pk,
+                )
+            )
+        self.logger.info(
+            "Table {!r}: Created partition for property {!r}".format(
+                codec._meta.db_table, prop.slug
+            )
+        )
+
+    def truncate(self, prop: Property) -> bool:
+        """
+        Removes all values of the given property by truncating its partition.
+        Returns False (without removing anything) if the property does not have a partition.
+        """
+
+        if not self.has_partition(prop):
+            return False
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "TRUNCATE {}".format(
+                    connection.ops.quote_name(
+                        self.partition_name(prop.codec_model, prop)
+                    )
+                )
+            )
+        return True
+
+    def drop(self, prop: Property) -> bool:
+        """
+        Drops the partition of the given property, including all of its values.
+        Returns False if the property does not have a partition.
+        """
+
+        if not self.has_partition(prop):
+            return False
+
+        codec = prop.codec_model
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DROP TABLE {}".format(qn(self.partition_name(codec, prop)))
+            )
+        self.logger.info(
+            "Table {!r}: Dropped partition for property {!r}".format(
+                codec._meta.db_table, prop.slug
+            )
+        )
+        return True
+
+    def codecs(self, names: Optional[Iterable[str]] = None) -> list[Type[Codec]]:
+        """Returns the codecs with the given names, or all codecs"""
+
+        if names is None:
+            return list(CodecManager.find_all_codecs())
+
+        codecs = []
+        for name in names:
+            codec = CodecManager.find_codec(name)
+            if codec is None:
+                raise PartitioningError("Unknown codec {!r}".format(name))
+            codecs.append(codec)
+        return codecs
+
+
+class PartitioningError(Exception):
+    pass
+
+
+__all__ = ["CodecPartitions", "PartitioningError"]
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+
+from ..models.codecs import (
+    StandardInt,
+    StandardBool,
+    StandardString,
+    PolynomialAsSparseArray,
+)
+from ..models import CodecManager
+from ..fields.ndarray import NDArrayValidator
+
+
+class CodecConvertTest(TestCase):
+    """Tests the compiled converters of codecs"""
+
+    def test_populate_values(self) -> None:
+        """Checks that fast paths populate like the serializer fields"""
+
+        self.assertListEqual(StandardInt.populate_values(5), [5])
+        self.assertListEqual(StandardInt.populate_values("5"), [5])
+        self.assertListEqual(StandardInt.populate_values(None), [None])
+        self.assertListEqual(StandardBool.populate_values(True), [True])
+        self.assertListEqual(StandardBool.populate_values("false"), [False])
+        self.assertListEqual(StandardString.populate_values(" a "), ["a"])
+
+        with self.assertRaises(ValidationError):
+            StandardInt.populate_values(True)
+        with self.assertRaises(ValidationError):
+            StandardInt.populate_values("five")
+
+    def test_serialize_values(self) -> None:
+        """Checks that values are serialized"""
+
+        self.assertListEqual(StandardInt.serialize_values(5), [5])
+        self.assertIsNone(StandardInt.serialize_values(None))
+        self.assertListEqual(StandardBool.serialize_values(False), [False])
+        self.assertListEqual(StandardString.serialize_values("a"), ["a"])
+
+    def test_populate_column(self) -> None:
+        """Checks that entire columns can be populated"""
+
+        self.assertListEqual(StandardInt.populate_column([1, "2", None]), [[1, 2, None]])
+        self.assertListEqual(StandardString.populate_column([]), [[]])
+
+        polynomials = [[1, 2], None]
+        self.assertListEqual(
+            PolynomialAsSparseArray.populate_column(polynomials),
+            [[PolynomialAsSparseArray.populate_values([1, 2])[0], None]],
+        )
+
+    def test_serialize_column(self) -> None:
+        """Checks that entire columns can be serialized"""
+
+        self.assertListEqual(
+            StandardInt.serialize_column([1, None, 3], database=False), [1, None, 3]
+        )
+        self.assertListEqual(
+            StandardBool.serialize_column([True, None], database=False), [True, None]
+        )
+
+    def test_populate_column_arrays(self) -> None:
+        """Checks that array columns are validated as a whole"""
+
+        codec = CodecManager.find_codec("ListAsArray_StandardInt")
+        self.assertListEqual(
+            codec.populate_column([[1, 2], None, [], ["3"]]),
+            [[[1, 2], None, [], [3]]],
+        )
+
+        # errors point to the row and index
+        with self.assertRaisesRegex(ValueError, r"row 2: .*index \[1\]"):
+            codec.populate_column([[1], [2], [3, "four"]])
+
+        # trusted input is not validated
+        self.assertListEqual(
+            codec.populate_column([[3, "four"]], validate=False), [[[3, "four"]]]
+        )
+
+
+class NDArrayValidatorTest(TestCase):
+    """Tests validating entire n-dimensional arrays"""
+
+    def test_valid(self) -> None:
+        """Checks that valid arrays are returned as is"""
+
+        validate = NDArrayValidator(models.IntegerField(), 2)
+
+        value = [[1, 2], [3], []]
+        self.assertIs(validate(value), value)
+        self.assertListEqual(validate([]), [])
+        self.assertListEqual(validate([["1"], [2]]), [[1], [2]])
+
+    def test_invalid(self) -> None:
+        """Checks that invalid arrays raise errors pointing to the index"""
+
+        validate = NDArrayValidator(models.IntegerField(), 2)
+
+        with self.assertRaisesRegex(DjangoValidationError, r"index \[1\]\[0\]"):
+            validate([[1], ["one"]])
+        with self.assertRaisesRegex(DjangoValidationError, r"index \[1\]\[0\]"):
+            validate([[1], [True]])
+        with self.assertRaisesRegex(DjangoValidationError, r"index \[1\]"):
+            validate([[1], 2])
+        with self.assertRaisesRegex(DjangoValidationError, r"index \[\]"):
+            validate(5)
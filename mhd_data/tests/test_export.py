@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import struct
+from uuid import UUID
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from mhd_tests.utils import AssetPath, LoadJSONAsset
+
+from .collection import insert_testing_data
+
+Z3Z_COLLECTION_PATH = AssetPath(__file__, "res", "z3z_collection.json")
+Z3Z_PROVENANCE_PATH = AssetPath(__file__, "res", "z3z_provenance.json")
+Z3Z_DATA_PATH = AssetPath(__file__, "res", "z3z_data.json")
+
+Z3Z_ALL_PATH = AssetPath(__file__, "res", "z3z_query_all.json")
+Z3Z_ALL_ASSET = LoadJSONAsset(Z3Z_ALL_PATH)
+
+
+class ExportTest(TestCase):
+    """Tests that collections can be exported using the streaming export api"""
+
+    def setUp(self) -> None:
+        self.collection = insert_testing_data(
+            Z3Z_COLLECTION_PATH, Z3Z_DATA_PATH, Z3Z_PROVENANCE_PATH, reset=True
+        )
+
+    def _export(self, url: str) -> bytes:
+        response = APIClient().get(url)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def test_export_jsonl(self) -> None:
+        """Checks that exporting as json lines returns all items"""
+
+        content = self._export("/api/export/z3zFunctions/jsonl/")
+        rows = [json.loads(line) for line in content.decode("utf-8").splitlines()]
+        self.assertJSONEqual(json.dumps(rows), Z3Z_ALL_ASSET)
+
+    def test_export_csv(self) -> None:
+        """Checks that exporting as csv respects properties and filter"""
+
+        content = self._export(
+            "/api/export/z3zFunctions/csv/?properties=f1,label&filter=f1%20%3D%200"
+        )
+        rows = list(csv.reader(io.StringIO(content.decode("utf-8"))))
+
+        self.assertListEqual(rows[0], ["_id", "f1", "label"])
+        expected = [
+            [
+                item["_id"],
+                "0",
+                json.dumps(item["label"]) if item["label"] is not None else "",
+            ]
+            for item in Z3Z_ALL_ASSET
+            if item["f1"] == 0
+        ]
+        self.assertListEqual(rows[1:], expected)
+
+    def test_export_columnar(self) -> None:
+        """Checks that the columnar export contains the numeric properties"""
+
+        content = self._export("/api/export/z3zFunctions/columnar/")
+
+        self.assertEqual(content[:8], b"MHDCOL1\n")
+        (length,) = struct.unpack_from("<I", content, 8)
+        header = json.loads(content[12 : 12 + length])
+        self.assertListEqual(
+            header["columns"],
+            [
+                {"name": "_id", "type": "uuid"},
+                {"name": "f0", "type": "int64"},
+                {"name": "f1", "type": "int64"},
+                {"name": "f2", "type": "int64"},
+                {"name": "invertible", "type": "bool"},
+            ],
+        )
+
+        # read the single block
+        offset = 12 + length
+        (n,) = struct.unpack_from("<I", content, offset)
+        offset += 4
+        self.assertEqual(n, len(Z3Z_ALL_ASSET))
+
+        bitmap_size = (n + 7) // 8
+        columns = {}
+        for column, fmt, size in [
+            ("_id", None, 16),
+            ("f0", "q", 8),
+            ("f1", "q", 8),
+            ("f2", "q", 8),
+            ("invertible", "?", 1),
+        ]:
+            bitmap = content[offset : offset + bitmap_size]
+            offset += bitmap_size
+            data = content[offset : offset + n * size]
+            offset += n * size
+
+            if fmt is None:
+                values = [
+                    str(UUID(bytes=data[i : i + 16])) for i in range(0, len(data), 16)
+                ]
+            else:
+                values = list(struct.unpack("<{}{}".format(n, fmt), data))
+            columns[column] = [
+                v if bitmap[i // 8] & (1 << (i % 8)) else None
+                for i, v in enumerate(values)
+            ]
+
+        # the stream ends with an empty block
+        self.assertEqual(content[offset:], struct.pack("<I", 0))
+
+        got = [{c: columns[c][i] for c in columns} for i in range(n)]
+        expected = [{c: item[c] for c in columns} for item in Z3Z_ALL_ASSET]
+        self.assertListEqual(got, expected)
+
+    def test_export_columnar_unsupported(self) -> None:
+        """Checks that non-numeric properties can not be exported as columnar"""
+
+        response = APIClient().get("/api/export/z3zFunctions/columnar/?properties=label")
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_unknown_format(self) -> None:
+        """Checks that unknown formats are not found"""
+
+        response = APIClient().get("/api/export/z3zFunctions/xml/")
+        self.assertEqual(response.status_code, 404)
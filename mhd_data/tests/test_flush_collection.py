@@ -2,10 +2,16 @@ from __future__ import annotations
 
 import json
 
+from django.core.management import call_command
 from django.test import TestCase
 
+from mhd_provenance.models import Provenance
+from mhd_schema.models import Collection
 from mhd_tests.utils import AssetPath, LoadJSONAsset
 from ..models import Item
+from ..models.codecs import StandardInt
+from ..models.item import ItemCollectionAssociation
+from ..partitions import CodecPartitions
 
 from .collection import insert_testing_data
 
@@ -70,3 +76,149 @@ class FlushCollectionTest(TestCase):
         # check that there are only three items left
         # and the rest have been cleared
         self.assertEqual(Item.objects.count(), 3)
+
+    def test_flush_collection_batches(self) -> None:
+        """Checks that flushing in batches removes everything and reports row counts"""
+
+        items = self.collection_b.item_set.count()
+        values = sum(
+            p.values(self.collection_b).count()
+            for p in self.collection_b.property_set.all()
+        )
+
+        deleted = self.collection_b.flush(batch_size=2)
+
+        self.assertTrue(self.collection_b.is_empty())
+        self.assertEqual(Item.objects.count(), 3)
+        self.assertEqual(deleted[Item._meta.db_table], items)
+        self.assertEqual(deleted[ItemCollectionAssociation._meta.db_table], items)
+        item_tables = [Item._meta.db_table, ItemCollectionAssociation._meta.db_table]
+        self.assertEqual(
+            sum(
+                rows
+                for (table, rows) in deleted.items()
+                if table not in item_tables
+            ),
+            values,
+        )
+
+        # the first collection is untouched
+        self.assertJSONEqual(
+            json.dumps(list(self.collection_a.semantic())), JANE_ALL_ASSET
+        )
+
+    def test_property_values(self) -> None:
+        """Checks that the values of a property can be restricted to a collection"""
+
+        prop = self.collection_b.get_property("f1")
+        self.assertGreater(prop.values(self.collection_b).count(), 0)
+        self.assertEqual(prop.values(self.collection_a).count(), 0)
+        self.assertEqual(
+            prop.values().count(), prop.values(self.collection_b).count()
+        )
+
+    def test_delete_collection(self) -> None:
+        """Checks that delete_collection can flush a collection before deleting it"""
+
+        call_command(
+            "delete_collection", self.collection_b.slug, flush=True, quiet=True
+        )
+
+        self.assertFalse(Collection.objects.filter(pk=self.collection_b.pk).exists())
+        self.assertEqual(Item.objects.count(), 3)
+
+    def test_flush_invalidates_count(self) -> None:
+        """Checks that flushing a collection invalidates its count"""
+
+        self.collection_b.update_count()
+        self.assertIsNotNone(self.collection_b.count)
+
+        self.collection_b.flush()
+        self.assertIsNone(Collection.objects.get(pk=self.collection_b.pk).count)
+        self.assertTupleEqual(self.collection_b.get_count(), (0, True))
+
+    def test_flush_shared_item(self) -> None:
+        """Checks that items shared with another collection are kept when flushing in batches"""
+
+        # share an item of the second collection with the first one, and give it a value there
+        item = self.collection_b.item_set.first()
+        item.collections.add(self.collection_a)
+        trace = StandardInt.objects.create(
+            item=item,
+            prop=self.collection_a.get_property("trace"),
+            provenance=Provenance.objects.first(),
+            value=42,
+        )
+
+        call_command(
+            "delete_collection",
+            self.collection_b.slug,
+            flush=True,
+            batch_size=2,
+            quiet=True,
+        )
+
+        # the shared item (and only its value in the first collection) is kept
+        self.assertFalse(Collection.objects.filter(pk=self.collection_b.pk).exists())
+        self.assertEqual(Item.objects.count(), 4)
+        self.assertTrue(Item.objects.filter(pk=item.pk).exists())
+        self.assertListEqual(
+            list(StandardInt.objects.filter(item=item).values_list("pk", flat=True)),
+            [trace.pk],
+        )
+        self.assertListEqual(
+            list(item.collections.values_list("pk", flat=True)),
+            [self.collection_a.pk],
+        )
+
+    def test_flush_superseeded(self) -> None:
+        """Checks that flushing leaves no dangling superseeded_by references"""
+
+        # partitioned tables have no foreign key on superseeded_by
+        if CodecPartitions(quiet=True).supported():
+            call_command("codec_partition", "StandardInt", enable=True, quiet=True)
+
+        provenance = Provenance.objects.first()
+
+        def supersede(value: StandardInt) -> StandardInt:
+            new = StandardInt.objects.create(
+                item=value.item, prop=value.prop, provenance=provenance, value=-1
+            )
+            value.active = False
+            value.superseeded_by = new
+            value.save()
+            return new
+
+        # supersede values in both collections, on an item shared between them
+        item = self.collection_b.item_set.first()
+        item.collections.add(self.collection_a)
+        trace = StandardInt.objects.create(
+            item=item,
+            prop=self.collection_a.get_property("trace"),
+            provenance=provenance,
+            value=42,
+        )
+        kept = supersede(trace)
+        supersede(
+            StandardInt.objects.get(item=item, prop=self.collection_b.get_property("f1"))
+        )
+
+        call_command(
+            "delete_collection",
+            self.collection_b.slug,
+            flush=True,
+            batch_size=2,
+            quiet=True,
+        )
+
+        ids = set(StandardInt.objects.values_list("pk", flat=True))
+        references = set(
+            StandardInt.objects.exclude(superseeded_by=None).values_list(
+                "superseeded_by_id", flat=True
+            )
+        )
+        self.assertSetEqual(references - ids, set())
+        self.assertSetEqual(
+            set(StandardInt.objects.filter(item=item).values_list("pk", flat=True)),
+            {trace.pk, kept.pk},
+        )
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from ..importers.jsonstream import (
+    JSONArrayReader,
+    JSONStreamError,
+    is_json_lines,
+    iter_json_lines,
+    iter_json_rows,
+)
+
+ROWS = [
+    [1, "two", 3.5, None],
+    [12345678901234567890, 'with "quotes" and ]', [[1, 2], []], True],
+    [{"key": [1, {"nested": "value"}]}, -0.25e-3, False, "ünïcödé"],
+]
+
+
+class JSONStreamTest(SimpleTestCase):
+    def _read(self, data: str, block_size: int) -> list:
+        return list(JSONArrayReader(io.StringIO(data), block_size=block_size))
+
+    def test_array_reader(self) -> None:
+        """Checks that arrays are read correctly, independent of the block size"""
+
+        data = json.dumps(ROWS, indent=2)
+        for block_size in [1, 2, 3, 7, 64, 4096]:
+            self.assertListEqual(self._read(data, block_size), ROWS)
+
+        for block_size in [1, 4096]:
+            self.assertListEqual(self._read(" [ ] ", block_size), [])
+            self.assertListEqual(self._read("[123456, 7]", block_size), [123456, 7])
+
+    def test_array_reader_invalid(self) -> None:
+        """Checks that invalid arrays raise an error"""
+
+        for data in ["", "{}", "[1, 2", "[1 2]", "[1,]", "[1] 2"]:
+            with self.assertRaises(JSONStreamError, msg=data):
+                self._read(data, 2)
+
+    def test_array_reader_elements(self) -> None:
+        """Checks that elements containing brackets, escapes and large numbers are read"""
+
+        data = '[ "a\\"],b" , {"x": [1, {}], "y": "}"}, 123456789012345678901234567890, -1.5e3 ]'
+        expected = [
+            'a"],b',
+            {"x": [1, {}], "y": "}"},
+            123456789012345678901234567890,
+            -1500.0,
+        ]
+        for block_size in [1, 3, 4096]:
+            self.assertListEqual(self._read(data, block_size), expected)
+
+    def test_array_reader_fails_fast(self) -> None:
+        """Checks that an invalid element raises without reading the rest of the stream"""
+
+        class Stream(io.StringIO):
+            read_size = 0
+
+            def read(self, size: int = -1) -> str:
+                data = super().read(size)
+                self.read_size += len(data)
+                return data
+
+        stream = Stream("[[1, 2], [3 4], " + ", ".join(["[5, 6]"] * 10000) + "]")
+        reader = iter(JSONArrayReader(stream, block_size=64))
+
+        self.assertListEqual(next(reader), [1, 2])
+        with self.assertRaisesRegex(JSONStreamError, "Element 1"):
+            next(reader)
+        self.assertLess(stream.read_size, 1024)
+
+    def test_json_lines(self) -> None:
+        """Checks that JSON Lines accept the same values as arrays, including large numbers"""
+
+        data = '[123456789012345678901234567890, "a"]\n\n[-1.5e3, {"x": []}]\n'
+        self.assertListEqual(
+            list(iter_json_lines(io.StringIO(data))),
+            [[123456789012345678901234567890, "a"], [-1500.0, {"x": []}]],
+        )
+
+        with self.assertRaisesRegex(JSONStreamError, "Line 2"):
+            list(iter_json_lines(io.StringIO("[1]\n[2 3]\n")))
+
+    def test_files(self) -> None:
+        """Checks that plain, compressed and JSON Lines files can be read"""
+
+        self.assertTrue(is_json_lines("data.jsonl.gz"))
+        self.assertTrue(is_json_lines("data.NDJSON"))
+        self.assertFalse(is_json_lines("data.json.gz"))
+
+        array = json.dumps(ROWS).encode("utf-8")
+        lines = "\n".join(json.dumps(row) for row in ROWS).encode("utf-8") + b"\n\n"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            files = {
+                "data.json": array,
+                "data.json.gz": gzip.compress(array),
+                "data.jsonl": lines,
+                "data.ndjson.gz": gzip.compress(lines),
+            }
+            for (name, content) in files.items():
+                path = os.path.join(tmp, name)
+                with open(path, "wb") as f:
+                    f.write(content)
+
+                self.assertListEqual(list(iter_json_rows(path)), ROWS, msg=name)
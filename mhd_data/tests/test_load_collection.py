@@ -1,18 +1,25 @@
 from __future__ import annotations
 
 import json
+import os
+import tempfile
 import uuid
 from unittest import mock
 
-from django.db import transaction
+from django.db import connection, transaction
 
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 
 from mhd.utils.uuid import uuid4_mock, uuid4_mock_reset
 from mhd_schema.models import Collection
-from mhd_data.models import Item
-from mhd_tests.utils import AssetPath, LoadJSONAsset
+from mhd_data.models import Item, ImportCheckpoint
+from mhd_data.importers import DataImporter
+from mhd_data.importers.importer import ImporterError
+from mhd_data.models.item import ItemCollectionAssociation
+from mhd_data.importers.indexes import DeferredIndexes
+from mhd_tests.utils import AssetPath, LoadJSONAsset, db
 
 Z3Z_COLLECTION_PATH = AssetPath(__file__, "res", "z3z_collection.json")
 Z3Z_PROVENANCE_PATH = AssetPath(__file__, "res", "z3z_provenance.json")
@@ -65,3 +72,195 @@ class LoadCollectionTest(TestCase):
         # check that the collection objects were inserted
         self.assertEqual(Collection.objects.count(), 0)
         self.assertEqual(Item.objects.count(), 0)
+
+    def test_parallel_arg(self) -> None:
+        """Checks that loading a collection with parallel workers inserts the same data"""
+
+        uuid4_mock_reset()
+        with mock.patch.object(uuid, "uuid4", uuid4_mock):
+            call_command(
+                "load_collection",
+                Z3Z_COLLECTION_PATH,  # schema
+                Z3Z_DATA_PATH,  # data
+                Z3Z_PROVENANCE_PATH,  # provenance
+                quiet=True,
+                batch_size=None,
+                parallel=2,
+            )
+
+        GOT_QUERY_ALL = Collection.objects.first().semantic()
+        self.assertJSONEqual(
+            json.dumps(list(GOT_QUERY_ALL)),
+            Z3Z_ALL_ASSET,
+            "check that the query inserted all entries",
+        )
+
+    def test_chunk_size_arg(self) -> None:
+        """Checks that loading a collection in small chunks inserts the same data"""
+
+        uuid4_mock_reset()
+        with mock.patch.object(uuid, "uuid4", uuid4_mock):
+            call_command(
+                "load_collection",
+                Z3Z_COLLECTION_PATH,  # schema
+                Z3Z_DATA_PATH,  # data
+                Z3Z_PROVENANCE_PATH,  # provenance
+                quiet=True,
+                batch_size=None,
+                chunk_size=2,
+            )
+
+        GOT_QUERY_ALL = Collection.objects.first().semantic()
+        self.assertEqual(len(list(GOT_QUERY_ALL)), len(Z3Z_ALL_ASSET))
+
+    def test_defer_indexes_arg(self) -> None:
+        """Checks that loading a collection with deferred indexes inserts the same data"""
+
+        uuid4_mock_reset()
+        with mock.patch.object(uuid, "uuid4", uuid4_mock):
+            call_command(
+                "load_collection",
+                Z3Z_COLLECTION_PATH,  # schema
+                Z3Z_DATA_PATH,  # data
+                Z3Z_PROVENANCE_PATH,  # provenance
+                quiet=True,
+                batch_size=None,
+                parallel=2,
+                defer_indexes=True,
+            )
+
+        GOT_QUERY_ALL = Collection.objects.first().semantic()
+        self.assertJSONEqual(
+            json.dumps(list(GOT_QUERY_ALL)),
+            Z3Z_ALL_ASSET,
+            "check that the query inserted all entries",
+        )
+
+    def test_defer_indexes_atomic(self) -> None:
+        """Checks that deferring indexes is refused for atomic imports"""
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "load_collection",
+                Z3Z_COLLECTION_PATH,  # schema
+                Z3Z_DATA_PATH,  # data
+                Z3Z_PROVENANCE_PATH,  # provenance
+                quiet=True,
+                defer_indexes=True,
+            )
+        self.assertFalse(Collection.objects.exists())
+
+    @db.skipUnlessPostgres
+    def test_deferred_indexes(self) -> None:
+        """Checks that deferred indexes are dropped and rebuilt"""
+
+        table = ItemCollectionAssociation._meta.db_table
+        with connection.cursor() as cursor:
+            before = connection.introspection.get_constraints(cursor, table)
+
+            with DeferredIndexes([ItemCollectionAssociation], quiet=True) as deferred:
+                self.assertEqual(len(deferred.dropped[table]), 2)
+                during = connection.introspection.get_constraints(cursor, table)
+
+            after = connection.introspection.get_constraints(cursor, table)
+
+        self.assertEqual(len(before) - 2, len(during))
+        self.assertSetEqual(set(before.keys()), set(after.keys()))
+
+    def test_ragged_rows(self) -> None:
+        """Checks that rows with the wrong number of values are rejected"""
+
+        call_command("upsert_collection", Z3Z_COLLECTION_PATH, quiet=True)
+        rows = [[0, 0, 0, False, "a"], [1, 1, 1, True], [2, 2, 2, True, "c"]]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.json")
+            with open(path, "w") as f:
+                json.dump(rows, f)
+
+            with self.assertRaisesRegex(ImporterError, r"Row 1 should have exactly 5"):
+                call_command(
+                    "insert_data",
+                    path,
+                    collection="z3zFunctions",
+                    fields="f0,f1,f2,invertible,label",
+                    provenance=Z3Z_PROVENANCE_PATH,
+                    quiet=True,
+                )
+
+    def test_checkpoint_resume(self) -> None:
+        """Checks that a checkpointed import resumes after the last committed chunk"""
+
+        call_command("upsert_collection", Z3Z_COLLECTION_PATH, quiet=True)
+        fields = "f0,f1,f2,invertible,label"
+
+        def insert_data(fields: str = fields) -> None:
+            call_command(
+                "insert_data",
+                Z3Z_DATA_PATH,
+                collection="z3zFunctions",
+                fields=fields,
+                provenance=Z3Z_PROVENANCE_PATH,
+                quiet=True,
+                chunk_size=5,
+                checkpoint="z3z",
+            )
+
+        # fail while saving the third chunk
+        original = DataImporter._save_checkpoint
+        calls = {"count": 0}
+
+        def crash(self, *args, **kwargs):
+            calls["count"] += 1
+            if calls["count"] == 3:
+                raise Exception("crash")
+            return original(self, *args, **kwargs)
+
+        with mock.patch.object(DataImporter, "_save_checkpoint", crash):
+            with self.assertRaises(Exception):
+                insert_data()
+
+        checkpoint = ImportCheckpoint.objects.get(name="z3z")
+        self.assertEqual(checkpoint.chunks, 2)
+        self.assertFalse(checkpoint.finished)
+        self.assertEqual(Item.objects.count(), 10)
+        self.assertListEqual(checkpoint.properties, fields.split(","))
+
+        # resuming with different properties is refused
+        with self.assertRaisesRegex(ImporterError, "was created for properties"):
+            insert_data("f1,f0,f2,invertible,label")
+        self.assertEqual(Item.objects.count(), 10)
+
+        # resume the import, and check that it is done
+        insert_data()
+
+        checkpoint.refresh_from_db()
+        self.assertTrue(checkpoint.finished)
+        self.assertEqual(Item.objects.count(), len(Z3Z_ALL_ASSET))
+        self.assertEqual(checkpoint.items, len(Z3Z_ALL_ASSET))
+
+        # running it again does nothing
+        insert_data()
+        self.assertEqual(Item.objects.count(), len(Z3Z_ALL_ASSET))
+
+    def test_pipeline_arg(self) -> None:
+        """Checks that loading a collection using a pipeline inserts the same data"""
+
+        uuid4_mock_reset()
+        with mock.patch.object(uuid, "uuid4", uuid4_mock):
+            call_command(
+                "load_collection",
+                Z3Z_COLLECTION_PATH,  # schema
+                Z3Z_DATA_PATH,  # data
+                Z3Z_PROVENANCE_PATH,  # provenance
+                quiet=True,
+                batch_size=None,
+                pipeline=2,
+            )
+
+        GOT_QUERY_ALL = Collection.objects.first().semantic()
+        self.assertJSONEqual(
+            json.dumps(list(GOT_QUERY_ALL)),
+            Z3Z_ALL_ASSET,
+            "check that the query inserted all entries",
+        )
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from mhd_tests.utils import AssetPath, db
+
+from .collection import insert_testing_data
+
+from ..models.codecs import StandardBool, StandardInt
+from ..partitions import CodecPartitions
+
+Z3Z_COLLECTION_PATH = AssetPath(__file__, "res", "z3z_collection.json")
+Z3Z_PROVENANCE_PATH = AssetPath(__file__, "res", "z3z_provenance.json")
+Z3Z_DATA_PATH = AssetPath(__file__, "res", "z3z_data.json")
+
+
+class CodecPartitionsTest(TestCase):
+    def setUp(self) -> None:
+        self.collection = insert_testing_data(
+            Z3Z_COLLECTION_PATH, Z3Z_DATA_PATH, Z3Z_PROVENANCE_PATH, reset=True
+        )
+
+    @db.skipUnlessSqlite
+    def test_unsupported(self) -> None:
+        """Checks that partitioning is a no-op on sqlite"""
+
+        partitions = CodecPartitions(quiet=True)
+        self.assertFalse(partitions.is_partitioned(StandardInt))
+        self.assertFalse(partitions.truncate(self.collection.get_property("f1")))
+
+        with self.assertRaises(CommandError):
+            call_command("codec_partition", "StandardInt", enable=True, quiet=True)
+
+    @db.skipUnlessPostgres
+    def test_partition(self) -> None:
+        """Checks that partitioning a codec table keeps all values"""
+
+        def rows() -> list[str]:
+            return sorted(
+                json.dumps(r, sort_keys=True, default=str)
+                for r in self.collection.semantic()
+            )
+
+        expected = rows()
+
+        call_command(
+            "codec_partition", "StandardInt", "StandardBool", enable=True, quiet=True
+        )
+
+        partitions = CodecPartitions(quiet=True)
+        self.assertTrue(partitions.is_partitioned(StandardInt))
+        self.assertTrue(partitions.is_partitioned(StandardBool))
+        for slug in ["f0", "f1", "f2", "invertible"]:
+            self.assertTrue(
+                partitions.has_partition(self.collection.get_property(slug))
+            )
+
+        self.assertListEqual(rows(), expected)
+
+        # the unique constraint and foreign keys (except for superseeded_by) are kept
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, StandardInt._meta.db_table
+            )
+        uniques = [
+            c["columns"]
+            for c in constraints.values()
+            if c["unique"] and not c["primary_key"]
+        ]
+        self.assertListEqual(uniques, [["item_id", "prop_id", "superseeded_by_id"]])
+        foreign_keys = sorted(
+            c["columns"][0] for c in constraints.values() if c["foreign_key"]
+        )
+        self.assertListEqual(foreign_keys, ["item_id", "prop_id"])
+
+        # flushing the collection truncates the partitions
+        self.collection.flush()
+        self.assertFalse(StandardInt.objects.exists())
+        self.assertFalse(StandardBool.objects.exists())
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import logging
+import threading
+
+from django.test import SimpleTestCase
+
+from ..importers.pipeline import PipelineStats, read_ahead
+
+
+class PipelineTest(SimpleTestCase):
+    def test_read_ahead(self) -> None:
+        """Checks that read_ahead produces all results in a background thread"""
+
+        threads = set()
+        values = iter(range(10))
+
+        def produce():
+            threads.add(threading.current_thread())
+            return next(values, None)
+
+        self.assertListEqual(list(read_ahead(produce, 2)), list(range(10)))
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_read_ahead_error(self) -> None:
+        """Checks that errors are raised in the consumer"""
+
+        def produce():
+            raise ValueError("broken")
+
+        with self.assertRaises(ValueError):
+            list(read_ahead(produce, 2))
+
+    def test_read_ahead_close(self) -> None:
+        """Checks that closing the iterator stops the background thread"""
+
+        counter = {"calls": 0}
+
+        def produce():
+            counter["calls"] += 1
+            return counter["calls"]
+
+        results = read_ahead(produce, 2)
+        self.assertEqual(next(results), 1)
+        results.close()
+
+        calls = counter["calls"]
+        self.assertLessEqual(calls, 4)
+
+    def test_stats(self) -> None:
+        """Checks that stats are summed up per stage"""
+
+        stats = PipelineStats()
+        stats.add("read", 10, 1.0)
+        stats.add("save", 5, 0.5)
+        stats.add("read", 10, 1.0)
+        self.assertDictEqual(stats.stages, {"read": [20, 2.0], "save": [5, 0.5]})
+
+        with self.assertLogs("mhd.test", level=logging.INFO) as logs:
+            logger = logging.getLogger("mhd.test")
+            logger.setLevel(logging.INFO)
+            stats.report(logger)
+        self.assertEqual(len(logs.output), 2)
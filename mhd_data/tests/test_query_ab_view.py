@@ -5,7 +5,9 @@ import json
 
 from django.core import management
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from mhd_tests.utils import AssetPath, LoadJSONAsset
 
@@ -51,6 +53,19 @@ class ABCollectionWithViewTest(TestCase):
             """SELECT id, "property_value_basis_0", "property_cid_basis", "property_value_k_0", "property_cid_k", "property_value_n_0", "property_cid_n", "property_value_S_0", "property_cid_S", "property_value_R_0", "property_cid_R" FROM mhd_view_ab""",
         )
 
+    def test_view_resolution_readonly(self) -> None:
+        """Checks that querying does not touch the table of views"""
+
+        view = self.collection.view
+        with CaptureQueriesContext(connection) as queries:
+            self.assertIs(self.collection.view, view)
+            self.collection.query()
+            self.collection.query_count()
+
+        self.assertListEqual(
+            [q["sql"] for q in queries if "mviews_view" in q["sql"]], []
+        )
+
     def test_data_exists(self) -> None:
         """Checks that a query for all items returns the right data"""
 
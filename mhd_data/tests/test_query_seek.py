@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from mhd.utils.paginator import SeekRawPaginator
+from mhd_tests.utils import AssetPath, LoadJSONAsset
+
+from .collection import insert_testing_data
+
+Z3Z_COLLECTION_PATH = AssetPath(__file__, "res", "z3z_collection.json")
+Z3Z_PROVENANCE_PATH = AssetPath(__file__, "res", "z3z_provenance.json")
+Z3Z_DATA_PATH = AssetPath(__file__, "res", "z3z_data.json")
+
+Z3Z_ALL_PATH = AssetPath(__file__, "res", "z3z_query_all.json")
+Z3Z_ALL_ASSET = LoadJSONAsset(Z3Z_ALL_PATH)
+
+
+class SeekPaginationTest(TestCase):
+    """Tests that the query api can be paginated using keyset pagination"""
+
+    def setUp(self) -> None:
+        self.collection = insert_testing_data(
+            Z3Z_COLLECTION_PATH, Z3Z_DATA_PATH, Z3Z_PROVENANCE_PATH, reset=True
+        )
+
+    def _get_all_pages(self, url: str) -> list[list[str]]:
+        """Follows all next links starting at url and returns the ids on each page"""
+
+        pages = []
+        while url is not None:
+            response = APIClient().get(url)
+            self.assertEqual(response.status_code, 200)
+
+            data = response.json()
+            pages.append([r["_id"] for r in data["results"]])
+            url = data["next"]
+
+        return pages
+
+    def test_seek_no_order(self) -> None:
+        """Checks that keyset pagination without an order returns all items by id"""
+
+        pages = self._get_all_pages("/api/query/z3zFunctions/?cursor=&per_page=10")
+        self.assertListEqual([len(p) for p in pages], [10, 10, 7])
+        self.assertListEqual(
+            sum(pages, []), sorted(item["_id"] for item in Z3Z_ALL_ASSET)
+        )
+
+    def test_seek_order_with_nulls(self) -> None:
+        """Checks that keyset pagination respects the order, including NULL values"""
+
+        pages = self._get_all_pages(
+            "/api/query/z3zFunctions/?cursor=&per_page=4&order=invertible,-f1"
+        )
+        self.assertListEqual([len(p) for p in pages], [4, 4, 4, 4, 4, 4, 3])
+
+        expected = sorted(
+            Z3Z_ALL_ASSET,
+            key=lambda item: (
+                item["invertible"] is None,
+                item["invertible"] or False,
+                -item["f1"],
+                item["_id"],
+            ),
+        )
+        self.assertListEqual(sum(pages, []), [item["_id"] for item in expected])
+
+    def test_seek_filter(self) -> None:
+        """Checks that keyset pagination can be combined with a filter"""
+
+        pages = self._get_all_pages(
+            "/api/query/z3zFunctions/?cursor=&per_page=2&order=-f2&filter=f1%20%3D%200"
+        )
+        expected = sorted(
+            [item for item in Z3Z_ALL_ASSET if item["f1"] == 0],
+            key=lambda item: (-item["f2"], item["_id"]),
+        )
+        self.assertListEqual(sum(pages, []), [item["_id"] for item in expected])
+
+    def test_seek_order_non_scalar(self) -> None:
+        """Checks that keyset pagination refuses to order by non-scalar values"""
+
+        # label has an array value, which can not be used in a cursor
+        response = APIClient().get("/api/query/z3zFunctions/?cursor=&order=label")
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_cursor(self) -> None:
+        """Checks that an invalid cursor is rejected"""
+
+        response = APIClient().get("/api/query/z3zFunctions/?cursor=invalid")
+        self.assertEqual(response.status_code, 400)
+
+    def test_tampered_cursor(self) -> None:
+        """Checks that cursors with values not matching the order are rejected"""
+
+        for seek in [["abc", "xyz"], [1], [[1], "0" * 32], [1, "not-a-uuid"]]:
+            cursor = SeekRawPaginator().encode_cursor(seek)
+            response = APIClient().get(
+                "/api/query/z3zFunctions/?order=f1&cursor={}".format(cursor)
+            )
+            self.assertEqual(response.status_code, 400, msg=seek)
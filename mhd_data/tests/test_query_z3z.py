@@ -8,7 +8,7 @@ from mhd_tests.utils import AssetPath, LoadJSONAsset
 
 from .collection import insert_testing_data
 
-from ..models import Item
+from ..models import Item, SemanticItemSerializer
 
 from typing import TYPE_CHECKING, TypeAlias, Any
 
@@ -100,9 +100,9 @@ SELECT id, "property_value_f0_0", "property_cid_f0", "property_value_f1_0", "pro
         self._assert_query(
             limit_query,
             """
-SELECT id, "property_value_f1_0", "property_cid_f1" FROM (SELECT I.id as id, "T_f0".value as "property_value_f0_0", "T_f0".id as "property_cid_f0", "T_f1".value as "property_value_f1_0", "T_f1".id as "property_cid_f1", "T_f2".value as "property_value_f2_0", "T_f2".id as "property_cid_f2", "T_invertible".value as "property_value_invertible_0", "T_invertible".id as "property_cid_invertible", "T_label".label as "property_value_label_0", "T_label".params as "property_value_label_1", "T_label".id as "property_cid_label" FROM mhd_data_item as I JOIN mhd_data_itemcollectionassociation as CI ON I.id = CI.item_id AND CI.collection_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f0" ON I.id = "T_f0".item_id AND "T_f0".active AND "T_f0".prop_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f1" ON I.id = "T_f1".item_id AND "T_f1".active AND "T_f1".prop_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f2" ON I.id = "T_f2".item_id AND "T_f2".active AND "T_f2".prop_id = %s LEFT OUTER JOIN mhd_data_standardbool AS "T_invertible" ON I.id = "T_invertible".item_id AND "T_invertible".active AND "T_invertible".prop_id = %s LEFT OUTER JOIN mhd_data_graphlabel AS "T_label" ON I.id = "T_label".item_id AND "T_label".active AND "T_label".prop_id = %s) AS collection LIMIT %s OFFSET %s
+SELECT id, "property_value_f1_0", "property_cid_f1" FROM (SELECT I.id as id, "T_f1".value as "property_value_f1_0", "T_f1".id as "property_cid_f1" FROM mhd_data_item as I JOIN mhd_data_itemcollectionassociation as CI ON I.id = CI.item_id AND CI.collection_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f1" ON I.id = "T_f1".item_id AND "T_f1".active AND "T_f1".prop_id = %s) AS collection LIMIT %s OFFSET %s
         """,
-            (col_pk, f0_pk, f1_pk, f2_pk, invertible_pk, label_pk, 1, 2),
+            (col_pk, f1_pk, 1, 2),
         )
 
         # filter
@@ -116,9 +116,9 @@ SELECT id, "property_value_f1_0", "property_cid_f1" FROM (SELECT I.id as id, "T_
         self._assert_query(
             filter_query,
             """
-SELECT id, "property_value_f1_0", "property_cid_f1", "property_value_f2_0", "property_cid_f2" FROM (SELECT I.id as id, "T_f0".value as "property_value_f0_0", "T_f0".id as "property_cid_f0", "T_f1".value as "property_value_f1_0", "T_f1".id as "property_cid_f1", "T_f2".value as "property_value_f2_0", "T_f2".id as "property_cid_f2", "T_invertible".value as "property_value_invertible_0", "T_invertible".id as "property_cid_invertible", "T_label".label as "property_value_label_0", "T_label".params as "property_value_label_1", "T_label".id as "property_cid_label" FROM mhd_data_item as I JOIN mhd_data_itemcollectionassociation as CI ON I.id = CI.item_id AND CI.collection_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f0" ON I.id = "T_f0".item_id AND "T_f0".active AND "T_f0".prop_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f1" ON I.id = "T_f1".item_id AND "T_f1".active AND "T_f1".prop_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f2" ON I.id = "T_f2".item_id AND "T_f2".active AND "T_f2".prop_id = %s LEFT OUTER JOIN mhd_data_standardbool AS "T_invertible" ON I.id = "T_invertible".item_id AND "T_invertible".active AND "T_invertible".prop_id = %s LEFT OUTER JOIN mhd_data_graphlabel AS "T_label" ON I.id = "T_label".item_id AND "T_label".active AND "T_label".prop_id = %s) AS collection WHERE "property_value_f1_0" = %s
+SELECT id, "property_value_f1_0", "property_cid_f1", "property_value_f2_0", "property_cid_f2" FROM (SELECT I.id as id, "T_f1".value as "property_value_f1_0", "T_f1".id as "property_cid_f1", "T_f2".value as "property_value_f2_0", "T_f2".id as "property_cid_f2" FROM mhd_data_item as I JOIN mhd_data_itemcollectionassociation as CI ON I.id = CI.item_id AND CI.collection_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f1" ON I.id = "T_f1".item_id AND "T_f1".active AND "T_f1".prop_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f2" ON I.id = "T_f2".item_id AND "T_f2".active AND "T_f2".prop_id = %s WHERE EXISTS (SELECT 1 FROM mhd_data_standardint AS "S_f1" WHERE "S_f1".item_id = I.id AND "S_f1".active AND "S_f1".prop_id = %s AND "S_f1".value = %s)) AS collection
         """,
-            (col_pk, f0_pk, f1_pk, f2_pk, invertible_pk, label_pk, 0),
+            (col_pk, f1_pk, f2_pk, f1_pk, 0),
         )
 
     def test_query_semantics(self) -> None:
@@ -153,6 +153,63 @@ SELECT id, "property_value_f1_0", "property_cid_f1", "property_value_f2_0", "pro
             "check that the query for f1 = 0 returns the right results",
         )
 
+    def test_query_semantics_itersize(self) -> None:
+        """Tests that .semantic() queries using a server-side cursor return the right values"""
+
+        GOT_QUERY_ALL = self.collection.semantic(itersize=5)
+        self.assertJSONEqual(
+            json.dumps(list(GOT_QUERY_ALL)),
+            Z3Z_ALL_ASSET,
+            "check that iterating over all properties returns all properties",
+        )
+
+        GOT_QUERY_F1_LIMIT = self.collection.semantic(
+            properties=[self.collection.get_property("f1")],
+            limit=1,
+            offset=2,
+            itersize=5,
+        )
+        self.assertJSONEqual(
+            json.dumps(list(GOT_QUERY_F1_LIMIT)),
+            Z3Z_F1_ASSET,
+            "check that iterating over a limited f1 returns correct response",
+        )
+
+    def test_query_iterate_close(self) -> None:
+        """Tests that closing an iterator early releases its cursor"""
+
+        from django.db import connection
+
+        in_atomic_block = connection.in_atomic_block
+
+        rows, _ = self.collection.iterate(itersize=2)
+        next(rows)
+        rows.close()
+
+        self.assertEqual(connection.in_atomic_block, in_atomic_block)
+        self.assertEqual(
+            len(list(self.collection.semantic(itersize=2))), len(Z3Z_ALL_ASSET)
+        )
+
+    def test_query_rows(self) -> None:
+        """Tests that plain rows are serialized like Item instances"""
+
+        props = [
+            self.collection.get_property("label"),
+            self.collection.get_property("f1"),
+            self.collection.get_property("invertible"),
+        ]
+        items, _ = self.collection.query(properties=props, order="f1")
+        rows, _ = self.collection.query(properties=props, order="f1", rows=True)
+
+        serializer = SemanticItemSerializer(collection=self.collection, properties=props)
+        got_rows = [serializer.to_representation(row) for row in rows]
+        got_items = [serializer.to_representation(item) for item in items]
+
+        self.assertTrue(all(isinstance(row, tuple) for row in rows))
+        self.assertEqual(len(got_rows), len(Z3Z_ALL_ASSET))
+        self.assertListEqual(got_rows, got_items)
+
     def test_query_count(self) -> None:
         col_pk = str(self.collection.pk)
         f0_pk = str(self.collection.get_property("f0").pk)
@@ -166,9 +223,9 @@ SELECT id, "property_value_f1_0", "property_cid_f1", "property_value_f2_0", "pro
         self._assert_query(
             plain_query,
             """
-SELECT COUNT(*) FROM (SELECT I.id as id, "T_f0".value as "property_value_f0_0", "T_f0".id as "property_cid_f0", "T_f1".value as "property_value_f1_0", "T_f1".id as "property_cid_f1", "T_f2".value as "property_value_f2_0", "T_f2".id as "property_cid_f2", "T_invertible".value as "property_value_invertible_0", "T_invertible".id as "property_cid_invertible", "T_label".label as "property_value_label_0", "T_label".params as "property_value_label_1", "T_label".id as "property_cid_label" FROM mhd_data_item as I JOIN mhd_data_itemcollectionassociation as CI ON I.id = CI.item_id AND CI.collection_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f0" ON I.id = "T_f0".item_id AND "T_f0".active AND "T_f0".prop_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f1" ON I.id = "T_f1".item_id AND "T_f1".active AND "T_f1".prop_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f2" ON I.id = "T_f2".item_id AND "T_f2".active AND "T_f2".prop_id = %s LEFT OUTER JOIN mhd_data_standardbool AS "T_invertible" ON I.id = "T_invertible".item_id AND "T_invertible".active AND "T_invertible".prop_id = %s LEFT OUTER JOIN mhd_data_graphlabel AS "T_label" ON I.id = "T_label".item_id AND "T_label".active AND "T_label".prop_id = %s) AS collection
+SELECT COUNT(*) FROM mhd_data_itemcollectionassociation WHERE collection_id = %s
         """,
-            (col_pk, f0_pk, f1_pk, f2_pk, invertible_pk, label_pk),
+            (col_pk,),
         )
 
         # filter
@@ -182,9 +239,20 @@ SELECT COUNT(*) FROM (SELECT I.id as id, "T_f0".value as "property_value_f0_0",
         self._assert_query(
             filter_query,
             """
-SELECT COUNT(*) FROM (SELECT I.id as id, "T_f0".value as "property_value_f0_0", "T_f0".id as "property_cid_f0", "T_f1".value as "property_value_f1_0", "T_f1".id as "property_cid_f1", "T_f2".value as "property_value_f2_0", "T_f2".id as "property_cid_f2", "T_invertible".value as "property_value_invertible_0", "T_invertible".id as "property_cid_invertible", "T_label".label as "property_value_label_0", "T_label".params as "property_value_label_1", "T_label".id as "property_cid_label" FROM mhd_data_item as I JOIN mhd_data_itemcollectionassociation as CI ON I.id = CI.item_id AND CI.collection_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f0" ON I.id = "T_f0".item_id AND "T_f0".active AND "T_f0".prop_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f1" ON I.id = "T_f1".item_id AND "T_f1".active AND "T_f1".prop_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f2" ON I.id = "T_f2".item_id AND "T_f2".active AND "T_f2".prop_id = %s LEFT OUTER JOIN mhd_data_standardbool AS "T_invertible" ON I.id = "T_invertible".item_id AND "T_invertible".active AND "T_invertible".prop_id = %s LEFT OUTER JOIN mhd_data_graphlabel AS "T_label" ON I.id = "T_label".item_id AND "T_label".active AND "T_label".prop_id = %s) AS collection WHERE "property_value_f1_0" = %s
+SELECT COUNT(*) FROM (SELECT I.id as id FROM mhd_data_item as I JOIN mhd_data_itemcollectionassociation as CI ON I.id = CI.item_id AND CI.collection_id = %s WHERE EXISTS (SELECT 1 FROM mhd_data_standardint AS "S_f1" WHERE "S_f1".item_id = I.id AND "S_f1".active AND "S_f1".prop_id = %s AND "S_f1".value = %s)) AS collection
+        """,
+            (col_pk, f1_pk, 0),
+        )
+
+        # filter without pushdown
+        with self.settings(QUERY_FILTER_PUSHDOWN=False):
+            filter_query = self.collection.query_count(filter="f1 = 0")
+        self._assert_query(
+            filter_query,
+            """
+SELECT COUNT(*) FROM (SELECT I.id as id, "T_f1".value as "property_value_f1_0", "T_f1".id as "property_cid_f1" FROM mhd_data_item as I JOIN mhd_data_itemcollectionassociation as CI ON I.id = CI.item_id AND CI.collection_id = %s LEFT OUTER JOIN mhd_data_standardint AS "T_f1" ON I.id = "T_f1".item_id AND "T_f1".active AND "T_f1".prop_id = %s) AS collection WHERE "property_value_f1_0" = %s
         """,
-            (col_pk, f0_pk, f1_pk, f2_pk, invertible_pk, label_pk, 0),
+            (col_pk, f1_pk, 0),
         )
 
     def test_query_item_semantics(self) -> None:
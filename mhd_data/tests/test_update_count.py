@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import json
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from mhd_tests.utils import AssetPath, LoadJSONAsset
 
@@ -58,3 +60,91 @@ class UpdateCountTest(TestCase):
         # ensure that it is not updated
         self.assertEqual(self.collection.update_count(), None)
         self.assertEqual(self.collection.count, 100)
+
+    def test_get_count(self) -> None:
+        """Checks that get_count re-uses known counts instead of counting"""
+
+        # without a known count, the count is computed
+        self.assertTupleEqual(self.collection.get_count(), (3, True))
+
+        # with a known count, it is used for unfiltered queries
+        self.collection.count = 100
+        self.collection.save()
+        with self.assertNumQueries(0):
+            self.assertTupleEqual(self.collection.get_count(), (100, True))
+            self.assertTupleEqual(self.collection.get_count(filter="  "), (100, True))
+
+    def _count_queries(self, queries: CaptureQueriesContext) -> int:
+        """Returns the number of COUNT(*) queries that were captured"""
+        return len([q for q in queries.captured_queries if "COUNT(*)" in q["sql"]])
+
+    def test_get_count_cached(self) -> None:
+        """Checks that get_count caches counts of filtered queries"""
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTupleEqual(
+                self.collection.get_count(filter="trace = 0"), (1, True)
+            )
+        self.assertEqual(self._count_queries(queries), 1)
+
+        # the same filter (modulo formatting) does not run a count query again
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTupleEqual(
+                self.collection.get_count(filter=" (trace  = 0) "), (1, True)
+            )
+        self.assertEqual(self._count_queries(queries), 0)
+
+        # invalidating the count also invalidates the cache
+        self.collection.invalidate_count()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTupleEqual(
+                self.collection.get_count(filter="trace = 0"), (1, True)
+            )
+        self.assertEqual(self._count_queries(queries), 1)
+
+    def test_get_count_prefilter(self) -> None:
+        """Checks that get_count uses the count of a matching pre-filter"""
+
+        self.collection.prefilter_set.create(condition="trace = 0", count=42)
+        self.assertTupleEqual(self.collection.get_count(filter="trace=0"), (42, True))
+
+    def test_canonical_filter(self) -> None:
+        """Checks that canonical filters ignore formatting, but not string literals"""
+
+        from mhd_schema.count_cache import CountCache
+
+        def canonical(filter: str) -> str:
+            return CountCache.canonical_filter(self.collection, filter)
+
+        self.assertEqual(canonical(" (trace  = 0) "), canonical("trace = 0"))
+        self.assertNotEqual(canonical('trace = "a  b"'), canonical('trace = "a b"'))
+        self.assertNotEqual(canonical('trace = " a"'), canonical('trace = "a"'))
+
+    def test_get_count_invalidate_other_cache(self) -> None:
+        """Checks that invalidating counts applies to caches of other processes"""
+
+        from mhd_schema.count_cache import CountCache
+        from mhd_schema.models import Collection
+
+        # two separate caches stand in for the per-process caches of two processes
+        backend = "django.core.cache.backends.locmem.LocMemCache"
+        caches = {
+            "default": {"BACKEND": backend},
+            "first": {"BACKEND": backend, "LOCATION": "first"},
+            "second": {"BACKEND": backend, "LOCATION": "second"},
+        }
+        with self.settings(CACHES=caches):
+            first, second = CountCache("first"), CountCache("second")
+
+            first.set(self.collection, "trace = 0", 42)
+            self.assertEqual(first.get(self.collection, "trace = 0"), 42)
+
+            # invalidate from the other process, using its own instance of the collection
+            second.invalidate(Collection.objects.get(pk=self.collection.pk))
+
+            # the first process no longer sees the count, even using its outdated instance
+            self.assertIsNone(first.get(self.collection, "trace = 0"))
+
+            # updating the count of the outdated instance does not revive it
+            self.collection.update_count()
+            self.assertIsNone(first.get(self.collection, "trace = 0"))
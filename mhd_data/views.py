@@ -2,24 +2,27 @@ from __future__ import annotations
 
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, views, response
-from .models import SemanticItemSerializer
+from .models import Item, SemanticItemSerializer
 from mhd_schema.models import Collection
-from mhd.utils import DefaultRawPaginator
+from mhd.utils import DefaultRawPaginator, SeekRawPaginator
 from rest_framework import exceptions, response
 
-from django.http import Http404, HttpRequest
+from django.conf import settings
+from django.http import Http404, HttpRequest, StreamingHttpResponse
 
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from mhd_schema.models import Property
     from django.db.models import QuerySet
-    from typing import Any, Optional
+    from typing import Any, Optional, Sequence, Type
+    from rest_framework.pagination import BasePagination
     from rest_framework.response import Response
 
 
 class QueryViewException(exceptions.APIException):
-    default_code = 400
+    status_code = 400
+    default_code = "invalid_query"
     default_detail = "Incorrect query"
 
 
@@ -53,7 +56,13 @@ class QueryViewMixin:
 
 
 class QueryView(QueryViewMixin, generics.ListAPIView):
-    pagination_class = DefaultRawPaginator
+    @property
+    def pagination_class(self) -> Type[BasePagination]:
+        """Uses keyset pagination when a cursor is given, and page numbers otherwise"""
+
+        if SeekRawPaginator.cursor_query_param in self.request.query_params:
+            return SeekRawPaginator
+        return DefaultRawPaginator
 
     def get_serializer(self, *args: Any, **kwargs: Any) -> SemanticItemSerializer:
         """Creates a new serializer for the given collection and properties"""
@@ -69,6 +78,7 @@ class QueryView(QueryViewMixin, generics.ListAPIView):
 
         # build the query
         props, filter, order = self.build_query_params()
+        self._filter, self._order = filter, order
 
         # store properties and queryset
         try:
@@ -78,6 +88,7 @@ class QueryView(QueryViewMixin, generics.ListAPIView):
                 properties=props,
                 filter=filter,
                 order=order,
+                rows=True,
             )
         except FilterBuilderError as qe:
             raise QueryViewException(detail=qe)
@@ -85,15 +96,80 @@ class QueryView(QueryViewMixin, generics.ListAPIView):
         # return the queryset
         return q
 
+    def get_count(self) -> tuple[int, bool]:
+        """Returns a pair (count, exact) for the paginator"""
+
+        estimate = self.request.query_params.get("count", None) == "estimate"
+        return self._collection.get_count(filter=self._filter, estimate=estimate)
+
+    def get_seek_queryset(self, seek: Optional[Sequence[Any]], limit: int) -> QuerySet:
+        """Creates a new queryset returning the limit items after seek"""
+
+        from mhd_schema.query import QueryBuilderError
+
+        try:
+            q, _ = self._collection.query(
+                limit=limit,
+                properties=self._properties,
+                filter=self._filter,
+                order=self._order,
+                keyset=True,
+                seek=seek,
+            )
+        except QueryBuilderError as qe:
+            raise QueryViewException(detail=qe)
+
+        return q
+
+    def get_seek_key(self, item: Item) -> list[Any]:
+        """Returns the seek values of an item returned by get_seek_queryset"""
+
+        from mhd_schema.query import QueryBuilder
+
+        columns = self._collection._query_builder.order_columns(
+            self._order, self._properties
+        )
+        return QueryBuilder.seek_key(item, columns)
+
 
 class CountQueryView(QueryViewMixin, views.APIView):
     def get(self, request: HttpRequest, **kwargs: Any) -> Response:
         # get the query params and then build a count query
         props, filter, order = self.build_query_params()
-        count = self._collection.query_count(
-            properties=props, filter=filter
-        ).fetchone()[0]
-        return response.Response({"count": count})
+        estimate = self.request.query_params.get("count", None) == "estimate"
+        count, exact = self._collection.get_count(filter=filter, estimate=estimate)
+        return response.Response({"count": count, "count_exact": exact})
+
+
+class ExportView(QueryViewMixin, views.APIView):
+    def get(self, request: HttpRequest, **kwargs: Any) -> StreamingHttpResponse:
+        from mhd_schema.query import FilterBuilderError
+        from .export import STREAM_EXPORTERS, StreamExporterError
+
+        exporter_class = STREAM_EXPORTERS.get(kwargs["fmt"], None)
+        if exporter_class is None:
+            raise Http404
+
+        props, filter, order = self.build_query_params()
+        if props is None:
+            props = exporter_class.default_properties(self._collection)
+
+        try:
+            exporter = exporter_class(self._collection, props)
+            items, _ = self._collection.iterate(
+                properties=props, filter=filter, order=order
+            )
+        except (FilterBuilderError, StreamExporterError) as e:
+            raise QueryViewException(detail=e)
+
+        response = StreamingHttpResponse(
+            exporter(items, settings.QUERY_ITERSIZE),
+            content_type=exporter.content_type,
+        )
+        response["Content-Disposition"] = 'attachment; filename="{}.{}"'.format(
+            self._collection.slug, exporter.extension
+        )
+        return response
 
 
 class ItemView(generics.RetrieveAPIView):
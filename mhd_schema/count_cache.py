@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+""" This file contains the cache for counts of (filtered) collection queries """
+import hashlib
+import json
+
+from django.core.cache import caches
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Optional
+    from django.core.cache.backends.base import BaseCache
+    from .models import Collection
+    from .query import FilterAST
+
+# name of the django cache used for counts, see the CACHES setting
+COUNT_CACHE_ALIAS = "counts"
+
+
+class CountCache(object):
+    """
+    Caches the number of items matching a filter in a collection.
+
+    Counts are keyed by the collection and a canonical serialization of the parsed filter,
+    meaning that filters only differing in whitespace or brackets share the same count.
+    Expiry and (LRU) eviction is left to the underlying django cache.
+
+    To invalidate all counts of a collection at once, keys contain the count generation
+    of the collection, which invalidate() increments.
+    The generation is stored in the database and read whenever a key is built, so that
+    invalidation also applies to caches of other processes (e.g. when the cache backend is
+    not shared) and to outdated instances of the collection.
+    Note that saving all fields of an outdated instance still writes back its older generation.
+    """
+
+    alias: str
+
+    def __init__(self, alias: str = COUNT_CACHE_ALIAS) -> None:
+        self.alias = alias
+
+    @property
+    def cache(self) -> BaseCache:
+        return caches[self.alias]
+
+    def get(self, collection: Collection, filter: Optional[str]) -> Optional[int]:
+        """Returns the cached count of a filter in collection, or None"""
+
+        return self.cache.get(self.key(collection, filter))
+
+    def set(self, collection: Collection, filter: Optional[str], count: int) -> None:
+        """Caches the count of a filter in collection"""
+
+        self.cache.set(self.key(collection, filter), count)
+
+    def invalidate(self, collection: Collection) -> None:
+        """Invalidates all cached counts of the given collection"""
+
+        collection.bump_count_generation()
+
+    def key(self, collection: Collection, filter: Optional[str]) -> str:
+        """Returns the cache key for the count of a filter in a collection"""
+
+        digest = hashlib.sha1(
+            self.canonical_filter(collection, filter).encode("utf-8")
+        ).hexdigest()
+        return "mhd_schema.count.{}.{}.{}".format(
+            collection.pk, self._generation(collection), digest
+        )
+
+    @staticmethod
+    def canonical_filter(collection: Collection, filter: Optional[str]) -> str:
+        """
+        Returns a canonical serialization of a filter.
+        Raises FilterBuilderError if the filter can not be parsed.
+        """
+
+        if filter is None or filter.strip() == "":
+            return ""
+
+        tree = collection._query_builder.filter_builder.parse(filter)
+        return json.dumps(_strip_raw(tree), sort_keys=True, separators=(",", ":"))
+
+    @staticmethod
+    def _generation(collection: Collection) -> int:
+        """Returns the current count generation of collection"""
+
+        from .models import Collection
+
+        # read from the database, as the instance may be outdated
+        return (
+            Collection.objects.filter(pk=collection.pk)
+            .values_list("count_generation", flat=True)
+            .get()
+        )
+
+
+def _strip_raw(tree: FilterAST) -> Any:
+    """Removes the (formatting-dependent) raw source of literals from a filter AST"""
+
+    if isinstance(tree, dict):
+        return {k: _strip_raw(v) for (k, v) in tree.items() if k != "raw"}
+    if isinstance(tree, list):
+        return [_strip_raw(v) for v in tree]
+    return tree
+
+
+count_cache = CountCache()
+
+__all__ = ["CountCache", "count_cache"]
@@ -6,7 +6,10 @@ import os
 from django.db.models import QuerySet
 
 from mhd_schema.models import Collection, Exporter, Property, PreFilter
+from mhd_schema.indexes import PropertyIndexes
+from mhd_schema.schema import CollectionSchema
 from mhd_data.models import CodecManager
+from mhd_data.partitions import CodecPartitions
 
 from tqdm import tqdm
 
@@ -23,6 +26,8 @@ class SchemaImporter(object):
     def __init__(self, data: Any = None, root_path: str = "", quiet: bool = False):
         self.logger = logging.getLogger("mhd.schemaimporter")
         self.logger.setLevel(logging.WARN if quiet else logging.DEBUG)
+        self.quiet = quiet
+        self.partitions = CodecPartitions(quiet)
         self.root_path = root_path
 
         self._validate_data(data)
@@ -98,10 +103,11 @@ class SchemaImporter(object):
                     )
                 )
 
-        if "default" in data and not isinstance(data["default"], bool):
-            raise SchemaValidationError(
-                "Property {0!r}, Key {1} is not a boolean. ".format(slug, "default")
-            )
+        for k in ["default", "index"]:
+            if k in data and not isinstance(data[k], bool):
+                raise SchemaValidationError(
+                    "Property {0!r}, Key {1} is not a boolean. ".format(slug, k)
+                )
 
         if "metadata" in data and not isinstance(data["metadata"], dict):
             raise SchemaValidationError(
@@ -236,10 +242,11 @@ class SchemaImporter(object):
         )
 
         # Create all the properties
-        props = [
-            self.__call__property(collection, p, update=update)[0]
+        props_created = [
+            self.__call__property(collection, p, update=update)
             for p in tqdm(properties, leave=False)
         ]
+        props = [p for (p, _) in props_created]
         self.logger.info("Created {1} properties for {0!r}".format(slug, len(props)))
 
         # fetch the extra properties and remove them
@@ -250,6 +257,27 @@ class SchemaImporter(object):
             "Disassociated {1} properties from {0!r}".format(slug, len(extra))
         )
 
+        # create or drop the indexes of (no longer) indexed properties
+        # (only those of this collection, as this runs inside the upsert transaction)
+        created_indexes, dropped_indexes = PropertyIndexes(self.quiet).reconcile(props)
+        if created_indexes > 0 or dropped_indexes > 0:
+            self.logger.info(
+                "Created {0} and dropped {1} property index(es)".format(
+                    created_indexes, dropped_indexes
+                )
+            )
+
+        # increase the schema version, invalidating cached schemas (and compiled filters).
+        # this happens for every upsert, as existing properties are updated in place.
+        # snapshots cached by this process are also dropped, as ids of deleted collections may be re-used.
+        collection.bump_schema_version()
+        CollectionSchema.forget(collection.pk)
+        self.logger.info(
+            "Updated schema of {0!r} to version {1}".format(
+                slug, collection.schema_version
+            )
+        )
+
         # and return
         return collection, created
 
@@ -263,6 +291,7 @@ class SchemaImporter(object):
         {
             'displayName': string,
             'default': bool # optional
+            'index': bool # optional, maintain indexes for filtering on this property
             'slug': string,
             'metadata': {} # any JSON, optional
             'codec': string
@@ -285,6 +314,7 @@ class SchemaImporter(object):
         # read all the values
         slug = prop["slug"]
         default = prop.get("default", True)
+        indexed = prop.get("index", None)
         displayName = prop["displayName"]
         metadata = prop.get("metadata", None)
         codec = prop["codec"]
@@ -309,6 +339,8 @@ class SchemaImporter(object):
             p.description = description
             p.url = url
             p.metadata = metadata
+            if indexed is not None:
+                p.indexed = indexed
             p.save()
 
             return p, False
@@ -322,10 +354,14 @@ class SchemaImporter(object):
             url=url,
             codec=codec,
             metadata=metadata,
+            indexed=bool(indexed),
         )
         created_prop.collections.add(collection)
         created_prop.save()
 
+        # if the codec table is partitioned, give the property its own partition
+        self.partitions.create(created_prop)
+
         return created_prop, True
 
 
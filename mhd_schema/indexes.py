@@ -0,0 +1,224 @@
+""" This file contains the management of per-property database indexes """
+from __future__ import annotations
+
+import logging
+
+from django.db import connection, models
+
+from .models import Property, PropertyIndex
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Iterable, Optional, Type
+    from mhd_data.models import Codec
+
+    # an index that should exist: (name, kind, codec, property, create sql)
+    IndexDefinition = tuple[str, str, str, Optional[Property], str]
+
+# checks if an index exists, but is invalid (e.g. after a failed concurrent build)
+INVALID_INDEX_SQL = """
+SELECT 1 FROM pg_index
+JOIN pg_class index ON index.oid = pg_index.indexrelid
+WHERE index.relname = %s
+AND index.relnamespace = to_regnamespace(current_schema())
+AND NOT pg_index.indisvalid
+"""
+
+
+class PropertyIndexes(object):
+    """
+    Maintains database indexes for filtering on properties marked as indexed.
+
+    For each indexed property of a filterable codec (i.e. one with operators) a partial index
+        CREATE INDEX ... ON codec_table (value, item_id) WHERE prop_id = X AND active
+    is created. Furthermore, on postgres, each codec table holding an indexed property receives a covering index
+        CREATE INDEX ... ON codec_table (prop_id, item_id) INCLUDE (value) WHERE active
+    so that joins on the table can be answered from the index.
+
+    Indexes that exist are tracked using the PropertyIndex model, so that reconcile() only
+    creates missing and drops unneeded indexes.
+    Indexes are created using IF NOT EXISTS, and invalid leftovers of failed (concurrent)
+    builds are dropped first, so that reconcile() can be re-run after a failure.
+    """
+
+    logger: logging.Logger
+
+    def __init__(self, quiet: bool = False):
+        self.logger = logging.getLogger("mhd.propertyindexes")
+        self.logger.setLevel(logging.WARN if quiet else logging.DEBUG)
+
+    @staticmethod
+    def partial_name(prop: Property) -> str:
+        return "mhd_prop_{}_idx".format(prop.pk)
+
+    @staticmethod
+    def covering_name(codec: Type[Codec]) -> str:
+        return "mhd_{}_cov_idx".format(codec.get_codec_name().lower())
+
+    @staticmethod
+    def supports_covering() -> bool:
+        """Checks if the database supports covering (INCLUDE) indexes"""
+
+        return connection.vendor == "postgresql" and connection.pg_version >= 110000
+
+    def definitions(
+        self, properties: Optional[Iterable[Property]] = None
+    ) -> list[IndexDefinition]:
+        """
+        Returns the definitions of all indexes that should exist.
+        When properties is given, only returns those of the given properties and their codecs.
+        """
+
+        qn = connection.ops.quote_name
+
+        indexes: list[IndexDefinition] = []
+        covered: dict[str, Type[Codec]] = {}
+
+        indexed = Property.objects.filter(indexed=True).order_by("id")
+        if properties is not None:
+            properties = list(properties)
+            indexed = indexed.filter(codec__in={p.codec for p in properties})
+            scope = {p.pk for p in properties}
+
+        for prop in indexed:
+            codec = prop.codec_model
+            if len(codec.operators) == 0:
+                if properties is None or prop.pk in scope:
+                    self.logger.warning(
+                        "Property {!r}: Codec {} can not be filtered, not indexing".format(
+                            prop.slug, codec.get_codec_name()
+                        )
+                    )
+                continue
+
+            # properties with the same codec still determine if the covering index is needed
+            covered[codec.get_codec_name()] = codec
+            if properties is not None and prop.pk not in scope:
+                continue
+
+            name = self.partial_name(prop)
+            sql = "CREATE INDEX IF NOT EXISTS {} ON {} ({}, item_id) WHERE prop_id = {:d} AND active".format(
+                qn(name),
+                qn(codec._meta.db_table),
+                ", ".join(qn(f) for f in codec.value_fields),
+                prop.pk,
+            )
+            indexes.append(
+                (name, PropertyIndex.PARTIAL, codec.get_codec_name(), prop, sql)
+            )
+
+        if self.supports_covering():
+            for (codec_name, codec) in covered.items():
+                name = self.covering_name(codec)
+                sql = "CREATE INDEX IF NOT EXISTS {} ON {} (prop_id, item_id) INCLUDE ({}) WHERE active".format(
+                    qn(name),
+                    qn(codec._meta.db_table),
+                    ", ".join(qn(f) for f in codec.value_fields),
+                )
+                indexes.append((name, PropertyIndex.COVERING, codec_name, None, sql))
+
+        return indexes
+
+    def reconcile(
+        self, properties: Optional[Iterable[Property]] = None
+    ) -> tuple[int, int]:
+        """
+        Creates all missing and drops all unneeded indexes.
+        When properties is given, only considers the indexes of the given properties
+        (and the covering indexes of their codecs), as well as indexes of deleted properties.
+        Returns a pair (created, dropped) of the number of affected indexes.
+        """
+
+        if properties is not None:
+            properties = list(properties)
+
+        wanted = {d[0]: d for d in self.definitions(properties)}
+
+        indexes = PropertyIndex.objects.all()
+        if properties is not None:
+            # indexes of the properties, of deleted properties, and covering indexes of their codecs
+            of_properties = models.Q(property__in=properties)
+            of_deleted = models.Q(property=None, kind=PropertyIndex.PARTIAL)
+            of_codecs = models.Q(
+                kind=PropertyIndex.COVERING, codec__in={p.codec for p in properties}
+            )
+            indexes = indexes.filter(of_properties | of_deleted | of_codecs)
+        existing = {i.name: i for i in indexes}
+
+        dropped = 0
+        for (name, index) in existing.items():
+            if name in wanted:
+                continue
+            self._execute("DROP INDEX IF EXISTS {}".format(self._quote_name(name)))
+            index.delete()
+            self.logger.info("Dropped index {!r}".format(name))
+            dropped += 1
+
+        created = 0
+        for (name, kind, codec, prop, sql) in wanted.values():
+            if name in existing:
+                continue
+
+            # a failed concurrent build leaves an invalid index behind
+            self._drop_invalid(name)
+
+            # concurrent index builds are not supported on partitioned tables
+            self._execute(sql, concurrently=not self._is_partitioned(codec))
+            PropertyIndex.objects.create(
+                name=name, kind=kind, codec=codec, property=prop
+            )
+            self.logger.info("Created index {!r}".format(name))
+            created += 1
+
+        return created, dropped
+
+    def set_indexed(self, properties: Iterable[Property], indexed: bool) -> int:
+        """Marks the given properties as (not) indexed, and returns the number of changed properties"""
+
+        pks = [p.pk for p in properties]
+        return (
+            Property.objects.filter(pk__in=pks)
+            .exclude(indexed=indexed)
+            .update(indexed=indexed)
+        )
+
+    @staticmethod
+    def _is_partitioned(codec_name: str) -> bool:
+        from mhd_data.models import CodecManager
+        from mhd_data.partitions import CodecPartitions
+
+        return CodecPartitions(quiet=True).is_partitioned(
+            CodecManager.find_codec(codec_name)
+        )
+
+    def _drop_invalid(self, name: str) -> None:
+        """Drops the index with the given name if it exists but is invalid"""
+
+        if connection.vendor != "postgresql":
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(INVALID_INDEX_SQL, [name])
+            invalid = cursor.fetchone() is not None
+
+        if invalid:
+            self._execute("DROP INDEX IF EXISTS {}".format(self._quote_name(name)))
+            self.logger.warning("Dropped invalid index {!r}".format(name))
+
+    @staticmethod
+    def _quote_name(name: str) -> str:
+        return connection.ops.quote_name(name)
+
+    @staticmethod
+    def _execute(sql: str, concurrently: bool = False) -> None:
+        # concurrent index builds do not block writes, but can not run inside a transaction
+        postgres = connection.vendor == "postgresql"
+        if concurrently and postgres and not connection.in_atomic_block:
+            sql = sql.replace("CREATE INDEX ", "CREATE INDEX CONCURRENTLY ", 1)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+
+
+__all__ = ["PropertyIndexes"]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
 
 from mhd.utils import with_simulate_arg
 from ...models import Collection
@@ -17,6 +18,25 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser: ArgumentParser) -> None:
         parser.add_argument("slug", help="Slug of collection to delete")
+        parser.add_argument(
+            "--flush",
+            "-f",
+            action="store_true",
+            help="Remove all items from the collection first, instead of failing when it is not empty. ",
+        )
+        parser.add_argument(
+            "--batch-size",
+            "-b",
+            type=int,
+            default=None,
+            help="When flushing, remove items in batches of the given size. See flush_collection. ",
+        )
+        parser.add_argument(
+            "--quiet",
+            "-q",
+            action="store_true",
+            help="Do not produce any output in case of success",
+        )
         parser.add_argument(
             "--simulate",
             "-s",
@@ -24,7 +44,17 @@ class Command(BaseCommand):
             help="Simulate all database operations by wrapping them in a transaction and rolling it back at the end of the command. ",
         )
 
-    @with_simulate_arg
     def handle(self, *args: Any, **kwargs: Any) -> None:
+        # batches of a flush are committed one at a time
+        if kwargs["batch_size"] is None or kwargs["simulate"]:
+            with_simulate_arg(self._handle)(*args, **kwargs)
+        else:
+            self._handle(*args, **kwargs)
+
+    def _handle(self, *args: Any, **kwargs: Any) -> None:
         collection = Collection.objects.get(slug=kwargs["slug"])
-        collection.safe_delete()
+        if kwargs["flush"]:
+            collection.flush(batch_size=kwargs["batch_size"], quiet=kwargs["quiet"])
+
+        with transaction.atomic():
+            collection.safe_delete()
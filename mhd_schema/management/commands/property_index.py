@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from mhd.utils import with_simulate_arg
+
+from django.core.management.base import BaseCommand, CommandError
+
+import logging
+
+from ...indexes import PropertyIndexes
+from ...models import Collection, PropertyIndex
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any
+    from argparse import ArgumentParser
+
+
+class Command(BaseCommand):
+    help = "Manages indexes for filtering on properties of a given collection. "
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument("collection", help="Slug of collection to update")
+        parser.add_argument(
+            "properties",
+            nargs="*",
+            help="Slugs of properties to update. Defaults to all properties of the collection. ",
+        )
+        parser.add_argument(
+            "--quiet",
+            "-q",
+            action="store_true",
+            help="Do not produce any output in case of success",
+        )
+        parser.add_argument(
+            "--simulate",
+            "-s",
+            action="store_true",
+            help="Simulate all database operations by wrapping them in a transaction and rolling it back at the end of the command. ",
+        )
+
+        modes = parser.add_mutually_exclusive_group(required=True)
+        modes.add_argument(
+            "--enable",
+            "-e",
+            action="store_true",
+            help="Marks the properties as indexed and creates their indexes",
+        )
+        modes.add_argument(
+            "--disable",
+            "-d",
+            action="store_true",
+            help="Marks the properties as not indexed and drops their indexes",
+        )
+        modes.add_argument(
+            "--sync",
+            action="store_true",
+            help="Creates missing and drops unneeded indexes of all properties",
+        )
+        modes.add_argument(
+            "--inspect",
+            "-i",
+            action="store_true",
+            help="Shows the indexes of the properties",
+        )
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        # concurrent index builds (on postgres) can not run inside a transaction
+        if kwargs["simulate"] or kwargs["inspect"]:
+            with_simulate_arg(self._handle)(*args, **kwargs)
+        else:
+            self._handle(*args, **kwargs)
+
+    def _handle(self, *args: Any, **kwargs: Any) -> None:
+        logger = logging.getLogger("mhd.propertyindexes")
+        logger.setLevel(logging.WARN if kwargs["quiet"] else logging.DEBUG)
+
+        collection = Collection.objects.get(slug=kwargs["collection"])
+        properties = list(collection.property_set.all())
+        if len(kwargs["properties"]) > 0:
+            by_slug = {p.slug: p for p in properties}
+            for slug in kwargs["properties"]:
+                if slug not in by_slug:
+                    raise CommandError(
+                        "Collection {!r} has no property {!r}".format(
+                            collection.slug, slug
+                        )
+                    )
+            properties = [by_slug[slug] for slug in kwargs["properties"]]
+
+        indexes = PropertyIndexes(quiet=kwargs["quiet"])
+
+        if kwargs["inspect"]:
+            for p in properties:
+                names = list(
+                    PropertyIndex.objects.filter(property=p).values_list(
+                        "name", flat=True
+                    )
+                )
+                logger.info(
+                    "Property {!r}: {}, {}".format(
+                        p.slug,
+                        "indexed" if p.indexed else "not indexed",
+                        "index(es) {}".format(", ".join(names))
+                        if len(names) > 0
+                        else "no indexes",
+                    )
+                )
+            return
+
+        if kwargs["enable"] or kwargs["disable"]:
+            changed = indexes.set_indexed(properties, kwargs["enable"])
+            logger.info(
+                "Marked {} propertie(s) as {}".format(
+                    changed, "indexed" if kwargs["enable"] else "not indexed"
+                )
+            )
+
+        # only a full sync considers the indexes of all properties
+        created, dropped = indexes.reconcile(None if kwargs["sync"] else properties)
+        logger.info("Created {} and dropped {} index(es)".format(created, dropped))
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.20 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mhd_schema', '0015_alter_collection_exporters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collection',
+            name='schema_version',
+            field=models.PositiveIntegerField(default=0, help_text='Version of the schema of this collection, incremented whenever its properties change'),
+        ),
+    ]
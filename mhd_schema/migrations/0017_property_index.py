@@ -0,0 +1,33 @@
+# Generated by Django 3.2.20 on 2026-10-18 00:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mhd_schema', '0016_collection_schema_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='indexed',
+            field=models.BooleanField(default=False, help_text='Maintain dedicated database indexes for filtering on this property, see the property_index command'),
+        ),
+        migrations.CreateModel(
+            name='PropertyIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.SlugField(help_text='Name of the index in the database', max_length=63, unique=True)),
+                ('kind', models.CharField(choices=[('partial', 'Partial index on the values of a single property'), ('covering', 'Covering index on all values of a codec table')], max_length=10)),
+                ('codec', models.SlugField(help_text='Name of the codec table being indexed')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('property', models.ForeignKey(blank=True, help_text='Property indexed by a partial index (if it still exists)', null=True, on_delete=django.db.models.deletion.SET_NULL, to='mhd_schema.property')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.20 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mhd_schema', '0017_property_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collection',
+            name='count_generation',
+            field=models.PositiveIntegerField(default=0, help_text='Generation of cached counts of this collection, incremented whenever they are invalidated'),
+        ),
+    ]
@@ -2,14 +2,17 @@ from __future__ import annotations
 
 from mhd.utils import ModelWithMetadata, QuerySetLike
 from mviews.models import View
+from django.conf import settings
 from django.db import models, transaction, connection
 from django.db.models.signals import post_save
 
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Optional, Iterable, Type, Any
+    from typing import Optional, Iterable, Iterator, Type, Any, Sequence
+    from datetime import datetime
     from .query import QueryBuilder
+    from .schema import CollectionSchema
     from mhd_data.models import Codec
     from django.db.models import QuerySet
     from collections import OrderedDict
@@ -75,6 +78,31 @@ class Collection(ModelWithMetadata):
         blank=True,
     )
 
+    schema_version: int = models.PositiveIntegerField(
+        default=0,
+        help_text="Version of the schema of this collection, incremented whenever its properties change",
+    )
+
+    def bump_schema_version(self) -> None:
+        """Increments the schema version, invalidating anything cached for the previous schema"""
+
+        self.schema_version += 1
+        self.save(update_fields=["schema_version"])
+
+    count_generation: int = models.PositiveIntegerField(
+        default=0,
+        help_text="Generation of cached counts of this collection, incremented whenever they are invalidated",
+    )
+
+    def bump_count_generation(self) -> None:
+        """Increments the count generation, invalidating all cached counts of this collection"""
+
+        # increment in the database, so that concurrent invalidations are not lost
+        Collection.objects.filter(pk=self.pk).update(
+            count_generation=models.F("count_generation") + 1
+        )
+        self.refresh_from_db(fields=["count_generation"])
+
     def update_count(self) -> Optional[int]:
         """Updates the count of items in this collection iff it is not frozen"""
 
@@ -82,7 +110,7 @@ class Collection(ModelWithMetadata):
             return None
 
         self.count = self.query_count().fetchone()[0]
-        self.save()
+        self.save(update_fields=["count"])
 
         for p in self.prefilter_set.all():
             p.update_count()
@@ -92,37 +120,84 @@ class Collection(ModelWithMetadata):
     def invalidate_count(self) -> None:
         """Invalidates the count associated to this collection iff it is no frozen"""
 
+        # cached counts of filtered queries are always invalidated
+        from .count_cache import count_cache
+
+        count_cache.invalidate(self)
+
         if self.count_frozen:
             return
 
         self.count = None
-        self.save()
+        self.save(update_fields=["count"])
 
         for p in self.prefilter_set.all():
             p.invalidate_count()
 
+    def get_count(
+        self, filter: Optional[str] = None, estimate: bool = False
+    ) -> tuple[int, bool]:
+        """
+        Returns a pair (count, exact) of the number of items matching filter.
+        Avoids sending a COUNT(*) query whenever possible, by using (in order):
+        - the count of this collection (if filter is empty)
+        - the count of a matching pre-filter
+        - a cached count of a previous call with the same filter (see CountCache)
+        - an estimate by the query planner (if estimate is True and the estimate is large)
+        Only in the last case is the count not exact.
+        """
+
+        from .count_cache import count_cache
+
+        canonical = count_cache.canonical_filter(self, filter)
+        if canonical == "":
+            if self.count is not None:
+                return self.count, True
+        else:
+            for p in self.prefilter_set.all():
+                if p.count is not None and p.canonical_condition() == canonical:
+                    return p.count, True
+
+        count = count_cache.get(self, filter)
+        if count is not None:
+            return count, True
+
+        if estimate and canonical != "":
+            estimated = self.query_estimate(filter=filter)
+            if estimated is not None and estimated >= settings.COUNT_ESTIMATE_THRESHOLD:
+                return estimated, False
+
+        count = self.query_count(filter=filter).fetchone()[0]
+        count_cache.set(self, filter, count)
+        return count, True
+
     flag_large_collection: bool = models.BooleanField(
         default=False,
         help_text="Flag this collection as potentially large to the user interface",
     )
 
+    @property
+    def schema(self) -> CollectionSchema:
+        """Returns a (cached) snapshot of the properties of this collection"""
+
+        from .schema import CollectionSchema
+
+        return CollectionSchema.get(self)
+
     def get_property(self, slug: str) -> Optional[Property]:
         """Returns a property of the given name"""
-        return self.property_set.filter(slug=slug).first()
+        return self.schema.get_property(slug)
 
     def __str__(self) -> str:
         return "Collection {0!r}".format(self.slug)
 
     def properties(self) -> Iterable[Property]:
-        return self.property_set.all()
+        return self.schema.properties
 
     @property
     def codecs(self) -> Iterable[Codec]:
         """An iterator for the codecs of this collection"""
-        codecs = set()
-        for prop in self.property_set.all():
-            codecs.add(prop.codec_model)
-        return codecs
+        return self.schema.codecs
 
     def query(
         self,
@@ -131,6 +206,9 @@ class Collection(ModelWithMetadata):
         limit: Optional[int] = None,
         offset: Optional[int] = None,
         order: Optional[str] = None,
+        keyset: bool = False,
+        seek: Optional[Sequence[Any]] = None,
+        rows: bool = False,
     ) -> QuerySet:
         """
         Builds a query returning items in this collection with
@@ -139,6 +217,10 @@ class Collection(ModelWithMetadata):
         Limit and Offset can be used for pagination, however using only
         offset is not supported.
         Order represents an order to return the results in.
+        Keyset and seek can be used for keyset pagination instead, see
+        QueryBuilder for details.
+        When rows is True, the query returns plain tuples instead of Item instances,
+        which can be decoded using SemanticItemSerializer.
         Returns a tuple (query, properties) of the RawQuerySet query itself and the list
         of queried properties
         """
@@ -165,11 +247,41 @@ class Collection(ModelWithMetadata):
             order=order,
             count_query=False,
             use_view=use_view,
+            keyset=keyset,
+            seek=seek,
         )
 
         # and return it
+        if rows:
+            return QuerySetLike(sql, sql_args), list(properties)
         return Item.objects.raw(sql, sql_args), list(properties)
 
+    def query_estimate(self, filter: Optional[str] = None) -> Optional[int]:
+        """
+        Returns the number of items matching filter as estimated by the database,
+        or None if the database does not support estimates.
+        """
+
+        # check if we have a view
+        view = self.view
+        if view is not None:
+            use_view = view.name
+        else:
+            use_view = None
+
+        # build a query that does not select any properties
+        sql, sql_args = self._query_builder(
+            properties=[],
+            where=filter,
+            limit=None,
+            offset=None,
+            order=None,
+            count_query=False,
+            use_view=use_view,
+        )
+
+        return QuerySetLike(sql, sql_args).estimate()
+
     def query_count(
         self,
         properties: Optional[Iterable[Property]] = None,
@@ -206,6 +318,36 @@ class Collection(ModelWithMetadata):
         # and return it
         return QuerySetLike(sql, sql_args)
 
+    def iterate(
+        self,
+        properties: Optional[Iterable[Property]] = None,
+        filter: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        order: Optional[str] = None,
+        itersize: Optional[int] = None,
+    ) -> tuple[Iterator[tuple[Any, ...]], list[Property]]:
+        """
+        Like .query(rows=True), but returns an iterator over all results that uses a
+        single server-side cursor (where supported) fetching itersize rows at a time.
+        Results are only held in memory one chunk at a time.
+        On PostgreSQL, a transaction is held while iterating, see QuerySetLike.iterate().
+        When itersize is None, uses the QUERY_ITERSIZE setting.
+        """
+
+        qset, props = self.query(
+            properties=properties,
+            filter=filter,
+            limit=limit,
+            offset=offset,
+            order=order,
+            rows=True,
+        )
+        if itersize is None:
+            itersize = settings.QUERY_ITERSIZE
+
+        return qset.iterate(itersize), props
+
     @property
     def view(self) -> Optional[View]:
         """Returns the view for this collection"""
@@ -215,19 +357,33 @@ class Collection(ModelWithMetadata):
             return None
 
         mview_sql, mview_sql_params = self._query_builder.join_builder()
-        return View.make_view(
+        return View.resolve(
             self.viewName,
             mview_sql,
             mview_sql_params,
             materialized=View.supports_materialization(connection),
         )
 
-    def semantic(self, *args: Any, **kwargs: Any) -> Iterable[OrderedDict]:
-        """Same as running .query() and calling .semantic() on each returned value"""
+    def semantic(
+        self, *args: Any, itersize: Optional[int] = None, **kwargs: Any
+    ) -> Iterable[OrderedDict]:
+        """
+        Same as running .query() and calling .semantic() on each returned value.
+        When itersize is given, uses .iterate() instead, fetching itersize results
+        at a time from a server-side cursor.
+        """
+
+        from mhd_data.models import SemanticItemSerializer
 
         # make the query
-        qset, props = self.query(*args, **kwargs)
-        return map(lambda o: o.semantic_result(self, props), qset)
+        if itersize is not None:
+            qset, props = self.iterate(*args, itersize=itersize, **kwargs)
+        else:
+            qset, props = self.query(*args, rows=True, **kwargs)
+
+        # and serialize each result using a single serializer
+        serializer = SemanticItemSerializer(collection=self, properties=props)
+        return map(serializer.to_representation, qset)
 
     def is_empty(self) -> bool:
         """Checks if this collection is empty"""
@@ -253,36 +409,60 @@ class Collection(ModelWithMetadata):
         # clear the property set
         self.property_set.clear()
 
-        # clear all 'orphaned' properties
-        Property.objects.filter(collections=None).delete()
+        # clear all 'orphaned' properties (and their partitions)
+        from mhd_data.partitions import CodecPartitions
+
+        partitions = CodecPartitions(quiet=True)
+        orphaned = Property.objects.filter(collections=None)
+        for p in orphaned:
+            partitions.drop(p)
+        orphaned.delete()
 
         # now delete it from the database
         self.delete()
 
-    @transaction.atomic()
-    def flush(self) -> None:
-        """Removes all items from this collection"""
-
-        # first delete all the values for all the properties
-        for p in self.property_set.all():
-            p.values(self).delete()
+    def flush(
+        self, batch_size: Optional[int] = None, quiet: bool = True
+    ) -> dict[str, int]:
+        """
+        Removes all items from this collection, see mhd_data.flush.CollectionFlusher.
+        When batch_size is None, runs inside a single transaction.
+        Otherwise each batch of batch_size items runs in it's own transaction.
+        Returns the number of deleted rows for each table.
+        Afterwards, the count of this collection is invalidated.
+        """
 
-        # Dis-associate all the items
-        self.item_set.clear()
+        from mhd_data.flush import CollectionFlusher
 
-        # clear all the orphaned items
-        from mhd_data.models import Item
+        flusher = CollectionFlusher(self, batch_size=batch_size, quiet=quiet)
+        if batch_size is not None:
+            deleted = flusher()
+            self.invalidate_count()
+            return deleted
 
-        Item.objects.filter(collections=None).delete()
+        with transaction.atomic():
+            deleted = flusher()
+            self.invalidate_count()
+            return deleted
 
 
 def collection_save(
-    sender: Type[Collection], instance: Collection, **kwargs: Any
+    sender: Type[Collection], instance: Collection, created: bool, **kwargs: Any
 ) -> None:
     """Creates the view of a collection"""
-    view = instance.view
-    if view is not None:
-        view.save()
+
+    # a new collection might re-use the id of a deleted one
+    if created:
+        from .query import FilterBuilder
+        from .schema import CollectionSchema
+
+        FilterBuilder.forget(instance.pk)
+        CollectionSchema.forget(instance.pk)
+
+    # re-check the stored view against the database
+    if instance.viewName:
+        View.forget(instance.viewName)
+    instance.view
 
 
 post_save.connect(collection_save, sender=Collection)
@@ -335,6 +515,11 @@ class Property(ModelWithMetadata):
         help_text="Name of the codec table that stores this property "
     )
 
+    indexed: bool = models.BooleanField(
+        default=False,
+        help_text="Maintain dedicated database indexes for filtering on this property, see the property_index command",
+    )
+
     @property
     def codec_model(self) -> Type[Codec]:
         """Returns the Codec Model belonging to this Property or None"""
@@ -365,10 +550,11 @@ class Property(ModelWithMetadata):
         optionally only those linked to a specific collection.
         """
 
+        values = self.codec_model.objects.filter(prop_id=self.id)
         if collection is not None:
-            self.codec_model.objects.filter(item__in=collection.item_set.all())
+            values = values.filter(item__collections=collection)
 
-        return self.codec_model.objects.filter(prop_id=self.id)
+        return values
 
     def has_values(self, collection: Optional[Collection] = None) -> bool:
         """Returns a bool indicating if this property has any values"""
@@ -388,6 +574,37 @@ class PropertyCollectionMembership(models.Model):
     collection: Collection = models.ForeignKey(Collection, on_delete=models.CASCADE)
 
 
+class PropertyIndex(models.Model):
+    """A database index on a codec table created for indexed properties, see mhd_schema.indexes"""
+
+    class Meta:
+        ordering = ["name"]
+
+    PARTIAL = "partial"
+    COVERING = "covering"
+    KIND_CHOICES = [
+        (PARTIAL, "Partial index on the values of a single property"),
+        (COVERING, "Covering index on all values of a codec table"),
+    ]
+
+    name: str = models.SlugField(
+        unique=True, max_length=63, help_text="Name of the index in the database"
+    )
+    kind: str = models.CharField(max_length=10, choices=KIND_CHOICES)
+    codec: str = models.SlugField(help_text="Name of the codec table being indexed")
+    property: Optional[Property] = models.ForeignKey(
+        Property,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        help_text="Property indexed by a partial index (if it still exists)",
+    )
+    created: datetime = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return "PropertyIndex {0!r} ({1!s})".format(self.name, self.kind)
+
+
 class PreFilter(models.Model):
     collection: Collection = models.ForeignKey(Collection, on_delete=models.CASCADE)
     description: str = models.TextField(
@@ -407,6 +624,17 @@ class PreFilter(models.Model):
         self.count = self.collection.query_count(filter=self.condition).fetchone()[0]
         self.save()
 
+    def canonical_condition(self) -> Optional[str]:
+        """Returns the canonical serialization of the condition, or None if it is invalid"""
+
+        from .count_cache import CountCache
+        from .query import FilterBuilderError
+
+        try:
+            return CountCache.canonical_filter(self.collection, self.condition)
+        except FilterBuilderError:
+            return None
+
     def invalidate_count(self) -> None:
         """Invalidates the count of this pre-filter"""
 
@@ -3,10 +3,17 @@ from __future__ import annotations
 """ This file contains the main query and filter builder """
 from PreJsPy import PreJsPy
 
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, models
+
+from mhd.utils import LRUCache
+
 from mhd_data.models import CodecManager, Codec, Item
+from mhd_data.fields.json import DumbJSONField
 from .models import Property, Collection
 
-from typing import TYPE_CHECKING, TypeAlias, Type, Any, Optional, Iterable
+from typing import TYPE_CHECKING, TypeAlias, Type, Any, Optional, Iterable, Sequence
 
 if TYPE_CHECKING:
     SQL: TypeAlias = str
@@ -17,6 +24,17 @@ if TYPE_CHECKING:
     FilterAST: TypeAlias = Any
 
 
+# fields whose seek values are converted into the type of the field
+SEEK_FIELD_TYPES = (
+    models.IntegerField,
+    models.FloatField,
+    models.DecimalField,
+    models.BooleanField,
+    models.CharField,
+    models.TextField,
+)
+
+
 class QueryBuilder(object):
     """The QueryBuilder class represents the class to build queries from"""
 
@@ -53,6 +71,9 @@ class QueryBuilder(object):
         limit: Optional[int],
         count_query: bool,
         use_view: Optional[str],
+        keyset: bool = False,
+        seek: Optional[Sequence[Any]] = None,
+        pushdown: Optional[bool] = None,
     ) -> SQLWithParams:
         """Builds an SQL query on this collection. See inline documentation for details of the query.
 
@@ -63,6 +84,9 @@ class QueryBuilder(object):
         :param limit: Maximal number of element to return. If omitted, no LIMIT clause is used.
         :param count_query: If True, return a query that SELECTs Count(*).
         :param use_view: An optional string containing the name of a view to use for generating this query. When omitted, a full join() clause is used.
+        :param keyset: If True, order by the order columns followed by the item id, as needed for keyset pagination.
+        :param seek: Optional values (as returned by seek_key()) of the row to return elements after. Implies keyset.
+        :param pushdown: If True, push single-property conditions of the filter into the join. Defaults to the QUERY_FILTER_PUSHDOWN setting.
         """
 
         SQL = ""
@@ -101,17 +125,53 @@ class QueryBuilder(object):
         # - When a (materialized) view is available, the JOIN() might be replaced by the (materialized) view.
         # - When count_mode is true, the SELECT clause will be replaced by COUNT(*) instead.
         # - All constants are returned as parameters to prevent SQL injection
+        # - When seek is given, only rows strictly after the seek values (in the keyset order) are returned
+        # - Without a view, only the properties that are selected, filtered or ordered on are joined.
+        # - Without a view, top-level conjunctions of conditions on a single property are pushed down
+        #   into EXISTS conditions of the join:
+        #       WHERE EXISTS (
+        #           SELECT 1 FROM Codec1 AS S_prop1
+        #           WHERE S_prop1.item_id = I.id AND S_prop1.active AND S_prop1.prop_id = ${id_of_prop1}
+        #           AND {condition_on_prop1}
+        #       )
+        #   so that they can use the indexes of the codec table; all other conditions stay in the outer WHERE.
+        # - An unfiltered count without a view only counts the items in the collection.
 
         # if no properties were given, use all the properties
         if properties is None:
             properties = self.collection.properties()
+        properties = list(properties)
+
+        if pushdown is None:
+            pushdown = settings.QUERY_FILTER_PUSHDOWN
+
+        # if we have a filter, compile it (pushing down what we can)
+        exists: Optional[SQLWithParams] = None
+        if where is not None and use_view is None and pushdown:
+            (
+                exists,
+                filter_sql,
+                filter_sqlargs,
+                filter_slugs,
+            ) = self.filter_builder.compile_pushdown(where)
+        elif where is not None:
+            filter_sql, filter_sqlargs, filter_slugs = self.filter_builder.compile(
+                where
+            )
+        else:
+            filter_sql, filter_sqlargs, filter_slugs = None, [], frozenset()
+
+        # an unfiltered count does not need any properties
+        unfiltered = filter_sql is None and exists is None and seek is None
+        if count_query and use_view is None and unfiltered:
+            return self.count_builder()
 
         # build the outer SELECT()
         if not count_query:
             SQL += "SELECT id"
             for prop in properties:
                 SQL += ", "
-                for i in range(len(prop.codec_model.get_value_fields())):
+                for i in range(len(prop.codec_model.value_fields)):
                     SQL += "{}, ".format(self._prop_value(prop, i))
 
                 cid_field = self._prop_cid(prop)
@@ -121,8 +181,11 @@ class QueryBuilder(object):
 
         # build the FROM
         if use_view is None:
-            # if we don't have a view, use the join()
-            join_sql, join_sqlargs = self.join_builder()
+            # if we don't have a view, use the join() of the properties we need
+            needed = self._needed_properties(
+                [] if count_query else properties, filter_slugs
+            )
+            join_sql, join_sqlargs = self.join_builder(needed, exists)
             SQL += " FROM ({}) AS collection".format(join_sql)
             SQL_ARGS += join_sqlargs
 
@@ -130,14 +193,31 @@ class QueryBuilder(object):
         else:
             SQL += " FROM {}".format(use_view)
 
-        # if we have a filter, use it
-        if where is not None:
-            filter_sql, filter_sqlargs = self.filter_builder(where)
+        # in keyset mode, we need to know the exact columns to order by
+        keyset = keyset or seek is not None
+        if keyset:
+            order_columns = self.order_columns(order, properties)
+        if seek is not None:
+            seek = self.clean_seek(order, properties, seek)
+
+        # if we seek, only return rows after the given values
+        if seek is not None:
+            seek_sql, seek_sqlargs = self.seek_builder(order_columns, seek)
+            if filter_sql is not None:
+                filter_sql = "({}) AND ({})".format(filter_sql, seek_sql)
+            else:
+                filter_sql = seek_sql
+            filter_sqlargs = filter_sqlargs + seek_sqlargs
+
+        if filter_sql is not None:
             SQL += " WHERE {}".format(filter_sql)
             SQL_ARGS += filter_sqlargs
 
         # ORDER BY
-        if order is not None:
+        if keyset:
+            order_sql = self.keyset_order_builder(order_columns)
+            SQL += " ORDER BY {}".format(order_sql)
+        elif order is not None:
             order_sql = self.order_builder(order, properties)
             SQL += " ORDER BY {}".format(order_sql)
 
@@ -153,18 +233,52 @@ class QueryBuilder(object):
         # and finally return the sql and the arguments
         return SQL, SQL_ARGS
 
-    def join_builder(self) -> SQLWithParams:
-        """Builds the JOIN() part of the query"""
+    def _needed_properties(
+        self, properties: Iterable[Property], slugs: Iterable[str]
+    ) -> list[Property]:
+        """Returns the properties of the collection that are given, or whose slug is given, in schema order"""
+
+        needed = {p.slug for p in properties}
+        needed.update(slugs)
+        return [p for p in self.collection.schema.properties if p.slug in needed]
+
+    def count_builder(self) -> SQLWithParams:
+        """Builds a query counting all items in this collection"""
+
+        SQL = "SELECT COUNT(*) FROM {} WHERE collection_id = %s".format(
+            Item.collections.through._meta.db_table,
+        )
+        return SQL, [str(self.collection.pk)]
+
+    def join_builder(
+        self,
+        properties: Optional[Iterable[Property]] = None,
+        where: Optional[SQLWithParams] = None,
+    ) -> SQLWithParams:
+        """
+        Builds the JOIN() part of the query.
+        Joins only the given properties, or all properties of the collection when omitted.
+        When given, where is a condition (on the item I) to add to the join.
+        """
 
         # select all the properties
         SQL = "SELECT I.id as id"
         SQL_ARGS: list[str | int] = []
 
-        for prop in self.collection.properties():
+        schema = self.collection.schema
+        if properties is None:
+            joined = list(zip(schema.properties, schema.codec_models))
+        else:
+            joined = [
+                (p, schema.codec_models[schema.properties.index(p)])
+                for p in properties
+            ]
+
+        for prop, codec in joined:
             virtual_table = self._prop_table(prop)
             cid_field = self._prop_cid(prop)
 
-            value_names = prop.codec_model.value_fields
+            value_names = codec.value_fields
 
             for i, value_name in enumerate(value_names):
                 SQL += ", {}.{} as {}".format(
@@ -182,9 +296,9 @@ class QueryBuilder(object):
         SQL_ARGS.append(str(self.collection.pk))
 
         # return the properties
-        for prop in self.collection.properties():
+        for prop, codec in joined:
             # the physical table to look up the values in
-            physical_table = prop.codec_model._meta.db_table
+            physical_table = codec._meta.db_table
             virtual_table = self._prop_table(prop)
 
             # the join
@@ -195,6 +309,11 @@ class QueryBuilder(object):
             )
             SQL_ARGS.append(str(prop.pk))
 
+        # add the pushed down filter
+        if where is not None:
+            SQL += " WHERE {}".format(where[0])
+            SQL_ARGS += where[1]
+
         # and return the sql and the arguments for the join()
         return SQL, SQL_ARGS
 
@@ -205,7 +324,155 @@ class QueryBuilder(object):
             [self._parser_order(o, property_dict) for o in order.split(",")]
         )
 
-    def _parser_order(self, oslug: str, property_dict: dict[str, Property]) -> str:
+    def order_columns(
+        self, order: Optional[str], properties: Iterable[Property]
+    ) -> list[tuple[str, bool]]:
+        """
+        Returns a list of (column, descending) pairs representing the keyset order.
+        Always ends with the item id, so that the order is total.
+        """
+
+        columns: list[tuple[str, bool]] = []
+        if order is not None:
+            property_dict: dict[str, Property] = {p.slug: p for p in properties}
+            for o in order.split(","):
+                prop, mode = self._parse_order(o, property_dict)
+                if prop.codec_model._overrides("order_clause"):
+                    raise QueryBuilderError(
+                        "Codec {} uses a custom order, which does not support keyset pagination".format(
+                            prop.codec_model.get_codec_name()
+                        )
+                    )
+                # seek values of other (e.g. array or json) columns are not scalars
+                for field in prop.codec_model.get_value_fields():
+                    if not self._is_seek_field(field):
+                        raise QueryBuilderError(
+                            "Property {} can not be ordered by in keyset pagination".format(
+                                prop.slug
+                            )
+                        )
+                for i in range(len(prop.codec_model.value_fields)):
+                    columns.append((self._prop_value(prop, i, sql=False), mode == "-"))
+
+        columns.append(("id", False))
+        return columns
+
+    def clean_seek(
+        self, order: Optional[str], properties: Iterable[Property], seek: Any
+    ) -> list[Any]:
+        """
+        Validates seek values against the types of the columns of the keyset order,
+        and converts them into values to compare the columns with.
+        Raises QueryBuilderError if a value does not fit its column.
+        """
+
+        fields: list[models.Field] = []
+        if order is not None:
+            property_dict: dict[str, Property] = {p.slug: p for p in properties}
+            for o in order.split(","):
+                prop, _ = self._parse_order(o, property_dict)
+                fields += prop.codec_model.get_value_fields()
+        fields.append(Item._meta.pk)
+
+        if not isinstance(seek, (list, tuple)) or len(seek) != len(fields):
+            raise QueryBuilderError("Seek values do not match the order of the query")
+
+        return [self._clean_seek_value(f, v) for (f, v) in zip(fields, seek)]
+
+    @staticmethod
+    def _is_seek_field(field: models.Field) -> bool:
+        # json and array fields are stored as text when not using postgres
+        return isinstance(field, SEEK_FIELD_TYPES) and not isinstance(
+            field, DumbJSONField
+        )
+
+    @staticmethod
+    def _clean_seek_value(field: models.Field, value: Any) -> Any:
+        if value is None:
+            return None
+
+        # seek values are always scalars, as returned by seek_key
+        if not isinstance(value, (str, int, float, bool)):
+            raise QueryBuilderError("Invalid seek value {!r}".format(value))
+
+        try:
+            if field is Item._meta.pk:
+                return str(field.get_db_prep_value(field.to_python(value), connection))
+            if isinstance(field, SEEK_FIELD_TYPES):
+                return field.to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            raise QueryBuilderError("Invalid seek value {!r}".format(value))
+
+        return value
+
+    def keyset_order_builder(self, columns: list[tuple[str, bool]]) -> SQL:
+        """Builds the order part of a keyset query"""
+
+        # NULLs are explicitly sorted last, so that seek_builder does not depend
+        # on the default NULL ordering of the database.
+        return ", ".join(
+            '"{}" {} NULLS LAST'.format(column, "DESC" if desc else "ASC")
+            for (column, desc) in columns
+        )
+
+    def seek_builder(
+        self, columns: list[tuple[str, bool]], seek: Sequence[Any]
+    ) -> SQLWithParams:
+        """
+        Builds a condition matching all rows strictly after the row with the given values.
+        For columns (c1, c2, ..., id) this expands the row-value comparison into
+            (c1 > v1) OR (c1 = v1 AND c2 > v2) OR ... OR (c1 = v1 AND ... AND id > vid)
+        taking into account the order direction and NULLs (which are sorted last).
+        """
+
+        if len(seek) != len(columns):
+            raise QueryBuilderError("Seek values do not match the order of the query")
+
+        SQL: list[str] = []
+        SQL_ARGS: list[Any] = []
+
+        equal_sql: list[str] = []
+        equal_args: list[Any] = []
+        for (column, desc), value in zip(columns, seek):
+            column = '"{}"'.format(column)
+
+            # everything strictly after value in this column
+            # (nothing is after a NULL, because NULLs are last)
+            if value is not None:
+                after_sql = "({0} {1} %s OR {0} IS NULL)".format(
+                    column, "<" if desc else ">"
+                )
+                SQL.append(" AND ".join(equal_sql + [after_sql]))
+                SQL_ARGS += equal_args + [value]
+
+            # everything equal in this column
+            if value is not None:
+                equal_sql.append("{} = %s".format(column))
+                equal_args.append(value)
+            else:
+                equal_sql.append("{} IS NULL".format(column))
+
+        if len(SQL) == 0:
+            return "1 = 0", []
+
+        return " OR ".join("({})".format(s) for s in SQL), SQL_ARGS
+
+    @staticmethod
+    def seek_key(item: Item, columns: list[tuple[str, bool]]) -> list[Any]:
+        """Returns the database values of the given order columns of a queried item"""
+
+        return [
+            str(Item._meta.pk.get_db_prep_value(item.pk, connection))
+            if column == "id"
+            else getattr(item, column)
+            for (column, _) in columns
+        ]
+
+    def _parse_order(
+        self, oslug: str, property_dict: dict[str, Property]
+    ) -> tuple[Property, str]:
+        """Parses a single order string into a pair (property, mode)"""
+
         order = oslug.strip()
         if len(order) == 0:
             raise QueryBuilderError("Order string received empty property")
@@ -226,21 +493,44 @@ class QueryBuilder(object):
         if not oslug in property_dict:
             raise QueryBuilderError("Unknown property {}".format(oslug))
 
+        return property_dict[oslug], mode
+
+    def _parser_order(self, oslug: str, property_dict: dict[str, Property]) -> str:
         # build the order clause from the prop
-        prop = property_dict[oslug]
+        prop, mode = self._parse_order(oslug, property_dict)
         return prop.codec_model.order_clause(prop, mode)
 
 
 class FilterBuilder(object):
-    """The FilterBuilder represents an object to build WHERE filters from"""
+    """
+    The FilterBuilder represents an object to build WHERE filters from.
+
+    Compiled filters and operator tables are cached (per process) for each
+    collection and schema version, see Collection.schema_version.
+    """
 
     collection: Collection
     parser: PreJsPy
 
+    # maps (collection id, schema version, filter) => (sql, params)
+    _filter_cache: LRUCache = LRUCache(settings.FILTER_CACHE_SIZE)
+
+    # maps (collection id, schema version) => binary operators
+    _operator_cache: LRUCache = LRUCache(settings.FILTER_CACHE_SIZE)
+
     def __init__(self, collection: Collection):
         self.collection = collection
+        self._parser_key = None
+        self._referenced: set[str] = set()
         self._init_parser()
 
+    @classmethod
+    def forget(cls, collection_id: int) -> None:
+        """Removes everything cached for the collection with the given id"""
+
+        cls._filter_cache.discard(lambda key: key[0] == collection_id)
+        cls._operator_cache.discard(lambda key: key[0] == collection_id)
+
     def _init_parser(self) -> None:
         """Setups up the parser initially"""
         self.parser = PreJsPy()
@@ -252,32 +542,162 @@ class FilterBuilder(object):
     def _update_parser(self) -> None:
         """Updates the parser with the current configuration"""
 
-        bin_ops = {
-            "||": 1,
-            "&&": 1,
-        }
-        bin_ops.update(
-            {op: 2 for op in CodecManager.collect_operators(self.collection.codecs)}
-        )
+        key = (self.collection.pk, self.collection.schema_version)
+        if self._parser_key == key:
+            return
+
+        bin_ops = self._operator_cache.get(key)
+        if bin_ops is None:
+            bin_ops = {
+                "||": 1,
+                "&&": 1,
+            }
+            bin_ops.update(
+                {op: 2 for op in CodecManager.collect_operators(self.collection.codecs)}
+            )
+            self._operator_cache.set(key, bin_ops)
 
         self.parser.setBinaryOperators(bin_ops)
+        self._parser_key = key
 
     def __call__(self, query: str) -> SQLWithParams:
         """Parses a query for a given collection"""
 
+        sql, params, _ = self.compile(query)
+        return sql, params
+
+    def compile(self, query: str) -> tuple[SQL, list[int | str], frozenset[str]]:
+        """
+        Parses a query for a given collection.
+        Returns a triple (SQL, params, slugs) where slugs are the properties referenced by the query.
+        """
+
+        key = (self.collection.pk, self.collection.schema_version, query)
+        cached = self._filter_cache.get(key)
+        if cached is not None:
+            return cached[0], list(cached[1]), cached[2]
+
+        # process the AST
+        self._referenced = set()
+        sql, params = self._process_logical(self.parse(query))
+        slugs = frozenset(self._referenced)
+
+        self._filter_cache.set(key, (sql, tuple(params), slugs))
+        return sql, params, slugs
+
+    def compile_pushdown(
+        self, query: str
+    ) -> tuple[
+        Optional[SQLWithParams], Optional[SQL], list[int | str], frozenset[str]
+    ]:
+        """
+        Parses a query for a given collection, pushing down conditions on a single property.
+        Returns a tuple (exists, SQL, params, slugs).
+        Exists is an (SQL, params) pair of EXISTS conditions on the item I of the join (or None),
+        the remaining conditions are returned as with compile() (with SQL None if there are none).
+        """
+
+        key = (self.collection.pk, self.collection.schema_version, query, "pushdown")
+        cached = self._filter_cache.get(key)
+        if cached is not None:
+            exists, sql, params, slugs = cached
+            if exists is not None:
+                exists = (exists[0], list(exists[1]))
+            return exists, sql, list(params), slugs
+
+        # split the top-level conjunction into conditions on a single property and the rest
+        conditions: dict[str, list[FilterAST]] = {}
+        rest: list[FilterAST] = []
+        for tree in self._conjuncts(self.parse(query)):
+            slug = self._single_property(tree)
+            if slug is not None:
+                conditions.setdefault(slug, []).append(tree)
+            else:
+                rest.append(tree)
+
+        # build an EXISTS for each property
+        exists_sql: list[str] = []
+        exists_params: list[int | str] = []
+        for (slug, trees) in conditions.items():
+            sql, params = self._process_exists(slug, trees)
+            exists_sql.append(sql)
+            exists_params += params
+
+        exists = None
+        if len(exists_sql) > 0:
+            exists = (" AND ".join(exists_sql), exists_params)
+
+        # and process the rest as usual
+        self._referenced = set()
+        sql, params = None, []
+        for tree in rest:
+            tsql, tparams = self._process_logical(tree)
+            sql = tsql if sql is None else "({}) AND ({})".format(sql, tsql)
+            params += tparams
+        slugs = frozenset(self._referenced)
+
+        cached_exists = None if exists is None else (exists[0], tuple(exists[1]))
+        self._filter_cache.set(key, (cached_exists, sql, tuple(params), slugs))
+        return exists, sql, params, slugs
+
+    def _conjuncts(self, tree: FilterAST) -> list[FilterAST]:
+        """Splits a tree into the operands of its top-level '&&' operators"""
+
+        if tree["type"] == "BinaryExpression" and tree["operator"] == "&&":
+            return self._conjuncts(tree["left"]) + self._conjuncts(tree["right"])
+        return [tree]
+
+    def _single_property(self, tree: FilterAST) -> Optional[str]:
+        """If tree compares a single property with a literal, returns the slug of the property"""
+
+        if tree["type"] != "BinaryExpression" or tree["operator"] in ["&&", "||"]:
+            return None
+
+        left = self._get_lli_type(tree["left"])
+        right = self._get_lli_type(tree["right"])
+        if left == "identifier" and right == "literal":
+            return tree["left"]["name"]
+        elif left == "literal" and right == "identifier":
+            return tree["right"]["name"]
+        return None
+
+    def _process_exists(self, slug: str, trees: list[FilterAST]) -> SQLWithParams:
+        """Builds an EXISTS condition for trees comparing the property slug with literals"""
+
+        table = '"S_{}"'.format(slug)
+
+        SQL = []
+        SQL_ARGS: list[int | str] = []
+        for tree in trees:
+            if self._get_lli_type(tree["left"]) == "identifier":
+                sql, params = self._process_right(tree, table)
+            else:
+                sql, params = self._process_left(tree, table)
+            SQL.append(sql)
+            SQL_ARGS += params
+
+        schema = self.collection.schema
+        prop = schema.get_property(slug)
+        codec = schema.codec_models[schema.properties.index(prop)]
+
+        sql = "EXISTS (SELECT 1 FROM {1} AS {0} WHERE {0}.item_id = I.id AND {0}.active AND {0}.prop_id = %s AND {2})".format(
+            table, codec._meta.db_table, " AND ".join(SQL)
+        )
+        return sql, [str(prop.pk)] + SQL_ARGS
+
+    def parse(self, query: str) -> FilterAST:
+        """Parses a query into an AST"""
+
         # update the parser
         # because of this method we are not THREAD-SAFE
         self._update_parser()
 
         # parse into an AST
         try:
-            result = self.parser.parse(query)  # type: FilterAST
+            return self.parser.parse(query)
         except Exception as e:
             raise FilterBuilderError("Error while parsing query: {}".format(e))
 
-        # process the AST
-        return self._process_logical(result)
-
     def _process_logical(self, tree: FilterAST) -> SQLWithParams:
         """Processes a logical sql expression and returns a pair (SQL, params)"""
 
@@ -324,10 +744,12 @@ class FilterBuilder(object):
 
         self._raise_error_for_type(tp)
 
-    def _process_left(self, tree: FilterAST) -> SQLWithParams:
+    def _process_left(
+        self, tree: FilterAST, table: Optional[str] = None
+    ) -> SQLWithParams:
         op = tree["operator"]
 
-        prop, codec, columns = self._resolve_codec(tree["right"]["name"], op)
+        prop, codec, columns = self._resolve_codec(tree["right"]["name"], op, table)
         lit = self._process_literal(tree["left"])
         if not codec.is_valid_operand(lit):
             raise FilterBuilderError(
@@ -337,9 +759,11 @@ class FilterBuilder(object):
             )
         return codec.operate_left(lit, op, columns)
 
-    def _process_right(self, tree: FilterAST) -> SQLWithParams:
+    def _process_right(
+        self, tree: FilterAST, table: Optional[str] = None
+    ) -> SQLWithParams:
         op = tree["operator"]
-        prop, codec, columns = self._resolve_codec(tree["left"]["name"], op)
+        prop, codec, columns = self._resolve_codec(tree["left"]["name"], op, table)
         lit = self._process_literal(tree["right"])
         if not codec.is_valid_operand(lit):
             raise FilterBuilderError(
@@ -368,21 +792,23 @@ class FilterBuilder(object):
         return codecL.operate_both(columnsL, op, columnsR)
 
     def _resolve_codec(
-        self, slug: str, op: str
+        self, slug: str, op: str, table: Optional[str] = None
     ) -> tuple[Property, Type[Codec], List[str]]:
-        """Returns a triple (property, codec, column) for a given identifier"""
+        """
+        Returns a triple (property, codec, column) for a given identifier.
+        When table is given, the columns refer to the codec table with that name instead of the join.
+        """
 
         # Find the matching property
-        prop = None
-        for p in self.collection.properties():
-            if p.slug == slug:
-                prop = p
-                break
+        schema = self.collection.schema
+        prop = schema.get_property(slug)
         if prop is None:
             raise FilterBuilderError("Unknown property {}".format(slug))
+        self._referenced.add(slug)
 
         # determine the codec
-        codec = prop.codec_model
+        index = schema.properties.index(prop)
+        codec = schema.codec_models[index]
         if op not in codec.operators:
             raise FilterBuilderError(
                 "Codec {} does not support operator {}".format(
@@ -391,9 +817,10 @@ class FilterBuilder(object):
             )
 
         # and make a columns object
-        columns = [
-            QueryBuilder._prop_value(p, i) for i in range(len(codec.get_value_fields()))
-        ]
+        if table is not None:
+            columns = ["{}.{}".format(table, c) for c in codec.value_fields]
+        else:
+            columns = ['"{}"'.format(c) for c in schema.value_columns[index]]
 
         # and return!
         return prop, codec, columns
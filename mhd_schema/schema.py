@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+""" This file contains immutable snapshots of collection schemas """
+from django.conf import settings
+
+from mhd.utils import LRUCache
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Optional, Type
+    from mhd_data.models import Codec
+    from .models import Collection, Property
+
+
+class CollectionSchema(object):
+    """
+    An immutable snapshot of the properties of a collection at a given schema version.
+
+    Snapshots are cached (per process) by collection id and schema version,
+    so that querying a collection does not need to look up its properties again.
+    Use CollectionSchema.get() (or Collection.schema) to retrieve one.
+    """
+
+    collection_id: int
+    version: int
+
+    properties: tuple[Property, ...]
+    codec_models: tuple[Type[Codec], ...]
+    value_columns: tuple[tuple[str, ...], ...]
+    by_slug: dict[str, Property]
+    codecs: frozenset[Type[Codec]]
+
+    # maps (collection id, schema version) => CollectionSchema
+    _cache: LRUCache = LRUCache(settings.FILTER_CACHE_SIZE)
+
+    def __init__(
+        self, collection_id: int, version: int, properties: tuple[Property, ...]
+    ) -> None:
+        from .query import QueryBuilder
+
+        self.collection_id = collection_id
+        self.version = version
+
+        self.properties = properties
+        self.codec_models = tuple(p.codec_model for p in properties)
+        self.value_columns = tuple(
+            tuple(
+                QueryBuilder._prop_value(p, i, sql=False)
+                for i in range(len(codec.value_fields))
+            )
+            for (p, codec) in zip(properties, self.codec_models)
+        )
+        self.by_slug = {p.slug: p for p in properties}
+        self.codecs = frozenset(self.codec_models)
+
+    @classmethod
+    def get(cls, collection: Collection) -> CollectionSchema:
+        """Returns the (cached) schema of a collection at its current version"""
+
+        key = (collection.pk, collection.schema_version)
+        schema = cls._cache.get(key)
+        if schema is None:
+            schema = cls(
+                collection.pk,
+                collection.schema_version,
+                tuple(collection.property_set.order_by("id")),
+            )
+            cls._cache.set(key, schema)
+        return schema
+
+    @classmethod
+    def forget(cls, collection_id: int) -> None:
+        """Removes all cached schemas of the collection with the given id"""
+
+        cls._cache.discard(lambda key: key[0] == collection_id)
+
+    def get_property(self, slug: str) -> Optional[Property]:
+        """Returns the property with the given slug, or None"""
+
+        return self.by_slug.get(slug)
+
+
+__all__ = ["CollectionSchema"]
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from ..query import FilterBuilder
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from mhd_data.tests.collection import insert_testing_data
 
@@ -71,3 +73,57 @@ class FilterBuilderTest(TestCase):
             'NOT((NOT("property_value_f1_0" = %s)) OR ("property_value_f2_0" = %s))',
         )
         self.assertListEqual(q7args, [1, 0])
+
+    def test_filter_cache(self) -> None:
+        """Checks that compiled filters are cached per schema version"""
+
+        FilterBuilder(self.collection)("f1 <= 1 && f2 = 0")
+
+        # a new builder for the same collection does not hit the database
+        fb = FilterBuilder(self.collection)
+        with self.assertNumQueries(0):
+            qsql, qargs = fb("f1 <= 1 && f2 = 0")
+        self.assertEqual(
+            qsql, '("property_value_f1_0" <= %s) AND ("property_value_f2_0" = %s)'
+        )
+        self.assertListEqual(qargs, [1, 0])
+
+        # after a schema change, the filter is compiled again
+        self.collection.bump_schema_version()
+        with CaptureQueriesContext(connection) as queries:
+            fb("f1 <= 1 && f2 = 0")
+        self.assertGreater(len(queries), 0)
+
+    def test_pushdown(self) -> None:
+        """Checks that single-property conditions are pushed down, and others are not"""
+
+        fb = FilterBuilder(self.collection)
+        f1_pk = str(self.collection.get_property("f1").pk)
+
+        exists, qsql, qargs, slugs = fb.compile_pushdown(
+            "f1 >= 0 && (f2 = 0 || f0 = 1) && 2 >= f1"
+        )
+        self.assertEqual(
+            exists[0],
+            'EXISTS (SELECT 1 FROM mhd_data_standardint AS "S_f1" WHERE "S_f1".item_id = I.id AND "S_f1".active AND "S_f1".prop_id = %s AND "S_f1".value >= %s AND %s >= "S_f1".value)',
+        )
+        self.assertListEqual(exists[1], [f1_pk, 0, 2])
+        self.assertEqual(
+            qsql, '("property_value_f2_0" = %s) OR ("property_value_f0_0" = %s)'
+        )
+        self.assertListEqual(qargs, [0, 1])
+        self.assertSetEqual(set(slugs), {"f0", "f2"})
+
+        # negations are never pushed down
+        exists, qsql, qargs, slugs = fb.compile_pushdown("!(f1 = 1)")
+        self.assertIsNone(exists)
+        self.assertEqual(qsql, 'NOT("property_value_f1_0" = %s)')
+
+        # and both forms return the same results
+        for filter in ["f1 = 0 && f2 != 1", "f1 <= 1 && (f2 = 0 || !(f0 = 1))"]:
+            with self.settings(QUERY_FILTER_PUSHDOWN=True):
+                pushed = [i.pk for i in self.collection.query(filter=filter)[0]]
+            with self.settings(QUERY_FILTER_PUSHDOWN=False):
+                plain = [i.pk for i in self.collection.query(filter=filter)[0]]
+            self.assertGreater(len(plain), 0)
+            self.assertListEqual(sorted(pushed), sorted(plain), msg=filter)
@@ -34,3 +34,27 @@ class PropertyTest(TestCase):
         """Checks that the .codecs property of a collection returns the right codecs and properties"""
 
         self.assertSetEqual(self.collection.codecs, {StandardInt, StandardBool})
+
+    def test_collection_schema(self) -> None:
+        """Checks that the schema snapshot of a collection is cached by schema version"""
+
+        schema = self.collection.schema
+        self.assertListEqual(
+            [p.slug for p in schema.properties],
+            list(
+                self.collection.property_set.order_by("id").values_list(
+                    "slug", flat=True
+                )
+            ),
+        )
+        self.assertEqual(schema.value_columns[0], ("property_value_f0_0",))
+
+        # the snapshot is re-used without touching the database
+        with self.assertNumQueries(0):
+            self.assertIs(self.collection.schema, schema)
+            self.assertEqual(self.collection.get_property("f0").slug, "f0")
+            self.collection._query_builder.join_builder()
+
+        # a schema change builds a new snapshot
+        self.collection.bump_schema_version()
+        self.assertIsNot(self.collection.schema, schema)
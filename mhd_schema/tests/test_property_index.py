@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import copy
+import os
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from ..importer import SchemaImporter
+from ..models import Collection, PropertyIndex
+
+from mhd_data.models.codecs import StandardInt
+
+from mhd_tests.utils import LoadJSONAsset, AssetPath
+
+COLLECTION_V0_PATH = AssetPath(__file__, "res", "collection_v0.json")
+COLLECTION_V0_ASSET = LoadJSONAsset(COLLECTION_V0_PATH)
+COLLECTION_ROOT = os.path.dirname(COLLECTION_V0_PATH)
+
+
+class PropertyIndexTest(TestCase):
+    def setUp(self) -> None:
+        call_command("upsert_collection", COLLECTION_V0_PATH, update=False, quiet=True)
+
+        self.collection = Collection.objects.get(slug="z3zFunctions")
+
+    def _indexes(self) -> set[str]:
+        """Returns the names of the indexes on the StandardInt table"""
+
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, StandardInt._meta.db_table
+            )
+        return {name for (name, c) in constraints.items() if c["index"]}
+
+    def test_command(self) -> None:
+        """Checks that the property_index command creates and drops indexes"""
+
+        f1 = self.collection.get_property("f1")
+        name = "mhd_prop_{}_idx".format(f1.pk)
+
+        call_command("property_index", "z3zFunctions", "f1", enable=True, quiet=True)
+        self.assertIn(name, self._indexes())
+        self.assertListEqual(
+            list(PropertyIndex.objects.values_list("name", "property")),
+            [(name, f1.pk)],
+        )
+
+        # enabling again does nothing
+        call_command("property_index", "z3zFunctions", "f1", enable=True, quiet=True)
+        self.assertEqual(PropertyIndex.objects.count(), 1)
+
+        call_command("property_index", "z3zFunctions", disable=True, quiet=True)
+        self.assertNotIn(name, self._indexes())
+        self.assertFalse(PropertyIndex.objects.exists())
+
+    def test_upsert(self) -> None:
+        """Checks that updating a collection reconciles the indexes"""
+
+        data = copy.deepcopy(COLLECTION_V0_ASSET)
+        for p in data["properties"]:
+            p["index"] = p["slug"] in ["f0", "f2"]
+        SchemaImporter(data, COLLECTION_ROOT, quiet=True)(update=True)
+
+        self.assertSetEqual(
+            {p.slug for p in self.collection.property_set.filter(indexed=True)},
+            {"f0", "f2"},
+        )
+        names = {
+            "mhd_prop_{}_idx".format(self.collection.get_property(slug).pk)
+            for slug in ["f0", "f2"]
+        }
+        self.assertSetEqual(
+            set(PropertyIndex.objects.values_list("name", flat=True)), names
+        )
+        self.assertTrue(names.issubset(self._indexes()))
+
+        # without the flag, properties stay indexed
+        SchemaImporter(COLLECTION_V0_ASSET, COLLECTION_ROOT, quiet=True)(update=True)
+        self.assertEqual(PropertyIndex.objects.count(), 2)
+
+        for p in data["properties"]:
+            p["index"] = False
+        SchemaImporter(data, COLLECTION_ROOT, quiet=True)(update=True)
+        self.assertFalse(PropertyIndex.objects.exists())
+        self.assertFalse(names & self._indexes())
+
+    def test_reconcile_properties(self) -> None:
+        """Checks that reconciling the indexes of some properties leaves the others alone"""
+
+        from ..indexes import PropertyIndexes
+
+        f0 = self.collection.get_property("f0")
+        f1 = self.collection.get_property("f1")
+        self.collection.property_set.filter(pk__in=[f0.pk, f1.pk]).update(indexed=True)
+
+        indexes = PropertyIndexes(quiet=True)
+        self.assertTupleEqual(indexes.reconcile([f0]), (1, 0))
+        self.assertSetEqual(
+            set(PropertyIndex.objects.values_list("name", flat=True)),
+            {indexes.partial_name(f0)},
+        )
+
+        self.assertTupleEqual(indexes.reconcile(), (1, 0))
+        self.assertIn(indexes.partial_name(f1), self._indexes())
+
+    def test_reconcile_leftover(self) -> None:
+        """Checks that an index left over by a failed reconcile does not fail the next one"""
+
+        from ..indexes import PropertyIndexes
+
+        f1 = self.collection.get_property("f1")
+        self.collection.property_set.filter(pk=f1.pk).update(indexed=True)
+
+        # create the index, but fail to record it
+        indexes = PropertyIndexes(quiet=True)
+        with connection.cursor() as cursor:
+            cursor.execute(indexes.definitions()[0][4])
+        self.assertIn(indexes.partial_name(f1), self._indexes())
+
+        self.assertTupleEqual(indexes.reconcile(), (1, 0))
+        self.assertEqual(PropertyIndex.objects.count(), 1)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import copy
+
 from django.core.management import call_command
 from django.test import TestCase
 from rest_framework.test import APIClient
 
 from mhd_tests.utils import LoadJSONAsset, AssetPath
 
+from ..importer import SchemaImporter
+from ..models import Collection
+
 Z3Z_V0_PATH = AssetPath(__file__, "res", "collection_v0.json")
 
 Z3Z_V1_PATH = AssetPath(__file__, "res", "collection_v1.json")
@@ -47,3 +52,19 @@ class UpdateCollectionTest(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertJSONEqual(response.content, expected_response)
+
+    def test_schema_property_update(self) -> None:
+        """Checks that updating properties in place does not leave a stale schema"""
+
+        collection = Collection.objects.get(slug="z3zFunctions")
+        self.assertFalse(collection.get_property("f0").default)
+
+        # only change a property, keeping the set of properties
+        data = copy.deepcopy(Z3Z_V1_ASSET)
+        for p in data["properties"]:
+            if p["slug"] == "f0":
+                p["default"] = True
+        SchemaImporter(data, quiet=True)(update=True)
+
+        collection = Collection.objects.get(slug="z3zFunctions")
+        self.assertTrue(collection.get_property("f0").default)
@@ -4,8 +4,9 @@ import json
 import logging
 
 from django.db import models
+from django.db.models.signals import post_delete
 
-from typing import TYPE_CHECKING, TypeAlias, Optional, Any
+from typing import TYPE_CHECKING, TypeAlias, Optional, Any, ClassVar
 
 if TYPE_CHECKING:
     from django.db.backends.utils import CursorWrapper as Cursor
@@ -190,6 +191,9 @@ class View(ViewImplementation, models.Model):
         help_text="Boolean indicating if this view is materialized"
     )
 
+    # views resolved by this process, see resolve()
+    _resolved: ClassVar[dict[str, View]] = {}
+
     @staticmethod
     def make_view(
         name: str,
@@ -200,6 +204,11 @@ class View(ViewImplementation, models.Model):
     ) -> View:
         """Gets an appropriate view. Should call .sync() on the view when possible"""
 
+        # if the stored view is up-to-date, don't write to the database
+        obj = View.objects.filter(name=name).first()
+        if obj is not None and obj.matches(sql, params, materialized):
+            return obj
+
         # get or update the view
         obj, created = View.objects.update_or_create(
             name=name,
@@ -213,6 +222,43 @@ class View(ViewImplementation, models.Model):
         # and return
         return obj
 
+    @classmethod
+    def resolve(
+        cls,
+        name: str,
+        sql: str,
+        params: Optional[list[Any]] = None,
+        materialized: bool = False,
+    ) -> View:
+        """
+        Like make_view, but caches the view in this process.
+        The database is only read or written when the view has not been resolved
+        before, or when sql, params or materialized changed since.
+        """
+
+        view = cls._resolved.get(name)
+        if view is None or not view.matches(sql, params, materialized):
+            view = cls.make_view(name, sql, params, materialized=materialized)
+            cls._resolved[name] = view
+        return view
+
+    @classmethod
+    def forget(cls, name: str) -> None:
+        """Removes a view from the cache of resolved views"""
+
+        cls._resolved.pop(name, None)
+
+    def matches(
+        self, sql: str, params: Optional[list[Any]], materialized: bool
+    ) -> bool:
+        """Checks if this view has the given definition"""
+
+        return (self.sql, self.paramsJSON, self.materialized) == (
+            sql,
+            json.dumps(params),
+            materialized,
+        )
+
     @classmethod
     def sync_all(
         cls,
@@ -244,6 +290,15 @@ class View(ViewImplementation, models.Model):
         self.paramsJSON = json.dumps(value)
 
 
+def view_delete(sender: type[View], instance: View, **kwargs: Any) -> None:
+    """Removes a deleted view from the cache of resolved views"""
+
+    View.forget(instance.name)
+
+
+post_delete.connect(view_delete, sender=View)
+
+
 class VendorNotSupportedException(Exception):
     def __init__(self):
         super().__init__("Database vendor not supported. ")